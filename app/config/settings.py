@@ -1,6 +1,7 @@
 """
 Configuración general de la aplicación ClusterFlow
 """
+from pathlib import Path
 
 # Configuración de Streamlit
 PAGE_TITLE = "Cluster APP"
@@ -15,12 +16,76 @@ DEFAULT_OUTLIER_THRESHOLD = 3.0
 DEFAULT_VARIANCE_THRESHOLD = 1.0
 DEFAULT_CORRELATION_THRESHOLD = 0.90
 
+# Configuración de Paralelismo
+N_JOBS = -1  # Procesos para el barrido de K (-1 = todos los núcleos, 1 = serie)
+BLAS_THREADS_PER_WORKER = 1  # Hilos BLAS/OpenMP por proceso (None = reparto automático)
+
+# Configuración de Silhouette muestreado (silhouette_score es O(n²))
+SILHOUETTE_SAMPLE_THRESHOLD = 50_000  # Filas a partir de las cuales se estima por muestreo
+SILHOUETTE_SAMPLE_SIZE = 10_000  # Filas por submuestra estratificada
+SILHOUETTE_N_REPEATS = 5  # Número de submuestras
+SILHOUETTE_CONFIDENCE = 0.95  # Nivel de confianza del intervalo
+
+# Métodos de Clustering
+AVAILABLE_CLUSTERING_METHODS = {
+    'kmeans': 'K-Means',
+    'minibatch_kmeans': 'MiniBatch K-Means',
+    'hierarchical': 'Hierarchical (Ward)',
+    'hierarchical_complete': 'Hierarchical (Complete)',
+    'hierarchical_average': 'Hierarchical (Average)',
+    'dbscan': 'DBSCAN (densidad)',
+    'hdbscan': 'HDBSCAN (densidad jerárquica)'
+}
+
+# Modos del barrido de K
+AVAILABLE_SWEEP_MODES = {
+    'cold': 'Independiente (cada k en frío)',
+    'incremental_split': 'Incremental: dividir el peor cluster',
+    'incremental_kmeanspp': 'Incremental: añadir centroide k-means++'
+}
+
+# Configuración de MiniBatchKMeans
+MINIBATCH_BATCH_SIZE = 4096  # Filas por lote
+MINIBATCH_N_INIT = 3  # Inicializaciones
+MINIBATCH_AUTO_THRESHOLD = 1_000_000  # Filas a partir de las cuales 'kmeans' pasa a MiniBatch
+
+# Configuración de Clustering por Densidad (DBSCAN / HDBSCAN)
+DBSCAN_MIN_SAMPLES = 5  # Vecinos mínimos para un punto núcleo
+HDBSCAN_MIN_CLUSTER_SIZE = 15  # Tamaño mínimo de cluster en HDBSCAN
+EPS_SAMPLE_SIZE = 10_000  # Puntos consultados para la curva de k-distancias
+EPS_CACHE_MAX_ENTRIES = 16  # Estimaciones de eps guardadas (una por dataset y min_samples)
+KDTREE_MAX_FEATURES = 15  # Hasta esta dimensión se usa KD-tree; por encima, Ball-tree
+
+# Configuración de Clustering Jerárquico
+LINKAGE_CACHE_MAX_ENTRIES = 8  # Árboles de fusión guardados (uno por dataset y linkage)
+SWEEP_STORE_MAX_ENTRIES = 40  # Modelos del barrido de K guardados (uno por dataset, método y k)
+
+# Configuración de Datos y Caché de Resultados
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"  # /app/data en Docker (volumen montado)
+RESULT_CACHE_DIR = DATA_DIR / "cache"  # Nivel en disco de la caché de resultados
+RESULT_CACHE_MEMORY_ENTRIES = 32  # Resultados guardados en memoria (LRU)
+RESULT_CACHE_DISK_MAX_MB = 500  # Tamaño máximo del nivel en disco
+RESULT_CACHE_VERSION = 1  # Incrementar al cambiar cómo se calculan los resultados cacheados
+DATASET_CACHE_DIR = RESULT_CACHE_DIR / "datasets"  # Datasets ya parseados (archivos Arrow)
+DATASET_CACHE_MEMORY_ENTRIES = 2  # Datasets guardados en memoria (LRU)
+DATASET_CACHE_DISK_MAX_MB = 2000  # Tamaño máximo de los datasets en disco
+PROFILE_CACHE_MAX_ENTRIES = 8  # Perfiles de calidad guardados (uno por dataset)
+
 # Configuración de Escalado
 AVAILABLE_SCALERS = {
     'standard': 'StandardScaler (Z-score)',
     'minmax': 'MinMaxScaler (0-1)',
-    'robust': 'RobustScaler (resistente a outliers)'
+    'robust': 'RobustScaler (resistente a outliers)',
+    'quantile': 'QuantileTransformer (normal)',
+    'power': 'PowerTransformer (Yeo-Johnson)'
 }
+SCALE_CHUNK_SIZE = 100_000  # Filas por bloque del escalado por bloques
+STREAMING_SCALE_ROWS = 1_000_000  # A partir de estas filas se escala por bloques por defecto
+QUANTILE_SKETCH_K = 1000  # Tamaño del sketch de cuantiles (error de rango ~1/k)
+SKETCH_SCALE_ROWS = 1_000_000  # A partir de estas filas robust/quantile/power usan el sketch de cuantiles
+SCALER_COMPARISON_BINS = 40  # Intervalos de los histogramas de la comparación de escaladores
+SCALER_COMPARISON_CACHE_MAX_ENTRIES = 8  # Comparaciones guardadas (una por dataset y variables)
+PRECISION = 'float32'  # Tipo de los datos escalados, del clustering y del PCA ('float32' o 'float64')
 
 # Configuración de Limpieza de Datos
 AVAILABLE_FILL_METHODS = {
@@ -32,6 +97,20 @@ AVAILABLE_FILL_METHODS = {
     'bfill': 'Backward Fill (propagar siguiente valor válido)',
     'drop': 'Eliminar filas con NaN'
 }
+AVAILABLE_OUTLIER_METHODS = {
+    'zscore_sequential': 'Z-score columna a columna (original)',
+    'zscore': 'Z-score (una pasada, todas las columnas)',
+    'iqr': 'Rango intercuartílico (IQR)',
+    'mad': 'Z-score modificado (MAD, robusto)'
+}
+DEFAULT_OUTLIER_METHOD = 'zscore'
+# Rango (mínimo, máximo, valor por defecto) del umbral según el método
+OUTLIER_THRESHOLD_RANGES = {
+    'zscore_sequential': (2.0, 4.0, DEFAULT_OUTLIER_THRESHOLD),
+    'zscore': (2.0, 4.0, DEFAULT_OUTLIER_THRESHOLD),
+    'iqr': (1.0, 3.0, 1.5),
+    'mad': (2.5, 5.0, 3.5)
+}
 
 # Configuración de Visualización
 PLOT_STYLE = 'seaborn-v0_8-darkgrid'
@@ -40,6 +119,21 @@ COLOR_PALETTE = "husl"
 # Límites de Archivo
 MAX_FILE_SIZE_MB = 100
 
+# Configuración del Modo Vista Previa
+PREVIEW_SAMPLE_SIZE = 50_000  # Filas de la muestra
+PREVIEW_SUGGEST_ROWS = 200_000  # A partir de estas filas se activa por defecto
+PREVIEW_MAX_STRATA = 50  # Valores distintos máximos de una columna de estratos
+AVAILABLE_SAMPLING_METHODS = {
+    'reservoir': 'Aleatorio (reservoir sampling)',
+    'stratified': 'Estratificado por columna'
+}
+
+# Configuración de Carga de CSV
+CSV_CHUNK_SIZE = 100_000  # Filas leídas por bloque
+CSV_ENGINE = 'pyarrow'  # Motor de parseo: 'pyarrow' (multihilo, vuelve a 'c' si falla) o 'c'
+OPTIMIZE_DTYPES = True  # float32, enteros mínimos y 'category' para texto repetitivo
+CATEGORY_MAX_UNIQUE_RATIO = 0.5  # Proporción máxima de valores únicos para usar 'category'
+
 # Mensajes
 MESSAGES = {
     'no_data': '⚠️ Primero debes cargar un archivo CSV en la sección **Carga de Datos**',
@@ -1,7 +1,45 @@
 """
 Módulo core
 """
-from .data_loader import load_data
-from .data_cleaner import analyze_data_quality, clean_data
-from .scaler import scale_data
-from .clustering import determine_optimal_k, perform_clustering, select_best_method
+from .data_loader import (
+    load_data,
+    load_data_cached,
+    get_dataset_cache_stats,
+    read_schema,
+    list_data_files,
+    iter_chunks,
+    FILE_FORMATS
+)
+from .cache import fingerprint_file
+from .dataset_registry import list_datasets, get_metadata
+from .data_cleaner import (
+    analyze_data_quality,
+    profile_data,
+    clean_data,
+    row_hashes,
+    stored_row_hashes,
+    deduplicate_chunks,
+    CleaningPipeline
+)
+from .scaler import (
+    scale_data,
+    scale_data_streaming,
+    save_scaler,
+    load_scaler,
+    transform_with_scaler,
+    compare_scalers
+)
+from .clustering import (
+    determine_optimal_k,
+    perform_clustering,
+    assign_clusters,
+    select_best_method,
+    sampled_silhouette,
+    compare_sweep_modes,
+    estimate_eps,
+    compare_methods,
+    get_result_cache_stats,
+    DENSITY_METHODS
+)
+from .sampling import sample_data, reservoir_sample, stratified_sample
+from .pipeline import replay_pipeline
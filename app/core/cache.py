@@ -0,0 +1,379 @@
+"""
+Módulo de caché para resultados costosos
+"""
+import functools
+import hashlib
+import inspect
+import json
+import os
+import threading
+import pandas as pd
+import numpy as np
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Union
+from joblib import dump, load
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:  # pragma: no cover - sin pyarrow DataFrameCache funciona solo en memoria
+    pa = None
+    feather = None
+
+# Errores al escribir en disco que dejan el valor solo en memoria (p.ej. una
+# columna object con tipos mezclados que Arrow no sabe convertir)
+_WRITE_ERRORS = (OSError, ValueError, TypeError) + ((pa.ArrowException,) if pa is not None else ())
+
+# Marca de valor ausente (None puede ser un valor guardado)
+_MISSING = object()
+
+
+def fingerprint_data(data) -> str:
+    """
+    Calcular una huella (hash) rápida del contenido de unos datos
+    
+    Para datos numéricos se hashea directamente la memoria del array, sin
+    copias si ya es contiguo. Para DataFrames con columnas no numéricas se usa
+    el hash por filas de pandas.
+    
+    Args:
+        data: DataFrame o array
+    
+    Returns:
+        Huella hexadecimal de 32 caracteres
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    
+    if isinstance(data, pd.DataFrame):
+        hasher.update(repr(list(data.columns)).encode())
+        if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in data.dtypes):
+            hasher.update(pd.util.hash_pandas_object(data, index=False).values.tobytes())
+            return hasher.hexdigest()
+    
+    array = np.asarray(data)
+    if array.flags.c_contiguous:
+        layout = 'C'
+    elif array.flags.f_contiguous:
+        layout, array = 'F', array.T
+    else:
+        layout, array = 'C', np.ascontiguousarray(array)
+    
+    hasher.update(f"{array.dtype.str}|{array.shape}|{layout}".encode())
+    hasher.update(array)
+    return hasher.hexdigest()
+
+
+def fingerprint_file(source) -> str:
+    """
+    Calcular una huella del contenido de un archivo subido o de una ruta
+    
+    Los archivos subidos se hashean byte a byte (sin copiar el buffer). Las
+    rutas se identifican por ruta absoluta, tamaño y fecha de modificación,
+    para no releer archivos de varios GB solo para calcular la huella.
+    
+    Args:
+        source: Archivo subido (objeto tipo BytesIO) o ruta
+        
+    Returns:
+        Huella hexadecimal de 32 caracteres
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    
+    if isinstance(source, (str, Path)):
+        path = Path(source).resolve()
+        stat = path.stat()
+        hasher.update(f"{path}|{stat.st_size}|{stat.st_mtime_ns}".encode())
+        return hasher.hexdigest()
+    
+    if hasattr(source, 'getbuffer'):
+        hasher.update(source.getbuffer())
+    else:
+        source.seek(0)
+        for block in iter(lambda: source.read(8 * 1024 * 1024), b''):
+            hasher.update(block)
+        source.seek(0)
+    return hasher.hexdigest()
+
+
+class LRUCache:
+    """
+    Caché en memoria con política LRU (menos usado recientemente) y tamaño acotado
+    
+    Las instancias de módulo se comparten entre los hilos de todas las
+    sesiones de Streamlit, así que cada operación se hace bajo un lock.
+    
+    Args:
+        max_entries: Número máximo de entradas antes de expulsar la más antigua
+    """
+    
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Obtener un valor y marcarlo como usado recientemente"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+    
+    def put(self, key: Hashable, value: Any) -> None:
+        """Guardar un valor, expulsando los más antiguos si se supera el límite"""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Vaciar la caché y reiniciar contadores"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ResultCache:
+    """
+    Caché de resultados en dos niveles: LRU en memoria y ficheros en disco
+    
+    Las claves son cadenas hexadecimales (ver cached_result). El nivel de disco
+    guarda un fichero por clave (joblib; ver _write/_read) y, al superar max_disk_mb, borra los
+    menos usados recientemente (por fecha de modificación, que se renueva en
+    cada acierto). Si el directorio no es escribible la caché sigue
+    funcionando solo en memoria. Es segura entre hilos: cada escritura usa un
+    fichero temporal propio del hilo y la limpieza del disco se hace bajo un lock.
+    
+    Args:
+        cache_dir: Directorio del nivel de disco (None = solo memoria)
+        max_entries: Entradas máximas del nivel en memoria
+        max_disk_mb: Tamaño máximo del nivel de disco en MB
+    """
+    
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None, max_entries: int = 32, max_disk_mb: float = 500):
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.max_disk_bytes = int(max_disk_mb * 1024 * 1024)
+        self._memory = LRUCache(max_entries=max_entries)
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+    
+    suffix = '.joblib'
+    
+    def _path(self, key: str) -> Optional[Path]:
+        return self.cache_dir / f"{key}{self.suffix}" if self.cache_dir is not None else None
+    
+    def _write(self, value: Any, path: Path) -> None:
+        dump(value, path)
+    
+    def _read(self, path: Path) -> Any:
+        return load(path)
+    
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        """Buscar en memoria y después en disco (un acierto en disco sube a memoria)"""
+        value = self._memory.get(key, _MISSING)
+        if value is not _MISSING:
+            with self._lock:
+                self.memory_hits += 1
+            return value
+        
+        path = self._path(key)
+        if path is not None and path.exists():
+            try:
+                value = self._read(path)
+                os.utime(path)
+            except Exception:
+                # Fichero corrupto o de una versión incompatible: se descarta
+                path.unlink(missing_ok=True)
+            else:
+                with self._lock:
+                    self.disk_hits += 1
+                self._memory.put(key, value)
+                return value
+        
+        with self._lock:
+            self.misses += 1
+        return default
+    
+    def put(self, key: str, value: Any, disk: bool = True) -> None:
+        """
+        Guardar en memoria y, si disk=True, en disco, aplicando el límite de tamaño del disco
+        
+        Si el valor no se puede escribir en disco se queda solo en memoria.
+        """
+        self._memory.put(key, value)
+        
+        path = self._path(key)
+        if path is None or not disk:
+            return
+        # Temporal propio de este proceso e hilo: dos sesiones pueden escribir la misma clave a la vez
+        temp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._write(value, temp_path)
+            os.replace(temp_path, path)
+            with self._lock:
+                self._evict()
+        except _WRITE_ERRORS:
+            temp_path.unlink(missing_ok=True)
+    
+    def _disk_files(self) -> list:
+        if self.cache_dir is None or not self.cache_dir.exists():
+            return []
+        return [(p, p.stat()) for p in self.cache_dir.glob(f'*{self.suffix}')]
+    
+    def _evict(self) -> None:
+        """Borrar los ficheros más antiguos hasta quedar por debajo de max_disk_bytes"""
+        files = sorted(self._disk_files(), key=lambda item: item[1].st_mtime)
+        total = sum(stat.st_size for _, stat in files)
+        for path, stat in files:
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= stat.st_size
+    
+    def clear(self, disk: bool = True) -> None:
+        """Vaciar la memoria (y el disco si disk=True) y reiniciar contadores"""
+        self._memory.clear()
+        with self._lock:
+            if disk:
+                for path, _ in self._disk_files():
+                    path.unlink(missing_ok=True)
+            self.memory_hits = 0
+            self.disk_hits = 0
+            self.misses = 0
+    
+    def stats(self) -> Dict[str, float]:
+        """
+        Obtener contadores y ocupación de la caché
+        
+        Returns:
+            Dict con memory_hits, disk_hits, misses, hit_rate, memory_entries,
+            disk_entries y disk_mb
+        """
+        with self._lock:
+            files = self._disk_files()
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'memory_entries': len(self._memory),
+            'disk_entries': len(files),
+            'disk_mb': sum(stat.st_size for _, stat in files) / (1024 * 1024)
+        }
+    
+    def __contains__(self, key: str) -> bool:
+        path = self._path(key)
+        return key in self._memory or (path is not None and path.exists())
+
+
+class DataFrameCache(ResultCache):
+    """
+    Caché de DataFrames cuyo nivel en disco son archivos Arrow IPC (Feather)
+    
+    Arrow conserva los tipos optimizados (float32, enteros pequeños,
+    'category') y se lee con memory mapping, así que recuperar un dataset del
+    disco es mucho más rápido que volver a parsear el CSV. df.attrs se guarda
+    en los metadatos del esquema. Sin pyarrow solo se usa el nivel en memoria.
+    
+    Args:
+        cache_dir: Directorio del nivel de disco (None = solo memoria)
+        max_entries: DataFrames máximos en memoria
+        max_disk_mb: Tamaño máximo del nivel de disco en MB
+    """
+    
+    suffix = '.arrow'
+    
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None, max_entries: int = 2, max_disk_mb: float = 2000):
+        super().__init__(cache_dir if feather is not None else None, max_entries, max_disk_mb)
+    
+    def _write(self, value: pd.DataFrame, path: Path) -> None:
+        table = pa.Table.from_pandas(value, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[b'clusterflow_attrs'] = json.dumps(value.attrs, default=str).encode()
+        feather.write_feather(table.replace_schema_metadata(metadata), path)
+    
+    def _read(self, path: Path) -> pd.DataFrame:
+        table = feather.read_table(path, memory_map=True)
+        df = table.to_pandas()
+        df.attrs = json.loads((table.schema.metadata or {}).get(b'clusterflow_attrs', b'{}'))
+        return df
+
+
+def cached_result(
+    cache: ResultCache,
+    ignore: Iterable[str] = (),
+    version: Optional[Callable[[], Hashable]] = None
+) -> Callable:
+    """
+    Decorador que cachea una función cuyo primer argumento son los datos
+    
+    La clave combina el nombre de la función, la huella de los datos y el resto
+    de argumentos (con sus valores por defecto), salvo los indicados en ignore,
+    que no afectan al resultado (p.ej. n_jobs). version se evalúa en cada
+    llamada y también entra en la clave, para que un cambio de código o de
+    ajustes no sirva resultados del nivel en disco calculados antes. La
+    función decorada expone cache_key(*args, **kwargs) para consultar si un
+    resultado ya está guardado.
+    Los resultados devueltos se comparten entre llamadas y no deben modificarse.
+    
+    Args:
+        cache: Caché de resultados a usar
+        ignore: Nombres de argumentos excluidos de la clave
+        version: Función que devuelve la versión de código/ajustes de los resultados
+        
+    Returns:
+        Decorador
+    """
+    ignore = set(ignore)
+    
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        data_arg = next(iter(signature.parameters))
+        
+        def cache_key(*args, **kwargs) -> str:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = {
+                name: value for name, value in bound.arguments.items()
+                if name != data_arg and name not in ignore
+            }
+            hasher = hashlib.blake2b(digest_size=16)
+            hasher.update(f"{func.__module__}.{func.__qualname__}".encode())
+            hasher.update(fingerprint_data(bound.arguments[data_arg]).encode())
+            hasher.update(repr(sorted(params.items())).encode())
+            if version is not None:
+                hasher.update(repr(version()).encode())
+            return hasher.hexdigest()
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = cache_key(*args, **kwargs)
+            result = cache.get(key)
+            if result is None:
+                result = func(*args, **kwargs)
+                cache.put(key, result)
+            return result
+        
+        wrapper.cache_key = cache_key
+        return wrapper
+    
+    return decorator
@@ -1,41 +1,711 @@
 """
 Módulo para algoritmos de clustering
 """
+import os
+import shutil
+import tempfile
+import time
 import pandas as pd
 import numpy as np
-from sklearn.cluster import KMeans, AgglomerativeClustering
+from joblib import Parallel, delayed, dump, load, parallel_config
+from scipy import stats
+from scipy.cluster.hierarchy import linkage as scipy_linkage
+from sklearn.cluster import KMeans, MiniBatchKMeans, DBSCAN, HDBSCAN
 from sklearn.metrics import silhouette_score, davies_bouldin_score, calinski_harabasz_score
-from typing import Dict, Tuple
+from sklearn.neighbors import NearestNeighbors
+from typing import Callable, Dict, List, Optional, Tuple
+from config import settings
+from .cache import LRUCache, ResultCache, cached_result, fingerprint_data
+from .sampling import stratified_indices
 
 
-def determine_optimal_k(data: pd.DataFrame, k_range: Tuple[int, int] = (2, 11)) -> Tuple[int, pd.DataFrame, list]:
+# Linkage usado por cada método jerárquico
+HIERARCHICAL_LINKAGES = {
+    'hierarchical': 'ward',
+    'hierarchical_complete': 'complete',
+    'hierarchical_average': 'average'
+}
+
+# Métodos basados en densidad (etiqueta -1 = ruido; el número de clusters no se fija)
+DENSITY_METHODS = ('dbscan', 'hdbscan')
+NOISE_LABEL = -1
+
+# Árboles de fusión completos por (huella de datos, linkage)
+_linkage_cache = LRUCache(max_entries=settings.LINKAGE_CACHE_MAX_ENTRIES)
+
+# Modelos, labels y métricas del barrido de K por (huella de datos, método, k)
+_sweep_store = LRUCache(max_entries=settings.SWEEP_STORE_MAX_ENTRIES)
+
+# Estimaciones de eps y curvas de k-distancias por (huella de datos, min_samples, muestra, semilla)
+_eps_cache = LRUCache(max_entries=settings.EPS_CACHE_MAX_ENTRIES)
+
+# Resultados completos de determine_optimal_k y perform_clustering, compartidos
+# entre sesiones (memoria + disco en settings.RESULT_CACHE_DIR)
+_result_cache = ResultCache(
+    settings.RESULT_CACHE_DIR,
+    max_entries=settings.RESULT_CACHE_MEMORY_ENTRIES,
+    max_disk_mb=settings.RESULT_CACHE_DISK_MAX_MB
+)
+
+# Ajustes que cambian los resultados guardados en _result_cache
+RESULT_SETTINGS = (
+    'DBSCAN_MIN_SAMPLES', 'EPS_SAMPLE_SIZE', 'HDBSCAN_MIN_CLUSTER_SIZE', 'MINIBATCH_AUTO_THRESHOLD',
+    'MINIBATCH_BATCH_SIZE', 'MINIBATCH_N_INIT', 'SILHOUETTE_CONFIDENCE', 'SILHOUETTE_N_REPEATS',
+    'SILHOUETTE_SAMPLE_SIZE', 'SILHOUETTE_SAMPLE_THRESHOLD'
+)
+
+
+def _result_version() -> Tuple:
+    """Versión de los resultados cacheados: versión del código y valores de RESULT_SETTINGS"""
+    return settings.RESULT_CACHE_VERSION, tuple(getattr(settings, name) for name in RESULT_SETTINGS)
+
+
+def clear_clustering_caches() -> None:
+    """Vaciar los árboles jerárquicos, los modelos del barrido de K, las estimaciones de eps y la caché de resultados"""
+    _linkage_cache.clear()
+    _sweep_store.clear()
+    _eps_cache.clear()
+    _result_cache.clear()
+
+
+def get_result_cache_stats() -> Dict[str, float]:
+    """
+    Obtener aciertos, fallos y ocupación de la caché de resultados
+    
+    Returns:
+        Dict devuelto por ResultCache.stats
+    """
+    return _result_cache.stats()
+
+
+def _resolve_n_jobs(n_jobs: Optional[int], n_tasks: int) -> int:
+    """
+    Traducir n_jobs (estilo scikit-learn) a un número concreto de procesos
+    
+    Args:
+        n_jobs: Número de procesos (None o 1 = serie, -1 = todos los núcleos)
+        n_tasks: Número de tareas a repartir
+        
+    Returns:
+        Número de procesos a usar (nunca mayor que el número de tareas)
+    """
+    cpu_count = os.cpu_count() or 1
+    if n_jobs is None or n_jobs == 0:
+        n_jobs = 1
+    elif n_jobs < 0:
+        n_jobs = max(1, cpu_count + 1 + n_jobs)
+    return max(1, min(n_jobs, n_tasks))
+
+
+def sampled_silhouette(
+    data,
+    labels: np.ndarray,
+    sample_size: Optional[int] = None,
+    n_repeats: Optional[int] = None,
+    confidence: Optional[float] = None,
+    random_state: int = 42
+) -> Dict:
+    """
+    Estimar el Silhouette Score sobre submuestras estratificadas
+    
+    silhouette_score es O(n²) en tiempo y memoria. Esta función lo evalúa en
+    n_repeats submuestras estratificadas por etiqueta y devuelve la media con
+    su intervalo de confianza (t de Student).
+    
+    Args:
+        data: DataFrame o array con datos escalados
+        labels: Etiquetas de cluster
+        sample_size: Filas por submuestra (por defecto settings.SILHOUETTE_SAMPLE_SIZE)
+        n_repeats: Número de submuestras (por defecto settings.SILHOUETTE_N_REPEATS)
+        confidence: Nivel de confianza del intervalo (por defecto settings.SILHOUETTE_CONFIDENCE)
+        random_state: Semilla para reproducibilidad
+        
+    Returns:
+        Dict con mean, std, ci_low, ci_high, sample_size y n_repeats
+    """
+    sample_size = sample_size or settings.SILHOUETTE_SAMPLE_SIZE
+    n_repeats = n_repeats or settings.SILHOUETTE_N_REPEATS
+    confidence = confidence or settings.SILHOUETTE_CONFIDENCE
+    
+    data_array = np.asarray(data)
+    labels = np.asarray(labels)
+    rng = np.random.default_rng(random_state)
+    
+    scores = []
+    for _ in range(n_repeats):
+        idx = stratified_indices(labels, sample_size, rng)
+        scores.append(silhouette_score(data_array[idx], labels[idx]))
+    scores = np.array(scores)
+    
+    mean = float(scores.mean())
+    std = float(scores.std(ddof=1)) if n_repeats > 1 else 0.0
+    if n_repeats > 1 and std > 0:
+        margin = stats.t.ppf((1 + confidence) / 2, df=n_repeats - 1) * std / np.sqrt(n_repeats)
+    else:
+        margin = 0.0
+    
+    return {
+        'mean': mean,
+        'std': std,
+        'ci_low': mean - margin,
+        'ci_high': mean + margin,
+        'sample_size': min(sample_size, len(labels)),
+        'n_repeats': n_repeats
+    }
+
+
+def compute_silhouette(data, labels: np.ndarray, sample_threshold: Optional[int] = None) -> Tuple[float, Optional[Dict]]:
+    """
+    Calcular el Silhouette Score exacto o muestreado según el tamaño de los datos
+    
+    Args:
+        data: DataFrame o array con datos escalados
+        labels: Etiquetas de cluster
+        sample_threshold: Filas a partir de las cuales se estima por muestreo
+            (por defecto settings.SILHOUETTE_SAMPLE_THRESHOLD)
+        
+    Returns:
+        Tuple[silhouette, info de la estimación o None si es exacto]
+    """
+    if sample_threshold is None:
+        sample_threshold = settings.SILHOUETTE_SAMPLE_THRESHOLD
+    
+    if len(labels) > sample_threshold:
+        estimate = sampled_silhouette(data, labels)
+        return estimate['mean'], estimate
+    
+    return silhouette_score(data, labels), None
+
+
+def get_linkage_tree(data, linkage: str = 'ward', fingerprint: Optional[str] = None) -> np.ndarray:
+    """
+    Obtener el árbol de fusión aglomerativo completo, calculándolo una sola vez
+    
+    Construir el árbol es O(n²); se guarda en caché por (huella de datos,
+    linkage) para que cualquier número de clusters se obtenga cortándolo.
+    
+    Args:
+        data: DataFrame o array con datos escalados
+        linkage: Criterio de enlace ('ward', 'complete', 'average')
+        fingerprint: Huella de los datos si ya se conoce (evita recalcularla)
+        
+    Returns:
+        Matriz de enlace de SciPy con forma (n-1, 4)
+    """
+    key = (fingerprint or fingerprint_data(data), linkage)
+    linkage_matrix = _linkage_cache.get(key)
+    if linkage_matrix is None:
+        linkage_matrix = scipy_linkage(np.asarray(data, dtype=np.float64), method=linkage, metric='euclidean')
+        _linkage_cache.put(key, linkage_matrix)
+    return linkage_matrix
+
+
+def cut_linkage_tree(linkage_matrix: np.ndarray, n_clusters: int) -> np.ndarray:
+    """
+    Cortar un árbol de fusión para obtener exactamente n_clusters grupos
+    
+    Se aplican las primeras n - n_clusters fusiones y cada hoja se asigna a su
+    raíz mediante saltos de punteros vectorizados (O(n log n)).
+    
+    Args:
+        linkage_matrix: Matriz de enlace de SciPy
+        n_clusters: Número de clusters deseado
+        
+    Returns:
+        Array de etiquetas 0..n_clusters-1
+    """
+    n_samples = linkage_matrix.shape[0] + 1
+    if not 1 <= n_clusters <= n_samples:
+        raise ValueError(f"n_clusters debe estar entre 1 y {n_samples}, no {n_clusters}")
+    
+    n_merges = n_samples - n_clusters
+    parent = np.arange(2 * n_samples - 1)
+    merged = linkage_matrix[:n_merges, :2].astype(np.intp)
+    new_nodes = np.arange(n_samples, n_samples + n_merges)
+    parent[merged[:, 0]] = new_nodes
+    parent[merged[:, 1]] = new_nodes
+    
+    while True:
+        grandparent = parent[parent]
+        if np.array_equal(grandparent, parent):
+            break
+        parent = grandparent
+    
+    _, labels = np.unique(parent[:n_samples], return_inverse=True)
+    return labels
+
+
+def _neighbor_algorithm(n_features: int) -> str:
+    """
+    Elegir el índice de vecinos según la dimensionalidad
+    
+    Args:
+        n_features: Número de variables
+        
+    Returns:
+        'kd_tree' en baja dimensión, 'ball_tree' en el resto
+    """
+    return 'kd_tree' if n_features <= settings.KDTREE_MAX_FEATURES else 'ball_tree'
+
+
+def estimate_eps(
+    data,
+    min_samples: Optional[int] = None,
+    sample_size: Optional[int] = None,
+    random_state: int = 42,
+    fingerprint: Optional[str] = None
+) -> Tuple[float, np.ndarray]:
+    """
+    Estimar eps para DBSCAN a partir de la curva de k-distancias muestreada
+    
+    Se indexan todos los puntos en un KD-tree/Ball-tree y solo se consultan los
+    vecinos de una muestra, sin construir una matriz de distancias densa. eps
+    es el codo de la curva ordenada de distancias al min_samples-ésimo vecino
+    (punto de máxima distancia a la recta que une sus extremos). El resultado
+    se guarda en caché por (huella de datos, min_samples, sample_size,
+    random_state) para no repetir la búsqueda de vecinos en cada recarga.
+    
+    Args:
+        data: DataFrame o array con datos escalados
+        min_samples: Vecinos para la k-distancia (por defecto settings.DBSCAN_MIN_SAMPLES)
+        sample_size: Puntos consultados (por defecto settings.EPS_SAMPLE_SIZE)
+        random_state: Semilla para reproducibilidad
+        fingerprint: Huella de los datos si ya se conoce (evita recalcularla)
+        
+    Returns:
+        Tuple[eps estimado, curva de k-distancias ordenada]
+    """
+    min_samples = min_samples or settings.DBSCAN_MIN_SAMPLES
+    sample_size = sample_size or settings.EPS_SAMPLE_SIZE
+    key = (fingerprint or fingerprint_data(data), min_samples, sample_size, random_state)
+    cached = _eps_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    data_array = np.asarray(data)
+    n_samples = len(data_array)
+    
+    if n_samples <= min_samples:
+        raise ValueError(f"Se necesitan más de {min_samples} filas para estimar eps")
+    
+    rng = np.random.default_rng(random_state)
+    query_idx = rng.choice(n_samples, size=min(sample_size, n_samples), replace=False)
+    
+    # El propio punto cuenta como vecino, igual que en min_samples de DBSCAN
+    nn = NearestNeighbors(n_neighbors=min_samples, algorithm=_neighbor_algorithm(data_array.shape[1]))
+    nn.fit(data_array)
+    distances, _ = nn.kneighbors(data_array[query_idx])
+    k_distances = np.sort(distances[:, -1])
+    
+    result = (_k_distance_knee(k_distances), k_distances)
+    _eps_cache.put(key, result)
+    return result
+
+
+def _k_distance_knee(k_distances: np.ndarray) -> float:
+    """Codo de la curva ordenada: máxima distancia entre la curva normalizada y la recta entre extremos"""
+    span = k_distances[-1] - k_distances[0]
+    if span == 0 or len(k_distances) < 3:
+        return float(k_distances[-1]) or 1e-6
+    x = np.linspace(0, 1, len(k_distances))
+    y = (k_distances - k_distances[0]) / span
+    knee = int(np.argmax(x - y))
+    return float(k_distances[knee]) or float(k_distances[k_distances > 0][0])
+
+
+def _calinski_harabasz(data, labels: np.ndarray) -> float:
+    """
+    Calinski-Harabasz en float64
+    
+    Es la única métrica que acumula sumas de cuadrados sobre todas las filas;
+    en float32 pierde precisión con muchos puntos, así que solo aquí se
+    convierten los datos a float64.
+    """
+    return calinski_harabasz_score(np.asarray(data, dtype=np.float64), labels)
+
+
+def _cluster_metrics(data, labels: np.ndarray) -> Dict:
+    """
+    Calcular las métricas de calidad ignorando los puntos de ruido
+    
+    Args:
+        data: DataFrame o array con datos escalados
+        labels: Etiquetas de cluster (NOISE_LABEL = ruido)
+        
+    Returns:
+        Dict con silhouette, silhouette_info, davies_bouldin y calinski_harabasz.
+        Si quedan menos de 2 clusters las métricas son NaN
+    """
+    mask = labels != NOISE_LABEL
+    if not mask.all():
+        data = np.asarray(data)[mask]
+        labels = labels[mask]
+    
+    n_found = len(np.unique(labels))
+    if n_found < 2 or n_found >= len(labels):
+        return {
+            'silhouette': np.nan,
+            'silhouette_info': None,
+            'davies_bouldin': np.nan,
+            'calinski_harabasz': np.nan
+        }
+    
+    silhouette, silhouette_info = compute_silhouette(data, labels)
+    return {
+        'silhouette': silhouette,
+        'silhouette_info': silhouette_info,
+        'davies_bouldin': davies_bouldin_score(data, labels),
+        'calinski_harabasz': _calinski_harabasz(data, labels)
+    }
+
+
+def resolve_clustering_method(method: str, n_rows: int) -> str:
+    """
+    Resolver el método de clustering efectivo según el tamaño de los datos
+    
+    'kmeans' pasa automáticamente a 'minibatch_kmeans' por encima de
+    settings.MINIBATCH_AUTO_THRESHOLD filas. Los métodos desconocidos se
+    tratan como 'kmeans'.
+    
+    Args:
+        method: Método solicitado
+        n_rows: Número de filas de los datos
+        
+    Returns:
+        Nombre del método que se usará realmente
+    """
+    if method not in settings.AVAILABLE_CLUSTERING_METHODS:
+        method = 'kmeans'
+    if method == 'kmeans' and n_rows > settings.MINIBATCH_AUTO_THRESHOLD:
+        method = 'minibatch_kmeans'
+    return method
+
+
+def _make_kmeans(
+    n_clusters: int,
+    method: str,
+    n_init: int,
+    max_iter: int,
+    batch_size: Optional[int] = None,
+    init='k-means++'
+):
+    """
+    Crear un modelo KMeans o MiniBatchKMeans con semilla fija
+    
+    Args:
+        n_clusters: Número de clusters
+        method: 'kmeans' o 'minibatch_kmeans'
+        n_init: Número de inicializaciones
+        max_iter: Máximo de iteraciones (en MiniBatchKMeans, pasadas sobre los datos)
+        batch_size: Tamaño de lote para MiniBatchKMeans (por defecto settings.MINIBATCH_BATCH_SIZE)
+        init: 'k-means++' o array de centroides iniciales (arranque en caliente)
+        
+    Returns:
+        Modelo sin ajustar
+    """
+    if method == 'minibatch_kmeans':
+        return MiniBatchKMeans(
+            n_clusters=n_clusters,
+            init=init,
+            random_state=42,
+            n_init=n_init,
+            max_iter=max_iter,
+            batch_size=batch_size or settings.MINIBATCH_BATCH_SIZE
+        )
+    return KMeans(n_clusters=n_clusters, init=init, random_state=42, n_init=n_init, max_iter=max_iter)
+
+
+def _evaluate_k(
+    data: np.ndarray,
+    k: int,
+    silhouette_threshold: Optional[int] = None,
+    method: str = 'kmeans',
+    batch_size: Optional[int] = None,
+    n_init: Optional[int] = None
+) -> Dict:
+    """
+    Ajustar KMeans para un valor de k y calcular sus métricas
+    
+    Args:
+        data: Array con datos escalados
+        k: Número de clusters
+        silhouette_threshold: Filas a partir de las cuales el Silhouette se estima
+        method: 'kmeans' o 'minibatch_kmeans'
+        batch_size: Tamaño de lote para MiniBatchKMeans
+        n_init: Número de inicializaciones (por defecto 10 en KMeans y
+            settings.MINIBATCH_N_INIT en MiniBatchKMeans)
+        
+    Returns:
+        Dict con k, inercia, métricas de calidad, modelo ajustado y labels
+    """
+    if method == 'minibatch_kmeans':
+        kmeans = _make_kmeans(k, method, n_init or settings.MINIBATCH_N_INIT, 100, batch_size)
+    else:
+        kmeans = _make_kmeans(k, method, n_init or 10, 300)
+    start = time.perf_counter()
+    labels = kmeans.fit_predict(data)
+    fit_time = time.perf_counter() - start
+    
+    return _score_k(data, k, kmeans, labels, silhouette_threshold, fit_time)
+
+
+def _score_k(
+    data: np.ndarray,
+    k: int,
+    kmeans,
+    labels: np.ndarray,
+    silhouette_threshold: Optional[int],
+    fit_time: float
+) -> Dict:
+    """
+    Calcular las métricas de un modelo ya ajustado del barrido de K
+    
+    Args:
+        data: Array con datos escalados
+        k: Número de clusters
+        kmeans: Modelo KMeans/MiniBatchKMeans ajustado
+        labels: Etiquetas del modelo
+        silhouette_threshold: Filas a partir de las cuales el Silhouette se estima
+        fit_time: Segundos empleados en el ajuste
+        
+    Returns:
+        Dict con k, inercia, métricas de calidad, iteraciones, modelo ajustado y labels
+    """
+    silhouette, silhouette_info = compute_silhouette(data, labels, silhouette_threshold)
+    
+    return {
+        'k': k,
+        'inertia': kmeans.inertia_,
+        'silhouette': silhouette,
+        'silhouette_info': silhouette_info,
+        'davies_bouldin': davies_bouldin_score(data, labels),
+        'calinski_harabasz': _calinski_harabasz(data, labels),
+        'n_iter': kmeans.n_iter_,
+        'fit_time': fit_time,
+        'model': kmeans,
+        'labels': labels
+    }
+
+
+def _next_k_centers(
+    data: np.ndarray,
+    kmeans,
+    strategy: str,
+    rng: np.random.Generator,
+    max_split_samples: int = 10_000
+) -> np.ndarray:
+    """
+    Proponer k+1 centroides iniciales a partir de una solución con k clusters
+    
+    Args:
+        data: Array con datos escalados
+        kmeans: Modelo ajustado con k clusters
+        strategy: 'split' divide el cluster con mayor SSE a lo largo de su eje
+            principal; 'kmeans++' añade un centroide muestreado con probabilidad
+            proporcional a la distancia² al centroide más cercano
+        rng: Generador de números aleatorios
+        max_split_samples: Máximo de puntos usados para estimar el eje principal
+        
+    Returns:
+        Array (k+1, n_features) con los centroides iniciales
+    """
+    centers = kmeans.cluster_centers_
+    distances = kmeans.transform(data)
+    labels = distances.argmin(axis=1)
+    sq_dist = distances[np.arange(len(data)), labels] ** 2
+    
+    if strategy == 'split':
+        sse = np.bincount(labels, weights=sq_dist, minlength=len(centers))
+        worst = int(sse.argmax())
+        members = data[labels == worst]
+        if len(members) > max_split_samples:
+            members = members[rng.choice(len(members), max_split_samples, replace=False)]
+        
+        if len(members) > 1:
+            _, singular_values, vt = np.linalg.svd(members - centers[worst], full_matrices=False)
+            # Las medias de las dos mitades de una normal están a ±sqrt(2/π)·σ
+            offset = vt[0] * singular_values[0] / np.sqrt(len(members)) * np.sqrt(2 / np.pi)
+            if np.any(offset):
+                new_centers = centers.copy()
+                new_centers[worst] = centers[worst] + offset
+                return np.vstack([new_centers, centers[worst] - offset])
+    
+    # k-means++: nuevo centroide con probabilidad proporcional a la distancia²
+    if sq_dist.sum() == 0:
+        new_center = data[rng.integers(len(data))]
+    else:
+        new_center = data[rng.choice(len(data), p=sq_dist / sq_dist.sum())]
+    return np.vstack([centers, new_center])
+
+
+def _incremental_sweep(
+    data: np.ndarray,
+    k_values: list,
+    silhouette_threshold: Optional[int],
+    method: str = 'kmeans',
+    batch_size: Optional[int] = None,
+    n_init: Optional[int] = None,
+    strategy: str = 'split'
+) -> list:
+    """
+    Barrido de K incremental: cada k+1 arranca desde la solución de k
+    
+    Solo el primer k se ajusta en frío (con n_init reinicios); los siguientes
+    parten de los centroides anteriores más uno nuevo y usan un único arranque.
+    
+    Args:
+        data: Array con datos escalados
+        k_values: Valores consecutivos de k
+        silhouette_threshold: Filas a partir de las cuales el Silhouette se estima
+        method: 'kmeans' o 'minibatch_kmeans'
+        batch_size: Tamaño de lote para MiniBatchKMeans
+        n_init: Reinicios del primer k
+        strategy: 'split' o 'kmeans++' (ver _next_k_centers)
+        
+    Returns:
+        Lista de dicts de resultados por k (mismo formato que _evaluate_k)
+    """
+    rng = np.random.default_rng(42)
+    max_iter = 100 if method == 'minibatch_kmeans' else 300
+    results = [_evaluate_k(data, k_values[0], silhouette_threshold, method, batch_size, n_init)]
+    
+    for k in k_values[1:]:
+        init = _next_k_centers(data, results[-1]['model'], strategy, rng)
+        kmeans = _make_kmeans(k, method, 1, max_iter, batch_size, init=init)
+        start = time.perf_counter()
+        labels = kmeans.fit_predict(data)
+        fit_time = time.perf_counter() - start
+        results.append(_score_k(data, k, kmeans, labels, silhouette_threshold, fit_time))
+    
+    return results
+
+
+def determine_optimal_k(
+    data: pd.DataFrame,
+    k_range: Tuple[int, int] = (2, 11),
+    n_jobs: Optional[int] = 1,
+    blas_threads: Optional[int] = None,
+    method: str = 'kmeans',
+    batch_size: Optional[int] = None,
+    n_init: Optional[int] = None,
+    sweep_mode: str = 'cold'
+) -> Tuple[int, pd.DataFrame, list]:
     """
     Determinar número óptimo de clusters usando múltiples métricas
     
+    Cada valor de k es independiente, por lo que con n_jobs > 1 se evalúan en
+    un pool de procesos. Cada k usa la misma semilla, así que el resultado es
+    idéntico al de la ejecución en serie.
+    
+    Los modelos, labels y métricas de cada k se guardan en un almacén acotado
+    por huella de datos; un barrido repetido no reajusta los k ya evaluados y
+    perform_clustering puede partir del modelo guardado. El barrido completo
+    se guarda además en la caché de resultados; si se sirve desde ahí (p.ej.
+    desde disco tras reiniciar) sus modelos se devuelven al almacén.
+    
+    Con sweep_mode incremental cada k+1 arranca desde la solución de k
+    (dividiendo el peor cluster o añadiendo un centroide k-means++), lo que
+    reduce reinicios e iteraciones de Lloyd a cambio de un barrido secuencial.
+    
     Args:
         data: DataFrame con datos escalados
         k_range: Tuple con (k_min, k_max) para evaluar
+        n_jobs: Procesos para el barrido (1 = serie, -1 = todos los núcleos)
+        blas_threads: Hilos BLAS/OpenMP por proceso. Si None, se reparten los
+            núcleos entre los procesos para no sobresuscribir la CPU
+        method: 'kmeans' o 'minibatch_kmeans' (se cambia solo a MiniBatch con datos grandes)
+        batch_size: Tamaño de lote para MiniBatchKMeans
+        n_init: Número de inicializaciones por k
+        sweep_mode: 'cold' (cada k independiente), 'incremental_split' o
+            'incremental_kmeanspp' (ver settings.AVAILABLE_SWEEP_MODES)
         
     Returns:
         Tuple[k óptimo, DataFrame con métricas, lista de reducciones de inercia]
     """
+    sweep = _sweep_k(data, k_range, n_jobs, blas_threads, method, batch_size, n_init, sweep_mode)
+    for k_result in sweep['k_results']:
+        key = (sweep['fingerprint'], sweep['method'], k_result['k'])
+        if key not in _sweep_store:
+            _sweep_store.put(key, {'params': sweep['params'], 'result': k_result})
+    return sweep['result']
+
+
+@cached_result(_result_cache, ignore=('n_jobs', 'blas_threads'), version=_result_version)
+def _sweep_k(
+    data: pd.DataFrame,
+    k_range: Tuple[int, int],
+    n_jobs: Optional[int],
+    blas_threads: Optional[int],
+    method: str,
+    batch_size: Optional[int],
+    n_init: Optional[int],
+    sweep_mode: str
+) -> Dict:
+    """
+    Barrido de K de determine_optimal_k (cacheado)
+    
+    Returns:
+        Dict con result (tupla de determine_optimal_k) y, para rellenar el
+        almacén del barrido, fingerprint, method, params y k_results
+    """
     if len(data) < k_range[0]:
         raise ValueError(f"No hay suficientes datos ({len(data)}) para el número mínimo de clusters ({k_range[0]})")
     
     K_range = range(k_range[0], k_range[1])
-    inertias = []
-    silhouette_scores = []
-    davies_bouldin_scores = []
-    calinski_harabasz_scores = []
+    data_array = np.asarray(data)
+    silhouette_threshold = settings.SILHOUETTE_SAMPLE_THRESHOLD
+    method = resolve_clustering_method(method, len(data_array))
+    if method not in ('kmeans', 'minibatch_kmeans'):
+        raise ValueError(f"El barrido de K solo admite 'kmeans' o 'minibatch_kmeans', no '{method}'")
+    if sweep_mode not in settings.AVAILABLE_SWEEP_MODES:
+        raise ValueError(f"Modo de barrido desconocido: '{sweep_mode}'")
     
+    # Reutilizar los k ya evaluados con los mismos parámetros
+    fingerprint = fingerprint_data(data)
+    sweep_params = {
+        'n_init': n_init,
+        'batch_size': batch_size,
+        'silhouette_threshold': silhouette_threshold,
+        'sweep_mode': sweep_mode
+    }
+    stored_results = {}
     for k in K_range:
-        kmeans = KMeans(n_clusters=k, random_state=42, n_init=10, max_iter=300)
-        labels = kmeans.fit_predict(data)
-        
-        inertias.append(kmeans.inertia_)
-        silhouette_scores.append(silhouette_score(data, labels))
-        davies_bouldin_scores.append(davies_bouldin_score(data, labels))
-        calinski_harabasz_scores.append(calinski_harabasz_score(data, labels))
+        stored = _sweep_store.get((fingerprint, method, k))
+        if stored is not None and stored['params'] == sweep_params:
+            stored_results[k] = stored['result']
+    pending_k = [k for k in K_range if k not in stored_results]
+    n_workers = _resolve_n_jobs(n_jobs, len(pending_k))
+    
+    if sweep_mode != 'cold':
+        # Cada k depende del anterior: la cadena se recalcula completa y en serie
+        strategy = 'split' if sweep_mode == 'incremental_split' else 'kmeans++'
+        new_results = _incremental_sweep(
+            data_array, list(K_range), silhouette_threshold, method, batch_size, n_init, strategy
+        ) if pending_k else []
+    elif n_workers > 1:
+        if blas_threads is None:
+            blas_threads = max(1, (os.cpu_count() or 1) // n_workers)
+        with parallel_config(backend='loky', inner_max_num_threads=blas_threads):
+            new_results = Parallel(n_jobs=n_workers)(
+                delayed(_evaluate_k)(data_array, k, silhouette_threshold, method, batch_size, n_init)
+                for k in pending_k
+            )
+    else:
+        new_results = [
+            _evaluate_k(data_array, k, silhouette_threshold, method, batch_size, n_init)
+            for k in pending_k
+        ]
+    
+    for result in new_results:
+        _sweep_store.put((fingerprint, method, result['k']), {'params': sweep_params, 'result': result})
+        stored_results[result['k']] = result
+    k_results = [stored_results[k] for k in K_range]
+    
+    inertias = [r['inertia'] for r in k_results]
+    silhouette_scores = [r['silhouette'] for r in k_results]
+    davies_bouldin_scores = [r['davies_bouldin'] for r in k_results]
+    calinski_harabasz_scores = [r['calinski_harabasz'] for r in k_results]
+    silhouette_infos = [r['silhouette_info'] for r in k_results]
     
     # Calcular score compuesto
     metrics_df = pd.DataFrame({
@@ -43,9 +713,15 @@ def determine_optimal_k(data: pd.DataFrame, k_range: Tuple[int, int] = (2, 11))
         'Silhouette': silhouette_scores,
         'Davies-Bouldin': davies_bouldin_scores,
         'Calinski-Harabasz': calinski_harabasz_scores,
-        'Inercia': inertias
+        'Inercia': inertias,
+        'Iteraciones': [r['n_iter'] for r in k_results]
     })
     
+    # Intervalo de confianza del Silhouette (NaN si se calculó de forma exacta)
+    metrics_df['Silhouette_Estimado'] = [info is not None for info in silhouette_infos]
+    metrics_df['Silhouette_IC_Inf'] = [info['ci_low'] if info else np.nan for info in silhouette_infos]
+    metrics_df['Silhouette_IC_Sup'] = [info['ci_high'] if info else np.nan for info in silhouette_infos]
+    
     # Normalizar métricas (con manejo de división por cero)
     def safe_normalize(series):
         range_val = series.max() - series.min()
@@ -80,55 +756,398 @@ def determine_optimal_k(data: pd.DataFrame, k_range: Tuple[int, int] = (2, 11))
     # Seleccionar k óptimo
     optimal_k = int(metrics_filtered.loc[metrics_filtered['Score_Compuesto'].idxmax(), 'k'])
     
-    return optimal_k, metrics_df, inertia_reduction
+    return {
+        'result': (optimal_k, metrics_df, inertia_reduction),
+        'fingerprint': fingerprint,
+        'method': method,
+        'params': sweep_params,
+        'k_results': k_results
+    }
 
 
-def perform_clustering(data: pd.DataFrame, n_clusters: int, method: str = 'kmeans') -> Dict:
+def compare_sweep_modes(
+    data: pd.DataFrame,
+    k_range: Tuple[int, int] = (2, 11),
+    sweep_mode: str = 'incremental_split',
+    method: str = 'kmeans',
+    batch_size: Optional[int] = None,
+    n_init: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Comparar el barrido de K en frío con el barrido incremental
+    
+    Ejecuta ambos barridos desde cero (sin usar el almacén de modelos) y
+    reporta, para cada k, inercia, Silhouette, iteraciones y tiempo de ajuste.
+    Las iteraciones del barrido en frío son las del mejor de sus n_init
+    reinicios; el tiempo incluye todos los reinicios.
+    
+    Args:
+        data: DataFrame con datos escalados
+        k_range: Tuple con (k_min, k_max) para evaluar
+        sweep_mode: 'incremental_split' o 'incremental_kmeanspp'
+        method: 'kmeans' o 'minibatch_kmeans'
+        batch_size: Tamaño de lote para MiniBatchKMeans
+        n_init: Número de inicializaciones del barrido en frío
+        
+    Returns:
+        DataFrame con una fila por k y columnas *_Frio / *_Incremental
+    """
+    if sweep_mode not in ('incremental_split', 'incremental_kmeanspp'):
+        raise ValueError(f"sweep_mode debe ser incremental, no '{sweep_mode}'")
+    
+    data_array = np.asarray(data)
+    method = resolve_clustering_method(method, len(data_array))
+    k_values = list(range(k_range[0], k_range[1]))
+    silhouette_threshold = settings.SILHOUETTE_SAMPLE_THRESHOLD
+    strategy = 'split' if sweep_mode == 'incremental_split' else 'kmeans++'
+    
+    cold = [_evaluate_k(data_array, k, silhouette_threshold, method, batch_size, n_init) for k in k_values]
+    incremental = _incremental_sweep(data_array, k_values, silhouette_threshold, method, batch_size, n_init, strategy)
+    
+    comparison = pd.DataFrame({
+        'k': k_values,
+        'Inercia_Frio': [r['inertia'] for r in cold],
+        'Inercia_Incremental': [r['inertia'] for r in incremental],
+        'Silhouette_Frio': [r['silhouette'] for r in cold],
+        'Silhouette_Incremental': [r['silhouette'] for r in incremental],
+        'Iteraciones_Frio': [r['n_iter'] for r in cold],
+        'Iteraciones_Incremental': [r['n_iter'] for r in incremental],
+        'Tiempo_Frio_s': [r['fit_time'] for r in cold],
+        'Tiempo_Incremental_s': [r['fit_time'] for r in incremental]
+    })
+    comparison['Inercia_Dif_Pct'] = (
+        (comparison['Inercia_Incremental'] - comparison['Inercia_Frio']) / comparison['Inercia_Frio'] * 100
+    )
+    
+    return comparison
+
+
+@cached_result(_result_cache, ignore=('n_jobs',), version=_result_version)
+def perform_clustering(
+    data: pd.DataFrame,
+    n_clusters: int,
+    method: str = 'kmeans',
+    batch_size: Optional[int] = None,
+    n_init: Optional[int] = None,
+    eps: Optional[float] = None,
+    min_samples: Optional[int] = None,
+    min_cluster_size: Optional[int] = None,
+    n_jobs: Optional[int] = None
+) -> Dict:
     """
     Realizar clustering con el método especificado
     
+    Los métodos de densidad ('dbscan', 'hdbscan') ignoran n_clusters, usan
+    búsquedas de vecinos con KD-tree/Ball-tree y etiquetan el ruido con -1.
+    
     Args:
         data: DataFrame con datos escalados
         n_clusters: Número de clusters a formar
-        method: Método de clustering ('kmeans', 'hierarchical', 'hierarchical_complete', 'hierarchical_average')
+        method: Método de clustering ('kmeans', 'minibatch_kmeans', 'hierarchical',
+            'hierarchical_complete', 'hierarchical_average', 'dbscan', 'hdbscan')
+        batch_size: Tamaño de lote para MiniBatchKMeans (por defecto settings.MINIBATCH_BATCH_SIZE)
+        n_init: Número de inicializaciones de K-Means/MiniBatch (por defecto 20 y
+            settings.MINIBATCH_N_INIT respectivamente)
+        eps: Radio de vecindad de DBSCAN (None = estimado con estimate_eps)
+        min_samples: Vecinos mínimos de un punto núcleo (DBSCAN/HDBSCAN,
+            por defecto settings.DBSCAN_MIN_SAMPLES)
+        min_cluster_size: Tamaño mínimo de cluster en HDBSCAN
+            (por defecto settings.HDBSCAN_MIN_CLUSTER_SIZE)
+        n_jobs: Procesos de la búsqueda de vecinos de DBSCAN/HDBSCAN
+            (por defecto settings.N_JOBS; 1 dentro de los procesos de compare_methods)
         
     Returns:
-        Dict con modelo, labels, métricas y distribución
+        Dict con modelo, labels, métricas, distribución y método usado. En los
+        métodos jerárquicos 'model' es None y el árbol se devuelve en 'linkage_matrix'.
+        'from_sweep' indica si se partió de un modelo guardado por determine_optimal_k.
+        En los métodos de densidad se añaden 'eps', 'noise_count' y 'noise_pct'
     """
-    if method == 'kmeans':
-        model = KMeans(n_clusters=n_clusters, random_state=42, n_init=20, max_iter=500)
-    elif method == 'hierarchical':
-        model = AgglomerativeClustering(n_clusters=n_clusters, linkage='ward')
-    elif method == 'hierarchical_complete':
-        model = AgglomerativeClustering(n_clusters=n_clusters, linkage='complete')
-    elif method == 'hierarchical_average':
-        model = AgglomerativeClustering(n_clusters=n_clusters, linkage='average')
-    else:
-        model = KMeans(n_clusters=n_clusters, random_state=42, n_init=20, max_iter=500)
+    method = resolve_clustering_method(method, len(data))
+    fingerprint = fingerprint_data(data)
+    linkage_matrix = None
+    stored = None
     
-    labels = model.fit_predict(data)
+    if method == 'dbscan':
+        min_samples = min_samples or settings.DBSCAN_MIN_SAMPLES
+        if eps is None:
+            eps, _ = estimate_eps(data, min_samples, fingerprint=fingerprint)
+        model = DBSCAN(
+            eps=eps,
+            min_samples=min_samples,
+            algorithm=_neighbor_algorithm(np.asarray(data).shape[1]),
+            n_jobs=n_jobs or settings.N_JOBS
+        )
+        labels = model.fit_predict(data)
+    elif method == 'hdbscan':
+        model = HDBSCAN(
+            min_cluster_size=min_cluster_size or settings.HDBSCAN_MIN_CLUSTER_SIZE,
+            min_samples=min_samples or settings.DBSCAN_MIN_SAMPLES,
+            algorithm='auto',
+            n_jobs=n_jobs or settings.N_JOBS
+        )
+        labels = model.fit_predict(data)
+    elif method in HIERARCHICAL_LINKAGES:
+        # El árbol completo se reutiliza entre llamadas; solo se corta para cada k
+        model = None
+        linkage_matrix = get_linkage_tree(data, HIERARCHICAL_LINKAGES[method], fingerprint)
+        labels = cut_linkage_tree(linkage_matrix, n_clusters)
+    else:
+        # Arranque en caliente desde el modelo del barrido de K, si existe
+        if n_init is None and batch_size is None:
+            stored = _sweep_store.get((fingerprint, method, n_clusters))
+        
+        if stored is not None:
+            init = stored['result']['model'].cluster_centers_
+            model = _make_kmeans(n_clusters, method, 1, 500 if method == 'kmeans' else 100, init=init)
+        elif method == 'minibatch_kmeans':
+            model = _make_kmeans(n_clusters, method, n_init or settings.MINIBATCH_N_INIT, 100, batch_size)
+        else:
+            model = _make_kmeans(n_clusters, 'kmeans', n_init or 20, 500)
+        labels = model.fit_predict(data)
     
-    # Calcular métricas
-    silhouette = silhouette_score(data, labels)
-    davies_bouldin = davies_bouldin_score(data, labels)
-    calinski_harabasz = calinski_harabasz_score(data, labels)
+    # Calcular métricas (si el arranque en caliente no movió ninguna etiqueta, se reutilizan)
+    if stored is not None and np.array_equal(labels, stored['result']['labels']):
+        silhouette = stored['result']['silhouette']
+        silhouette_info = stored['result']['silhouette_info']
+        davies_bouldin = stored['result']['davies_bouldin']
+        calinski_harabasz = stored['result']['calinski_harabasz']
+    else:
+        metrics = _cluster_metrics(data, labels)
+        silhouette = metrics['silhouette']
+        silhouette_info = metrics['silhouette_info']
+        davies_bouldin = metrics['davies_bouldin']
+        calinski_harabasz = metrics['calinski_harabasz']
     
-    # Calcular distribución
+    # Calcular distribución (el ruido aparece como -1 pero no cuenta como cluster)
     distribution = pd.Series(labels).value_counts(normalize=True)
-    max_cluster_pct = distribution.max()
+    cluster_distribution = distribution.drop(NOISE_LABEL, errors='ignore')
+    max_cluster_pct = cluster_distribution.max() if len(cluster_distribution) > 0 else 1.0
+    noise_count = int(np.sum(labels == NOISE_LABEL))
+    
+    if method in DENSITY_METHODS:
+        n_clusters = len(cluster_distribution)
     
     return {
         'model': model,
+        'linkage_matrix': linkage_matrix,
+        'method': method,
+        'from_sweep': stored is not None,
         'labels': labels,
         'n_clusters': n_clusters,
         'silhouette': silhouette,
+        'silhouette_estimated': silhouette_info is not None,
+        'silhouette_ci': (silhouette_info['ci_low'], silhouette_info['ci_high']) if silhouette_info else None,
         'davies_bouldin': davies_bouldin,
         'calinski_harabasz': calinski_harabasz,
         'distribution': distribution,
-        'max_cluster_pct': max_cluster_pct
+        'max_cluster_pct': max_cluster_pct,
+        'eps': eps if method == 'dbscan' else None,
+        'noise_count': noise_count,
+        'noise_pct': noise_count / len(labels)
     }
 
 
+def _served_from_cache(data, method: str, fingerprint: str, n_clusters: int) -> bool:
+    """
+    Indicar si perform_clustering puede resolver el método con las cachés del proceso actual
+    
+    Args:
+        data: Datos escalados
+        method: Método de clustering
+        fingerprint: Huella de los datos
+        n_clusters: Número de clusters
+        
+    Returns:
+        True si el resultado, el árbol jerárquico o el modelo del barrido ya están guardados
+    """
+    if perform_clustering.cache_key(data, n_clusters, method) in _result_cache:
+        return True
+    if method in HIERARCHICAL_LINKAGES:
+        return (fingerprint, HIERARCHICAL_LINKAGES[method]) in _linkage_cache
+    if method in DENSITY_METHODS:
+        return False
+    return (fingerprint, resolve_clustering_method(method, len(data)), n_clusters) in _sweep_store
+
+
+def _perform_clustering_uncached(
+    data,
+    n_clusters: int,
+    method: str,
+    columns: Optional[List[str]] = None
+) -> Tuple[str, Dict]:
+    """
+    Ejecutar perform_clustering sin la caché de resultados (usado en los procesos de compare_methods)
+    
+    El proceso ya ocupa un núcleo, así que DBSCAN/HDBSCAN usan n_jobs=1. Con
+    columns, el array (memmap) se envuelve en un DataFrame sin copiarlo para
+    que los modelos guarden feature_names_in_ igual que en el proceso actual.
+    Devuelve también el método pedido, porque los resultados llegan en el
+    orden en que terminan y result['method'] puede ser el método resuelto.
+    """
+    if columns is not None:
+        data = pd.DataFrame(data, columns=columns, copy=False)
+    return method, perform_clustering.__wrapped__(data, n_clusters, method, n_jobs=1)
+
+
+def cluster_centroids(data, labels: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calcular el centroide de cada cluster, sin contar el ruido
+    
+    Args:
+        data: Datos escalados con los que se formaron los clusters
+        labels: Etiquetas de cluster (NOISE_LABEL = ruido)
+    
+    Returns:
+        Tuple[etiquetas de los clusters, matriz de centroides (una fila por cluster)]
+    """
+    data_array = np.asarray(data)
+    labels = np.asarray(labels)
+    cluster_ids, inverse = np.unique(labels, return_inverse=True)
+    sums = np.zeros((len(cluster_ids), data_array.shape[1]))
+    np.add.at(sums, inverse, data_array)
+    centroids = sums / np.bincount(inverse)[:, None]
+    keep = cluster_ids != NOISE_LABEL
+    return cluster_ids[keep], centroids[keep]
+
+
+def assign_clusters(
+    data,
+    cluster_results: Dict,
+    train_data=None,
+    chunksize: int = 100_000
+) -> np.ndarray:
+    """
+    Asignar clusters a datos nuevos sin volver a ajustar el modelo
+    
+    K-Means y MiniBatch K-Means usan model.predict. DBSCAN asigna el cluster
+    del punto núcleo más cercano si está a menos de eps (si no, ruido). Los
+    métodos jerárquicos y HDBSCAN, que no tienen predict, asignan el
+    centroide más cercano de los clusters formados con train_data. Los datos
+    se procesan por bloques de chunksize filas para acotar la memoria de las
+    distancias.
+    
+    Args:
+        data: Datos nuevos ya escalados con el mismo escalador y columnas
+        cluster_results: Resultado de perform_clustering
+        train_data: Datos escalados con los que se hizo el clustering
+                    (necesarios para los métodos jerárquicos y HDBSCAN)
+        chunksize: Filas por bloque
+    
+    Returns:
+        Array de etiquetas (NOISE_LABEL = ruido)
+    """
+    data_array = np.asarray(data)
+    model = cluster_results['model']
+    method = cluster_results['method']
+    
+    if method == 'dbscan':
+        if len(model.core_sample_indices_) == 0:
+            return np.full(len(data_array), NOISE_LABEL)
+        core_labels = model.labels_[model.core_sample_indices_]
+        neighbors = NearestNeighbors(n_neighbors=1, algorithm=_neighbor_algorithm(data_array.shape[1]))
+        neighbors.fit(model.components_)
+        
+        def predict(block):
+            distances, indices = neighbors.kneighbors(block)
+            return np.where(distances[:, 0] <= model.eps, core_labels[indices[:, 0]], NOISE_LABEL)
+    elif model is not None and hasattr(model, 'predict'):
+        predict = model.predict
+        if isinstance(data, pd.DataFrame):
+            # El modelo se ajustó con nombres de columna: cada bloque los conserva
+            predict = lambda block: model.predict(pd.DataFrame(block, columns=data.columns, copy=False))
+    else:
+        if train_data is None:
+            raise ValueError(f"El método '{method}' necesita los datos de entrenamiento para asignar clusters")
+        cluster_ids, centroids = cluster_centroids(train_data, cluster_results['labels'])
+        neighbors = NearestNeighbors(n_neighbors=1).fit(centroids)
+        
+        def predict(block):
+            return cluster_ids[neighbors.kneighbors(block, return_distance=False)[:, 0]]
+    
+    labels = np.empty(len(data_array), dtype=np.int64)
+    for start in range(0, len(data_array), chunksize):
+        labels[start:start + chunksize] = predict(data_array[start:start + chunksize])
+    return labels
+
+
+def compare_methods(
+    data: pd.DataFrame,
+    n_clusters: int,
+    methods: List[str],
+    n_jobs: Optional[int] = None,
+    blas_threads: Optional[int] = None,
+    progress_callback: Optional[Callable[[str, int, int], None]] = None
+) -> Dict[str, Dict]:
+    """
+    Ejecutar perform_clustering para varios métodos, en paralelo si se indica
+    
+    Los datos se vuelcan una sola vez a un fichero temporal y cada proceso los
+    abre como memmap de solo lectura, sin copiar el array por método. Los
+    métodos que ya tienen su resultado, su árbol jerárquico o su modelo del
+    barrido de K en caché se resuelven en el proceso actual, y lo calculado en
+    los procesos se guarda en las cachés locales para llamadas posteriores.
+    
+    Args:
+        data: DataFrame con datos escalados
+        n_clusters: Número de clusters a formar
+        methods: Métodos a comparar
+        n_jobs: Número de procesos (None o 1 = serie, -1 = todos los núcleos)
+        blas_threads: Hilos BLAS/OpenMP por proceso (None = núcleos / procesos)
+        progress_callback: Función llamada al terminar cada método con
+            (método, terminados, total)
+        
+    Returns:
+        Dict con el resultado de perform_clustering por método, en el orden de methods
+    """
+    fingerprint = fingerprint_data(data)
+    results = {}
+    
+    def _report(method):
+        if progress_callback is not None:
+            progress_callback(method, len(results), len(methods))
+    
+    local_methods = [m for m in methods if _served_from_cache(data, m, fingerprint, n_clusters)]
+    pending_methods = [m for m in methods if m not in local_methods]
+    n_workers = _resolve_n_jobs(n_jobs, len(pending_methods))
+    if n_workers == 1:
+        local_methods, pending_methods = list(methods), []
+    
+    for method in local_methods:
+        results[method] = perform_clustering(data, n_clusters, method)
+        _report(method)
+    
+    if pending_methods:
+        if blas_threads is None:
+            blas_threads = max(1, (os.cpu_count() or 1) // n_workers)
+        temp_dir = tempfile.mkdtemp(prefix='clusterflow_')
+        try:
+            data_path = os.path.join(temp_dir, 'data.joblib')
+            dump(np.ascontiguousarray(data), data_path)
+            data_mmap = load(data_path, mmap_mode='r')
+            columns = list(data.columns) if isinstance(data, pd.DataFrame) else None
+            
+            with parallel_config(backend='loky', inner_max_num_threads=blas_threads):
+                # Cada resultado se procesa en cuanto termina, sin esperar a los enviados antes
+                outputs = Parallel(n_jobs=n_workers, return_as='generator_unordered')(
+                    delayed(_perform_clustering_uncached)(data_mmap, n_clusters, method, columns)
+                    for method in pending_methods
+                )
+                for method, result in outputs:
+                    results[method] = result
+                    _result_cache.put(perform_clustering.cache_key(data, n_clusters, method), result)
+                    if result['linkage_matrix'] is not None:
+                        _linkage_cache.put(
+                            (fingerprint, HIERARCHICAL_LINKAGES[result['method']]),
+                            result['linkage_matrix']
+                        )
+                    _report(method)
+            del data_mmap
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    return {method: results[method] for method in methods}
+
+
 def select_best_method(results_dict: Dict[str, Dict]) -> Tuple[str, pd.DataFrame]:
     """
     Seleccionar el mejor método de clustering basado en métricas
@@ -147,21 +1166,24 @@ def select_best_method(results_dict: Dict[str, Dict]) -> Tuple[str, pd.DataFrame
             'Silhouette': result['silhouette'],
             'Davies-Bouldin': result['davies_bouldin'],
             'Calinski-Harabasz': result['calinski_harabasz'],
-            'Max_Cluster_Pct': result['max_cluster_pct']
+            'Max_Cluster_Pct': result['max_cluster_pct'],
+            'Ruido_Pct': result.get('noise_pct', 0.0)
         })
     
     comparison_df = pd.DataFrame(comparison)
     
-    # Ranking por métricas
-    silhouette_ranking = comparison_df['Silhouette'].rank(ascending=False).values
-    davies_ranking = comparison_df['Davies-Bouldin'].rank(ascending=True).values
-    calinski_ranking = comparison_df['Calinski-Harabasz'].rank(ascending=False).values
+    # Ranking por métricas (métricas NaN, p.ej. menos de 2 clusters, van al final)
+    silhouette_ranking = comparison_df['Silhouette'].rank(ascending=False, na_option='bottom').values
+    davies_ranking = comparison_df['Davies-Bouldin'].rank(ascending=True, na_option='bottom').values
+    calinski_ranking = comparison_df['Calinski-Harabasz'].rank(ascending=False, na_option='bottom').values
     
     comparison_df['Ranking_Promedio'] = (silhouette_ranking + davies_ranking + calinski_ranking) / 3
     
-    # Penalizar clusters muy desbalanceados
+    # Penalizar clusters muy desbalanceados y exceso de ruido (>10% de puntos sin cluster)
     comparison_df['Penalizacion'] = comparison_df['Max_Cluster_Pct'].apply(
         lambda x: (x - 0.8) / 0.2 if x > 0.8 else 0
+    ) + comparison_df['Ruido_Pct'].apply(
+        lambda x: (x - 0.1) / 0.4 if x > 0.1 else 0
     )
     
     comparison_df['Score_Final'] = comparison_df['Ranking_Promedio'] + (comparison_df['Penalizacion'] * 10)
@@ -1,45 +1,323 @@
 """
 Módulo para limpieza y preprocesamiento de datos
 """
+import json
+import warnings
 import pandas as pd
 import numpy as np
 from scipy.stats import zscore
-from typing import Dict, List
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple, Union
+from config import settings
+from .cache import LRUCache
 
 
-def analyze_data_quality(df: pd.DataFrame) -> Dict:
+# Factor que hace la MAD comparable a la desviación típica en datos normales
+MAD_SCALE = 0.6745
+
+# Perfiles de calidad ya calculados, por huella del dataset (ver profile_data)
+_profile_cache = LRUCache(max_entries=settings.PROFILE_CACHE_MAX_ENTRIES)
+
+
+def row_hashes(df: pd.DataFrame, subset: Optional[List[str]] = None) -> np.ndarray:
+    """
+    Calcular un hash de 64 bits por fila
+    
+    Se calcula una sola vez por dataset y se reutiliza para contar duplicados
+    (analyze_data_quality) y eliminarlos (clean_data). Dos filas con el mismo
+    hash se consideran iguales; la probabilidad de colisión es despreciable,
+    pero a diferencia de drop_duplicates 0.0 y -0.0 se consideran distintos.
+    
+    Args:
+        df: DataFrame con los datos
+        subset: Columnas que identifican una fila (por defecto todas)
+        
+    Returns:
+        Array uint64 con un hash por fila
+    """
+    data = df[subset] if subset else df
+    return pd.util.hash_pandas_object(data, index=False).to_numpy()
+
+
+def stored_row_hashes(
+    store: Dict,
+    data_key: Hashable,
+    df: pd.DataFrame,
+    subset: Optional[List[str]] = None
+) -> np.ndarray:
+    """
+    Obtener los hashes por fila de un dataset, calculándolos una sola vez
+    
+    Args:
+        store: Dict donde se guardan (p.ej. st.session_state.row_hashes)
+        data_key: Huella del dataset (la misma que se usa en profile_data)
+        df: DataFrame con los datos
+        subset: Columnas que identifican una fila (por defecto todas)
+        
+    Returns:
+        Array uint64 con un hash por fila (ver row_hashes)
+    """
+    key = (data_key, tuple(subset or ()))
+    hashes = store.get(key)
+    if hashes is None:
+        hashes = row_hashes(df, subset)
+        store[key] = hashes
+    return hashes
+
+
+def duplicate_mask(hashes: np.ndarray) -> np.ndarray:
+    """
+    Marcar las filas repetidas (se conserva la primera aparición)
+    
+    Args:
+        hashes: Hashes por fila de row_hashes
+        
+    Returns:
+        Array booleano con True en las filas duplicadas
+    """
+    return pd.Series(hashes, copy=False).duplicated().to_numpy()
+
+
+def deduplicate_chunks(
+    chunks: Iterable[pd.DataFrame],
+    subset: Optional[List[str]] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Eliminar filas duplicadas de datos leídos por bloques, también entre bloques
+    
+    Guarda en un conjunto el hash de cada fila distinta ya vista (8 bytes por
+    fila), no las filas.
+    
+    Args:
+        chunks: Iterable de DataFrames (p.ej. pd.read_csv(..., chunksize=N))
+        subset: Columnas que identifican una fila (por defecto todas)
+        
+    Yields:
+        Cada bloque sin las filas ya vistas
+    """
+    seen = set()
+    for chunk in chunks:
+        hashes = row_hashes(chunk, subset)
+        is_new = ~duplicate_mask(hashes)
+        is_new &= np.fromiter((h not in seen for h in hashes.tolist()), dtype=bool, count=len(hashes))
+        seen.update(hashes[is_new].tolist())
+        yield chunk[is_new]
+
+
+def _drop_duplicates(
+    df: pd.DataFrame,
+    subset: Optional[List[str]] = None,
+    hashes: Optional[np.ndarray] = None
+) -> pd.DataFrame:
+    """Eliminar duplicados con hashes por fila (precalculados o no)"""
+    if hashes is None:
+        hashes = row_hashes(df, subset)
+    elif len(hashes) != len(df):
+        raise ValueError("Los hashes no corresponden a los datos: número de filas distinto")
+    return df[~duplicate_mask(hashes)]
+
+
+def analyze_data_quality(df: pd.DataFrame, hashes: Optional[np.ndarray] = None) -> Dict:
     """
     Analizar calidad de datos
     
     Args:
         df: DataFrame a analizar
-        
+        hashes: Hashes por fila ya calculados (ver row_hashes); se calculan si faltan
+    
     Returns:
         Dict con información de calidad: shape, nulls, duplicates, dtypes, etc.
     """
-    try:
-        null_pct = (df.isnull().sum() / len(df) * 100).round(2) if len(df) > 0 else pd.Series()
-    except:
-        null_pct = pd.Series()
-    
+    nulls = df.isnull().sum()
     report = {
         'shape': df.shape,
-        'nulls': df.isnull().sum(),
-        'null_pct': null_pct,
-        'duplicates': df.duplicated().sum(),
+        'nulls': nulls,
+        'null_pct': _null_pct(nulls, len(df)),
+        'duplicates': int(duplicate_mask(hashes if hashes is not None else row_hashes(df)).sum()),
         'dtypes': df.dtypes,
         'numeric_cols': df.select_dtypes(include=[np.number]).columns.tolist(),
-        'categorical_cols': df.select_dtypes(include=['object']).columns.tolist()
+        'categorical_cols': df.select_dtypes(include=['object', 'category']).columns.tolist()
     }
     return report
 
 
+def _null_pct(nulls: pd.Series, n_rows: int) -> pd.Series:
+    """Porcentaje de nulos por columna a partir del recuento"""
+    if n_rows == 0:
+        return pd.Series(0.0, index=nulls.index)
+    return (nulls / n_rows * 100).round(2)
+
+
+def profile_data(
+    df: pd.DataFrame,
+    fingerprint: Optional[Hashable] = None,
+    hashes: Optional[Union[np.ndarray, Callable[[], np.ndarray]]] = None
+) -> Dict:
+    """
+    Perfil de calidad completo de un dataset, calculado una vez por huella
+    
+    Reúne en un solo recorrido lo que las páginas de carga, limpieza y
+    feature engineering calculaban por separado columna a columna. Con
+    fingerprint, el perfil se guarda en una caché LRU y cambiar de página no
+    vuelve a recorrer los datos. La huella debe identificar el contenido (p.ej.
+    la del archivo cargado más los parámetros de muestreo o limpieza).
+    
+    Args:
+        df: DataFrame a analizar
+        fingerprint: Huella del dataset para la caché (None = no cachear)
+        hashes: Hashes por fila ya calculados (ver row_hashes) o función que los
+            devuelve, llamada solo si el perfil no está en caché; se calculan si faltan
+    
+    Returns:
+        Dict con las claves de analyze_data_quality más memory_mb (total) y
+        columns: DataFrame indexado por columna con dtype, nulls, null_pct,
+        distinct, min, max, mean, std (solo numéricas) y memory_mb
+    """
+    if fingerprint is not None:
+        profile = _profile_cache.get(fingerprint)
+        if profile is not None:
+            return profile
+    
+    if callable(hashes):
+        hashes = hashes()
+    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    numeric = df[numeric_cols]
+    nulls = df.isnull().sum()
+    memory_mb = df.memory_usage(deep=True, index=False) / 1024**2
+    
+    columns = pd.DataFrame({
+        'dtype': df.dtypes.astype(str),
+        'nulls': nulls,
+        'null_pct': _null_pct(nulls, len(df)),
+        'distinct': df.nunique(),
+        'min': numeric.min(),
+        'max': numeric.max(),
+        'mean': numeric.mean(),
+        'std': numeric.std(),
+        'memory_mb': memory_mb
+    }).reindex(df.columns)
+    
+    profile = {
+        'shape': df.shape,
+        'nulls': nulls,
+        'null_pct': columns['null_pct'],
+        'duplicates': int(duplicate_mask(hashes if hashes is not None else row_hashes(df)).sum()),
+        'dtypes': df.dtypes,
+        'numeric_cols': numeric_cols,
+        'categorical_cols': df.select_dtypes(include=['object', 'category']).columns.tolist(),
+        'memory_mb': float(memory_mb.sum()),
+        'columns': columns
+    }
+    
+    if fingerprint is not None:
+        _profile_cache.put(fingerprint, profile)
+    return profile
+
+
+def outlier_bounds(
+    df: pd.DataFrame,
+    columns: Optional[List[str]] = None,
+    method: str = 'zscore',
+    threshold: float = 3.0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calcular los límites inferior y superior de valores normales por columna
+    
+    Todas las columnas se calculan a la vez sobre una matriz NumPy. Los NaN se
+    ignoran y las columnas sin dispersión (desviación, IQR o MAD nulos) reciben
+    límites infinitos, así que nunca marcan outliers.
+    
+    Args:
+        df: DataFrame con los datos
+        columns: Columnas a considerar (por defecto todas las numéricas)
+        method: 'zscore' (|x - media| / std), 'iqr' (fuera de [Q1 - k·IQR, Q3 + k·IQR])
+                o 'mad' (Z-score modificado 0.6745·|x - mediana| / MAD)
+        threshold: Umbral del Z-score, multiplicador k del IQR o umbral del Z-score modificado
+    
+    Returns:
+        Tupla (lower, upper) con un límite por columna
+    """
+    if columns is None:
+        columns = df.select_dtypes(include=[np.number]).columns.tolist()
+    values = df[columns].to_numpy(dtype=np.float64)
+    
+    with np.errstate(all='ignore'), warnings.catch_warnings():
+        # Columnas completamente NaN: nanmean/nanmedian avisan y devuelven NaN
+        warnings.simplefilter('ignore', RuntimeWarning)
+        if method == 'zscore':
+            center = np.nanmean(values, axis=0)
+            spread = np.nanstd(values, axis=0)
+            lower, upper = center - threshold * spread, center + threshold * spread
+        elif method == 'iqr':
+            q1, q3 = np.nanpercentile(values, [25, 75], axis=0)
+            spread = q3 - q1
+            lower, upper = q1 - threshold * spread, q3 + threshold * spread
+        elif method == 'mad':
+            center = np.nanmedian(values, axis=0)
+            spread = np.nanmedian(np.abs(values - center), axis=0) / MAD_SCALE
+            lower, upper = center - threshold * spread, center + threshold * spread
+        else:
+            raise ValueError(f"Método de outliers no soportado: {method}")
+    
+    constant = ~(spread > 0)
+    lower[constant] = -np.inf
+    upper[constant] = np.inf
+    return lower, upper
+
+
+def outlier_mask(
+    df: pd.DataFrame,
+    columns: Optional[List[str]] = None,
+    method: str = 'zscore',
+    threshold: float = 3.0
+) -> np.ndarray:
+    """
+    Marcar las filas con algún valor fuera de los límites de outlier_bounds
+    
+    Se combina una única máscara para todas las columnas, así que el resultado
+    no depende del orden de las columnas. Los NaN no cuentan como outliers.
+    
+    Args:
+        df: DataFrame con los datos
+        columns: Columnas a considerar (por defecto todas las numéricas)
+        method: 'zscore', 'iqr' o 'mad' (ver outlier_bounds)
+        threshold: Umbral del método
+    
+    Returns:
+        Array booleano con True en las filas outlier
+    """
+    if columns is None:
+        columns = df.select_dtypes(include=[np.number]).columns.tolist()
+    if not columns or len(df) == 0:
+        return np.zeros(len(df), dtype=bool)
+    
+    lower, upper = outlier_bounds(df, columns, method, threshold)
+    return _rows_outside(df, columns, lower, upper)
+
+
+def _rows_outside(
+    df: pd.DataFrame,
+    columns: List[str],
+    lower: np.ndarray,
+    upper: np.ndarray,
+    strict: bool = False
+) -> np.ndarray:
+    """Filas con algún valor fuera de [lower, upper], o de (lower, upper) si strict (los NaN no cuentan)"""
+    values = df[columns].to_numpy(dtype=np.float64)
+    with np.errstate(invalid='ignore'):
+        if strict:
+            return ((values <= lower) | (values >= upper)).any(axis=1)
+        return ((values < lower) | (values > upper)).any(axis=1)
+
+
 def clean_data(
     df: pd.DataFrame,
     remove_duplicates: bool = True,
     fill_nulls_method: str = 'mean',
     remove_outliers: bool = True,
-    outlier_threshold: float = 3.0
+    outlier_threshold: float = 3.0,
+    outlier_method: str = 'zscore_sequential',
+    duplicate_subset: Optional[List[str]] = None,
+    hashes: Optional[np.ndarray] = None
 ) -> pd.DataFrame:
     """
     Limpieza automática de datos
@@ -49,42 +327,44 @@ def clean_data(
         remove_duplicates: Si True, elimina filas duplicadas
         fill_nulls_method: Método para rellenar valores nulos ('mean', 'median', 'zero', 'ffill', 'bfill', 'drop', 'none')
         remove_outliers: Si True, elimina outliers
-        outlier_threshold: Umbral de Z-score para considerar outliers
-        
+        outlier_threshold: Umbral del método de outliers (Z-score, multiplicador del IQR o Z-score modificado)
+        outlier_method: 'zscore_sequential' (Z-score columna a columna sobre los datos ya
+                        filtrados, comportamiento original), 'zscore', 'iqr' o 'mad'
+                        (una sola pasada sobre todas las columnas, ver outlier_mask)
+        duplicate_subset: Columnas que identifican una fila duplicada (por defecto todas)
+        hashes: Hashes por fila de df ya calculados con duplicate_subset (ver row_hashes)
+    
     Returns:
         DataFrame limpio
     """
-    df_clean = df.copy()
-    
     # Eliminar duplicados
     if remove_duplicates:
-        df_clean = df_clean.drop_duplicates()
+        df_clean = _drop_duplicates(df, duplicate_subset, hashes)
+    else:
+        df_clean = df.copy()
     
-    # Rellenar valores nulos en columnas numéricas
+    # Rellenar valores nulos en columnas numéricas (todas a la vez)
     if fill_nulls_method != 'none':
-        numeric_cols = df_clean.select_dtypes(include=[np.number]).columns
+        null_cols = _numeric_null_columns(df_clean)
         
-        for col in numeric_cols:
-            if df_clean[col].isnull().sum() > 0:
-                if fill_nulls_method == 'mean':
-                    df_clean[col].fillna(df_clean[col].mean(), inplace=True)
-                elif fill_nulls_method == 'median':
-                    df_clean[col].fillna(df_clean[col].median(), inplace=True)
-                elif fill_nulls_method == 'zero':
-                    df_clean[col].fillna(0, inplace=True)
-                elif fill_nulls_method == 'ffill':
-                    df_clean[col].fillna(method='ffill', inplace=True)
-                    df_clean[col].fillna(method='bfill', inplace=True)
-                    df_clean[col].fillna(0, inplace=True)
-                elif fill_nulls_method == 'bfill':
-                    df_clean[col].fillna(method='bfill', inplace=True)
-                    df_clean[col].fillna(method='ffill', inplace=True)
-                    df_clean[col].fillna(0, inplace=True)
-                elif fill_nulls_method == 'drop':
-                    df_clean = df_clean.dropna(subset=[col])
+        if null_cols:
+            if fill_nulls_method == 'mean':
+                df_clean = df_clean.fillna(df_clean[null_cols].mean().to_dict())
+            elif fill_nulls_method == 'median':
+                df_clean = df_clean.fillna(df_clean[null_cols].median().to_dict())
+            elif fill_nulls_method == 'zero':
+                df_clean = df_clean.fillna(dict.fromkeys(null_cols, 0))
+            elif fill_nulls_method == 'ffill':
+                df_clean = df_clean.fillna(df_clean[null_cols].ffill().bfill().fillna(0))
+            elif fill_nulls_method == 'bfill':
+                df_clean = df_clean.fillna(df_clean[null_cols].bfill().ffill().fillna(0))
+            elif fill_nulls_method == 'drop':
+                df_clean = df_clean.dropna(subset=null_cols)
     
     # Eliminar outliers
-    if remove_outliers:
+    if remove_outliers and outlier_method != 'zscore_sequential':
+        df_clean = df_clean[~outlier_mask(df_clean, method=outlier_method, threshold=outlier_threshold)]
+    elif remove_outliers:
         numeric_cols = df_clean.select_dtypes(include=[np.number]).columns
         for col in numeric_cols:
             if df_clean[col].isnull().sum() == 0 and df_clean[col].std() > 0:
@@ -96,12 +376,303 @@ def clean_data(
                     continue
     
     # VALIDACIÓN FINAL: Asegurar que no queden NaN en columnas numéricas
-    numeric_cols = df_clean.select_dtypes(include=[np.number]).columns
-    for col in numeric_cols:
-        if df_clean[col].isnull().sum() > 0:
-            if df_clean[col].dropna().shape[0] > 0:
-                df_clean[col].fillna(df_clean[col].median(), inplace=True)
-            else:
-                df_clean[col].fillna(0, inplace=True)
+    # (mediana de la columna, o 0 si la columna no tiene ningún valor)
+    null_cols = _numeric_null_columns(df_clean)
+    if null_cols:
+        df_clean = df_clean.fillna(df_clean[null_cols].median().fillna(0).to_dict())
     
     return df_clean
+
+
+def _numeric_null_columns(df: pd.DataFrame) -> List[str]:
+    """Columnas numéricas con algún valor nulo (una sola pasada sobre los datos)"""
+    numeric = df.select_dtypes(include=[np.number])
+    has_nulls = numeric.isna().any()
+    return has_nulls.index[has_nulls].tolist()
+
+
+class CleaningPipeline:
+    """
+    Limpieza reutilizable: se ajusta sobre unos datos y se aplica igual a otros
+    
+    fit calcula y guarda los valores de imputación, los límites de outliers y
+    los valores de respaldo de la validación final (los mismos pasos que
+    clean_data); transform los aplica a datos nuevos sin recalcularlos, en una
+    sola pasada vectorizada. El pipeline ajustado se serializa con to_dict /
+    to_json para limpiar lotes posteriores igual que el de entrenamiento.
+    
+    Args:
+        remove_duplicates: Si True, elimina filas duplicadas
+        fill_nulls_method: Método para rellenar valores nulos (ver clean_data)
+        remove_outliers: Si True, elimina outliers
+        outlier_threshold: Umbral del método de outliers
+        outlier_method: 'zscore_sequential', 'zscore', 'iqr' o 'mad' (ver clean_data)
+        duplicate_subset: Columnas que identifican una fila duplicada (por defecto todas)
+    """
+    
+    VERSION = 1
+    
+    def __init__(
+        self,
+        remove_duplicates: bool = True,
+        fill_nulls_method: str = 'mean',
+        remove_outliers: bool = True,
+        outlier_threshold: float = 3.0,
+        outlier_method: str = 'zscore_sequential',
+        duplicate_subset: Optional[List[str]] = None
+    ):
+        self.remove_duplicates = remove_duplicates
+        self.fill_nulls_method = fill_nulls_method
+        self.remove_outliers = remove_outliers
+        self.outlier_threshold = outlier_threshold
+        self.outlier_method = outlier_method
+        self.duplicate_subset = list(duplicate_subset) if duplicate_subset else None
+        self.columns_ = None
+        self.fill_values_ = {}
+        self.fallback_values_ = {}
+        self.lower_ = None
+        self.upper_ = None
+    
+    def get_params(self) -> Dict:
+        """Parámetros de limpieza (los mismos argumentos que clean_data)"""
+        return {
+            'remove_duplicates': self.remove_duplicates,
+            'fill_nulls_method': self.fill_nulls_method,
+            'remove_outliers': self.remove_outliers,
+            'outlier_threshold': self.outlier_threshold,
+            'outlier_method': self.outlier_method,
+            'duplicate_subset': self.duplicate_subset
+        }
+    
+    @property
+    def is_fitted(self) -> bool:
+        return self.columns_ is not None
+    
+    def fit(self, df: pd.DataFrame) -> 'CleaningPipeline':
+        """
+        Ajustar el pipeline sobre unos datos
+        
+        Args:
+            df: DataFrame de entrenamiento
+        
+        Returns:
+            El propio pipeline, ajustado
+        """
+        self.fit_transform(df)
+        return self
+    
+    def fit_transform(self, df: pd.DataFrame, hashes: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        Ajustar el pipeline y devolver los datos de entrenamiento limpios
+        
+        Args:
+            df: DataFrame de entrenamiento
+            hashes: Hashes por fila ya calculados con duplicate_subset (ver row_hashes)
+            
+        Returns:
+            DataFrame limpio (equivalente a clean_data con los mismos parámetros)
+        """
+        self.columns_ = df.select_dtypes(include=[np.number]).columns.tolist()
+        df_clean = self._deduplicate(df, hashes)
+
+        numeric = df_clean[self.columns_]
+        if self.fill_nulls_method == 'mean':
+            fill_values = numeric.mean()
+        elif self.fill_nulls_method == 'median':
+            fill_values = numeric.median()
+        elif self.fill_nulls_method in ('zero', 'ffill', 'bfill'):
+            # ffill/bfill rellenan con 0 lo que no se puede propagar
+            fill_values = pd.Series(0.0, index=self.columns_)
+        else:
+            fill_values = pd.Series(dtype=np.float64)
+        # Columnas sin ningún valor: la validación final de clean_data las deja a 0
+        self.fill_values_ = {col: float(value) for col, value in fill_values.fillna(0).items()}
+        df_clean = self._impute(df_clean)
+        
+        self.lower_ = self.upper_ = None
+        if self.remove_outliers and self.columns_:
+            if self.outlier_method == 'zscore_sequential':
+                df_clean = self._fit_sequential_bounds(df_clean)
+            else:
+                self.lower_, self.upper_ = outlier_bounds(df_clean, self.columns_, self.outlier_method, self.outlier_threshold)
+                df_clean = df_clean[~_rows_outside(df_clean, self.columns_, self.lower_, self.upper_)]
+        
+        self.fallback_values_ = {
+            col: float(value) for col, value in df_clean[self.columns_].median().fillna(0).items()
+        }
+        return self._fill_remaining(df_clean)
+    
+    def _fit_sequential_bounds(self, df_clean: pd.DataFrame) -> pd.DataFrame:
+        """
+        Límites de Z-score columna a columna sobre los datos ya filtrados
+        
+        Como en clean_data, se conservan solo las filas con |z| < umbral
+        (estricto); transform aplica los límites también de forma estricta.
+        """
+        n_columns = len(self.columns_)
+        self.lower_ = np.full(n_columns, -np.inf)
+        self.upper_ = np.full(n_columns, np.inf)
+        
+        for i, col in enumerate(self.columns_):
+            values = df_clean[col]
+            if values.isnull().any() or not values.std() > 0:
+                continue
+            center, spread = np.mean(values), np.std(values)
+            self.lower_[i] = center - self.outlier_threshold * spread
+            self.upper_[i] = center + self.outlier_threshold * spread
+            df_clean = df_clean[np.abs(zscore(values)) < self.outlier_threshold]
+        
+        return df_clean
+    
+    def transform(self, df: pd.DataFrame, hashes: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        Limpiar datos nuevos con los valores y límites ajustados
+        
+        Args:
+            df: DataFrame con las mismas columnas numéricas que el de entrenamiento
+            hashes: Hashes por fila ya calculados con duplicate_subset (ver row_hashes)
+            
+        Returns:
+            DataFrame limpio
+        """
+        self._check_columns(df)
+        return self._transform_deduplicated(self._deduplicate(df, hashes))
+
+    def transform_chunks(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """
+        Limpiar datos por bloques, sin cargarlos enteros en memoria
+        
+        Los duplicados se eliminan también entre bloques (ver
+        deduplicate_chunks). 'ffill' continúa
+        desde el último valor del bloque anterior; 'bfill' solo propaga valores
+        dentro de cada bloque.
+        
+        Args:
+            chunks: Iterable de DataFrames (p.ej. pd.read_csv(..., chunksize=N))
+        
+        Yields:
+            Cada bloque limpio
+        """
+        if self.remove_duplicates:
+            chunks = deduplicate_chunks(chunks, self.duplicate_subset)
+        
+        previous = None
+        for chunk in chunks:
+            self._check_columns(chunk)
+            chunk = self._impute(chunk, previous)
+            if len(chunk) > 0:
+                previous = chunk[self.columns_].iloc[-1]
+            yield self._remove_outliers(chunk)
+    
+    def _deduplicate(self, df: pd.DataFrame, hashes: Optional[np.ndarray] = None) -> pd.DataFrame:
+        if self.remove_duplicates:
+            return _drop_duplicates(df, self.duplicate_subset, hashes)
+        return df.copy()
+    
+    def _transform_deduplicated(self, df_clean: pd.DataFrame) -> pd.DataFrame:
+        return self._remove_outliers(self._impute(df_clean))
+    
+    def _remove_outliers(self, df_clean: pd.DataFrame) -> pd.DataFrame:
+        """Aplicar los límites ajustados y la validación final"""
+        if self.lower_ is not None:
+            strict = self.outlier_method == 'zscore_sequential'
+            df_clean = df_clean[~_rows_outside(df_clean, self.columns_, self.lower_, self.upper_, strict)]
+        return self._fill_remaining(df_clean)
+    
+    def _impute(self, df_clean: pd.DataFrame, previous: Optional[pd.Series] = None) -> pd.DataFrame:
+        """Rellenar nulos; previous es la última fila del bloque anterior (para 'ffill')"""
+        if self.fill_nulls_method == 'none':
+            return df_clean
+        fitted_columns = set(self.columns_)
+        null_cols = [col for col in _numeric_null_columns(df_clean) if col in fitted_columns]
+        if not null_cols:
+            return df_clean
+        
+        if self.fill_nulls_method in ('mean', 'median', 'zero'):
+            return df_clean.fillna({col: self.fill_values_[col] for col in null_cols})
+        if self.fill_nulls_method == 'drop':
+            return df_clean.dropna(subset=null_cols)
+        
+        if self.fill_nulls_method == 'ffill':
+            filled = df_clean[null_cols].ffill()
+            if previous is not None:
+                filled = filled.fillna(previous[null_cols])
+            filled = filled.bfill().fillna(0)
+        else:
+            filled = df_clean[null_cols].bfill().ffill().fillna(0)
+        return df_clean.fillna(filled)
+    
+    def _fill_remaining(self, df_clean: pd.DataFrame) -> pd.DataFrame:
+        null_cols = [col for col in _numeric_null_columns(df_clean) if col in self.fallback_values_]
+        if null_cols:
+            df_clean = df_clean.fillna({col: self.fallback_values_[col] for col in null_cols})
+        return df_clean
+    
+    def _check_columns(self, df: pd.DataFrame) -> None:
+        if not self.is_fitted:
+            raise ValueError("El pipeline de limpieza no está ajustado. Llama primero a fit().")
+        missing = [col for col in self.columns_ if col not in df.columns]
+        if missing:
+            raise ValueError(f"Faltan columnas del pipeline de limpieza: {missing}")
+    
+    def to_dict(self) -> Dict:
+        """
+        Serializar el pipeline ajustado
+        
+        Returns:
+            Dict compatible con JSON; los valores se guardan como listas en el
+            orden de 'columns' y los límites infinitos como None
+        """
+        if not self.is_fitted:
+            raise ValueError("El pipeline de limpieza no está ajustado. Llama primero a fit().")
+        
+        def bounds_to_list(bounds):
+            if bounds is None:
+                return None
+            return [float(b) if np.isfinite(b) else None for b in bounds]
+        
+        return {
+            'version': self.VERSION,
+            'params': self.get_params(),
+            'columns': self.columns_,
+            'fill_values': [self.fill_values_[col] for col in self.columns_] if self.fill_values_ else None,
+            'fallback_values': [self.fallback_values_[col] for col in self.columns_],
+            'lower': bounds_to_list(self.lower_),
+            'upper': bounds_to_list(self.upper_)
+        }
+    
+    @classmethod
+    def from_dict(cls, state: Dict) -> 'CleaningPipeline':
+        """
+        Reconstruir un pipeline ajustado desde to_dict
+        
+        Args:
+            state: Dict de to_dict
+        
+        Returns:
+            CleaningPipeline ajustado
+        """
+        if state.get('version') != cls.VERSION:
+            raise ValueError(f"Versión de pipeline de limpieza no soportada: {state.get('version')}")
+        
+        def list_to_bounds(values, missing):
+            if values is None:
+                return None
+            return np.array([missing if v is None else v for v in values], dtype=np.float64)
+        
+        pipeline = cls(**state['params'])
+        pipeline.columns_ = list(state['columns'])
+        pipeline.fill_values_ = dict(zip(pipeline.columns_, state['fill_values'] or []))
+        pipeline.fallback_values_ = dict(zip(pipeline.columns_, state['fallback_values']))
+        pipeline.lower_ = list_to_bounds(state['lower'], -np.inf)
+        pipeline.upper_ = list_to_bounds(state['upper'], np.inf)
+        return pipeline
+    
+    def to_json(self) -> str:
+        """Serializar el pipeline ajustado como JSON"""
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+    
+    @classmethod
+    def from_json(cls, text: str) -> 'CleaningPipeline':
+        """Reconstruir un pipeline ajustado desde to_json"""
+        return cls.from_dict(json.loads(text))
@@ -1,35 +1,566 @@
 """
 Módulo para carga de datos
 """
+import hashlib
+import logging
+import os
+import time
+import numpy as np
 import pandas as pd
-from typing import Tuple, Optional
+from pathlib import Path
+from pandas.api.types import union_categoricals
+from typing import Dict, Iterator, List, Tuple, Optional
+from config import settings
+from .cache import DataFrameCache, fingerprint_file
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow es necesario solo para formatos columnares
+    pa = None
+    pa_csv = None
+    pq = None
 
-def load_data(uploaded_file) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+logger = logging.getLogger(__name__)
+
+# DataFrames ya parseados por (huella del archivo, parámetros de lectura)
+_dataset_cache = DataFrameCache(
+    settings.DATASET_CACHE_DIR,
+    max_entries=settings.DATASET_CACHE_MEMORY_ENTRIES,
+    max_disk_mb=settings.DATASET_CACHE_DISK_MAX_MB
+)
+
+
+# Formato de archivo por extensión (Feather v2 es el formato de archivo Arrow IPC)
+FILE_FORMATS = {
+    '.csv': 'CSV',
+    '.parquet': 'Parquet',
+    '.pq': 'Parquet',
+    '.feather': 'Feather',
+    '.arrow': 'Arrow',
+    '.ipc': 'Arrow'
+}
+
+# Mayor entero a partir del cual float32 ya no representa todos los enteros
+FLOAT32_EXACT_INT = 2 ** 24
+
+
+def get_file_format(source) -> str:
+    """
+    Obtener el formato de un archivo a partir de su nombre
+    
+    Args:
+        source: Ruta o archivo subido (con atributo name)
+        
+    Returns:
+        'CSV', 'Parquet', 'Feather' o 'Arrow' (CSV si la extensión es desconocida)
+    """
+    name = source if isinstance(source, (str, Path)) else getattr(source, 'name', '')
+    return FILE_FORMATS.get(Path(str(name)).suffix.lower(), 'CSV')
+
+
+def _arrow_input(source):
+    """
+    Abrir un origen para pyarrow: las rutas se mapean en memoria (sin copiar a RAM)
+    y los archivos subidos se leen desde su buffer
+    """
+    if isinstance(source, (str, Path)):
+        return pa.memory_map(str(source), 'r')
+    source.seek(0)
+    return pa.BufferReader(source.read())
+
+
+def _open_ipc(source, columns: Optional[List[str]] = None):
+    """
+    Abrir un archivo Arrow IPC/Feather leyendo solo las columnas pedidas
+    
+    El esquema se toma del pie (o de la cabecera en formato stream) y el
+    lector se reabre con IpcReadOptions(included_fields), de modo que las
+    columnas no pedidas no se leen ni se descomprimen.
+    
+    Args:
+        source: Ruta o archivo subido
+        columns: Columnas a leer (None = todas)
+        
+    Returns:
+        Lector de pyarrow (RecordBatchFileReader o RecordBatchStreamReader)
+    """
+    arrow_source = _arrow_input(source)
+    try:
+        open_reader = pa.ipc.open_file
+        reader = open_reader(arrow_source)
+    except pa.ArrowInvalid:
+        # Arrow IPC en formato stream en lugar de formato archivo
+        open_reader = pa.ipc.open_stream
+        arrow_source.seek(0)
+        reader = open_reader(arrow_source)
+    if columns is None:
+        return reader
+    
+    names = reader.schema.names
+    missing = [col for col in columns if col not in names]
+    if missing:
+        raise KeyError(f"Columnas no encontradas en el archivo: {missing}")
+    arrow_source.seek(0)
+    options = pa.ipc.IpcReadOptions(included_fields=sorted(names.index(col) for col in columns))
+    return open_reader(arrow_source, options=options)
+
+
+def _ipc_batches(reader) -> Iterator:
+    """Recorrer los record batches de un lector IPC (formato archivo o stream)"""
+    if isinstance(reader, pa.ipc.RecordBatchFileReader):
+        return (reader.get_batch(i) for i in range(reader.num_record_batches))
+    return iter(reader)
+
+
+def _read_arrow_table(source, file_format: str, columns: Optional[List[str]] = None):
+    """
+    Leer una tabla Arrow leyendo solo las columnas pedidas
+    
+    Args:
+        source: Ruta o archivo subido
+        file_format: 'Parquet', 'Feather' o 'Arrow'
+        columns: Columnas a leer (None = todas)
+        
+    Returns:
+        pyarrow.Table
+    """
+    if pa is None:
+        raise ImportError("Se necesita pyarrow para leer archivos Parquet/Feather/Arrow")
+    
+    if file_format == 'Parquet':
+        return pq.read_table(_arrow_input(source), columns=columns)
+    
+    table = _open_ipc(source, columns).read_all()
+    return table.select(columns) if columns is not None else table
+
+
+def _arrow_reader(source, file_format: str, columns: Optional[List[str]], chunksize: Optional[int]):
+    """
+    Crear el iterador de bloques de un archivo Parquet/Feather/Arrow
+    
+    Con chunksize, Parquet se lee por lotes de row groups y Arrow/Feather se
+    recorre record batch a record batch (solo las columnas pedidas), de modo
+    que solo se lee y materializa en pandas un bloque cada vez.
+    
+    Args:
+        source: Ruta o archivo subido
+        file_format: 'Parquet', 'Feather' o 'Arrow'
+        columns: Columnas a leer (None = todas)
+        chunksize: Filas por bloque (None = un solo bloque)
+        
+    Returns:
+        Iterador de DataFrames
+    """
+    if chunksize is None:
+        return iter([_read_arrow_table(source, file_format, columns).to_pandas()])
+    if pa is None:
+        raise ImportError("Se necesita pyarrow para leer archivos Parquet/Feather/Arrow")
+    if file_format == 'Parquet':
+        batches = pq.ParquetFile(_arrow_input(source)).iter_batches(batch_size=chunksize, columns=columns)
+    else:
+        batches = (
+            piece
+            for batch in _ipc_batches(_open_ipc(source, columns))
+            for piece in pa.Table.from_batches([batch]).to_batches(max_chunksize=chunksize)
+        )
+    if columns is not None:
+        return (batch.select(columns).to_pandas() for batch in batches)
+    return (batch.to_pandas() for batch in batches)
+
+
+def read_schema(source) -> Dict[str, str]:
+    """
+    Obtener columnas y tipos de un archivo sin leer sus datos
+    
+    En Parquet y Arrow/Feather se lee solo el esquema (pie del archivo o
+    cabecera del stream); en CSV se infiere con las primeras filas.
+    
+    Args:
+        source: Ruta o archivo subido
+        
+    Returns:
+        Dict {columna: tipo de pandas}
+    """
+    file_format = get_file_format(source)
+    if file_format == 'CSV':
+        sample = pd.read_csv(source, nrows=1000)
+        if not isinstance(source, (str, Path)):
+            source.seek(0)
+    else:
+        if pa is None:
+            raise ImportError("Se necesita pyarrow para leer archivos Parquet/Feather/Arrow")
+        if file_format == 'Parquet':
+            schema = pq.read_schema(_arrow_input(source))
+        else:
+            schema = _open_ipc(source).schema
+        sample = schema.empty_table().to_pandas()
+    return sample.dtypes.astype(str).to_dict()
+
+
+def list_data_files(directory=None) -> List[Dict]:
+    """
+    Listar los archivos de datos legibles de un directorio
+    
+    Args:
+        directory: Directorio a explorar (por defecto settings.DATA_DIR)
+        
+    Returns:
+        Lista de dicts con name, path, format y size_mb, ordenada por nombre
+    """
+    directory = Path(directory or settings.DATA_DIR)
+    if not directory.is_dir():
+        return []
+    return [
+        {
+            'name': path.name,
+            'path': path,
+            'format': FILE_FORMATS[path.suffix.lower()],
+            'size_mb': path.stat().st_size / 1024**2
+        }
+        for path in sorted(directory.iterdir())
+        if path.is_file() and path.suffix.lower() in FILE_FORMATS
+    ]
+
+
+def _downcast_floats(df: pd.DataFrame) -> None:
     """
-    Cargar datos desde archivo CSV
+    Pasar a float32 las columnas float64 que no pierden valores enteros
+    
+    Una columna entera con nulos se lee como float64; si tiene enteros por
+    encima de 2^24 (p.ej. identificadores) float32 no los representa
+    exactamente, así que esa columna se deja en float64.
     
     Args:
-        uploaded_file: Archivo subido a través de Streamlit
+        df: DataFrame a modificar en el sitio
+    """
+    for col in df.select_dtypes(include=['float64']).columns:
+        values = df[col].dropna()
+        is_integral = bool((values == np.floor(values)).all())
+        if not is_integral or bool((values.abs() <= FLOAT32_EXACT_INT).all()):
+            df[col] = df[col].astype(np.float32)
+
+
+def optimize_dtypes(
+    df: pd.DataFrame,
+    category_columns: Optional[List[str]] = None,
+    category_max_unique_ratio: float = 0.5
+) -> pd.DataFrame:
+    """
+    Reducir la memoria de un DataFrame ajustando los tipos de sus columnas
+    
+    Los floats pasan a float32 (salvo columnas enteras con nulos cuyos valores
+    float32 no representa exactamente), los enteros al entero con signo más
+    pequeño que admite sus valores y las columnas de texto con pocos valores distintos a
+    'category'.
+    
+    Args:
+        df: DataFrame a optimizar (se modifica una copia)
+        category_columns: Columnas de texto a convertir en 'category'
+            (None = las que tengan proporción de valores únicos <= category_max_unique_ratio)
+        category_max_unique_ratio: Proporción máxima de valores únicos para usar 'category'
+        
+    Returns:
+        DataFrame con tipos optimizados
+    """
+    df = df.copy()
+    
+    _downcast_floats(df)
+    
+    for col in df.select_dtypes(include=['integer']).columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    
+    if category_columns is None:
+        text_cols = df.select_dtypes(include=['object']).columns
+        category_columns = [
+            col for col in text_cols
+            if len(df) > 0 and df[col].nunique() / len(df) <= category_max_unique_ratio
+        ]
+    for col in category_columns:
+        if col in df.columns and df[col].dtype == object:
+            df[col] = df[col].astype('category')
+    
+    return df
+
+
+def _concat_chunks(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Unir los bloques leídos conservando las columnas 'category'
+    
+    pd.concat convierte a object las categóricas con categorías distintas, así
+    que antes se unifican sus categorías con union_categoricals.
+    
+    Args:
+        chunks: Bloques con tipos optimizados
+        
+    Returns:
+        DataFrame completo
+    """
+    if len(chunks) == 1:
+        return chunks[0]
+    
+    for col in chunks[0].select_dtypes(include=['category']).columns:
+        try:
+            categories = union_categoricals(
+                [chunk[col].astype('category') for chunk in chunks]
+            ).categories
+        except TypeError:
+            # Categorías de tipos incompatibles entre bloques: se deja como texto
+            for chunk in chunks:
+                chunk[col] = chunk[col].astype(object)
+            continue
+        for chunk in chunks:
+            chunk[col] = chunk[col].astype('category').cat.set_categories(categories)
+    
+    return pd.concat(chunks, ignore_index=True)
+
+
+def _load_info(df: pd.DataFrame, original_bytes: int, n_chunks: int) -> Dict:
+    """
+    Resumir la memoria usada por los datos cargados
+    
+    Args:
+        df: DataFrame cargado
+        original_bytes: Memoria de los bloques con los tipos por defecto
+        n_chunks: Número de bloques leídos
+        
+    Returns:
+        Dict con original_mb, memory_mb, savings_pct y n_chunks
+    """
+    memory_bytes = df.memory_usage(deep=True).sum()
+    return {
+        'original_mb': original_bytes / 1024**2,
+        'memory_mb': memory_bytes / 1024**2,
+        'savings_pct': (1 - memory_bytes / original_bytes) * 100 if original_bytes else 0.0,
+        'n_chunks': n_chunks
+    }
+
+
+def _source_size_mb(source) -> float:
+    """Tamaño en MB de una ruta o de un archivo subido (0 si no se conoce)"""
+    if isinstance(source, (str, Path)):
+        return os.path.getsize(source) / 1024**2
+    size = getattr(source, 'size', None)
+    if size is None and hasattr(source, 'getbuffer'):
+        size = source.getbuffer().nbytes
+    return (size or 0) / 1024**2
+
+
+def _open_arrow_csv(source, columns: Optional[List[str]]):
+    """
+    Abrir un CSV con el lector en streaming de pyarrow, con los tipos del motor C
+    
+    Como en pandas, el texto vacío de columnas de texto es nulo y las fechas y
+    horas se dejan como texto (si pyarrow las infiere, se reabre el archivo
+    leyendo esas columnas como string).
+    
+    Args:
+        source: Ruta o archivo subido
+        columns: Columnas a leer (None = todas)
+        
+    Returns:
+        pyarrow.csv.CSVStreamingReader
+    """
+    def open_reader(column_types=None):
+        if not isinstance(source, (str, Path)):
+            source.seek(0)
+        return pa_csv.open_csv(
+            str(source) if isinstance(source, Path) else source,
+            read_options=pa_csv.ReadOptions(use_threads=True),
+            # Como el motor C, admite saltos de línea dentro de campos entre comillas
+            parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=columns,
+                strings_can_be_null=True,
+                column_types=column_types
+            )
+        )
+    
+    reader = open_reader()
+    temporal = {field.name: pa.string() for field in reader.schema if pa.types.is_temporal(field.type)}
+    if temporal:
+        reader = open_reader(temporal)
+    if any(pa.types.is_binary(field.type) for field in reader.schema):
+        # pyarrow deja como binario el texto que no es UTF-8; el motor C da el error de codificación
+        raise ValueError("texto con codificación distinta de UTF-8")
+    return reader
+
+
+def _arrow_csv_to_pandas(table) -> pd.DataFrame:
+    """Convertir una tabla leída de un CSV a pandas con NaN (no None) como nulo de texto, como el motor C"""
+    df = table.to_pandas()
+    for field, column in zip(table.schema, table.columns):
+        if pa.types.is_string(field.type) and column.null_count > 0:
+            df[field.name] = df[field.name].fillna(np.nan)
+    return df
+
+
+def _arrow_csv_chunks(source, reader, columns: Optional[List[str]], chunksize: int) -> Iterator[pd.DataFrame]:
+    """
+    Convertir los record batches de un CSV en bloques de chunksize filas
+    
+    Solo se tienen en memoria los batches del bloque en curso. Si pyarrow
+    falla a mitad del archivo (p.ej. un valor que no encaja con el tipo
+    inferido en el primer bloque), el archivo se vuelve a leer desde el
+    principio con el motor C y se descartan los registros ya devueltos. Se
+    cuentan registros y no líneas: un campo entre comillas puede ocupar varias.
+    """
+    rows = 0
+    pending, n_pending = [], 0
+    try:
+        for batch in reader:
+            pending.append(batch)
+            n_pending += batch.num_rows
+            while n_pending >= chunksize:
+                table = pa.Table.from_batches(pending, reader.schema)
+                rest = table.slice(chunksize)
+                pending, n_pending = rest.to_batches(), rest.num_rows
+                rows += chunksize
+                yield _arrow_csv_to_pandas(table.slice(0, chunksize))
+    except pa.ArrowException as e:
+        logger.warning("El motor pyarrow falló tras %d filas (%s); se sigue con el motor C", rows, e)
+        if not isinstance(source, (str, Path)):
+            source.seek(0)
+        for chunk in pd.read_csv(source, usecols=columns, chunksize=chunksize):
+            if rows >= len(chunk):
+                rows -= len(chunk)
+                continue
+            yield chunk.iloc[rows:]
+            rows = 0
+        return
+    if n_pending:
+        yield _arrow_csv_to_pandas(pa.Table.from_batches(pending, reader.schema))
+
+
+def _csv_reader(source, engine: str, columns: Optional[List[str]], chunksize: Optional[int]):
+    """
+    Crear el iterador de bloques de un CSV con el motor pedido
+    
+    El motor 'pyarrow' parsea en varios hilos con su lector en streaming y
+    convierte a pandas bloque a bloque, sin cargar el archivo entero (ver
+    _arrow_csv_chunks). Si pyarrow no está instalado o falla al abrir el
+    archivo, se vuelve a leer con el motor C de pandas, cuyos errores
+    mantienen los mensajes habituales.
+    
+    Args:
+        source: Ruta o archivo subido
+        engine: 'pyarrow' o 'c'
+        columns: Columnas a leer (None = todas)
+        chunksize: Filas por bloque (None = un solo bloque)
+        
+    Returns:
+        Tuple[iterador de DataFrames, motor usado]
+    """
+    if engine == 'pyarrow':
+        try:
+            if pa_csv is None:
+                raise ImportError("pyarrow no está instalado")
+            reader = _open_arrow_csv(source, columns)
+            if chunksize is None:
+                return iter([_arrow_csv_to_pandas(reader.read_all())]), 'pyarrow'
+        except Exception as e:
+            logger.warning("El motor pyarrow no pudo leer el CSV (%s); se usa el motor C", e)
+            if not isinstance(source, (str, Path)):
+                source.seek(0)
+        else:
+            return _arrow_csv_chunks(source, reader, columns, chunksize), 'pyarrow'
+    
+    if chunksize is None:
+        return iter([pd.read_csv(source, usecols=columns)]), 'c'
+    return pd.read_csv(source, usecols=columns, chunksize=chunksize), 'c'
+
+
+def load_data(
+    uploaded_file,
+    chunksize: Optional[int] = None,
+    optimize: bool = False,
+    category_max_unique_ratio: float = 0.5,
+    columns: Optional[List[str]] = None,
+    engine: str = 'c'
+) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+    """
+    Cargar datos desde archivo CSV, Parquet, Feather o Arrow IPC
+    
+    Con chunksize el CSV se lee por bloques: la condición de columna
+    numérica se comprueba con el primer bloque y, con optimize=True, cada
+    bloque se reduce con optimize_dtypes antes de leer el siguiente, de modo
+    que nunca se tiene el archivo completo con los tipos por defecto. Las
+    columnas 'category' se deciden en el primer bloque. La memoria antes y
+    después de optimizar se guarda en df.attrs['load_info'].
+    
+    Los formatos columnares se leen con pyarrow, también por bloques si se
+    indica chunksize; si se pasa una ruta, Feather/Arrow se mapean en memoria
+    y solo se convierten a pandas las columnas pedidas (Parquet lee del disco
+    solo esas columnas).
+    
+    El CSV puede parsearse con el motor 'pyarrow' (multihilo), que vuelve al
+    motor C si falla. La velocidad de lectura (MB/s) se registra en el log y
+    en df.attrs['load_info'].
+    
+    Args:
+        uploaded_file: Archivo subido a través de Streamlit o ruta a un archivo
+        chunksize: Filas por bloque (None = lectura en una sola pasada)
+        optimize: Si True, reduce los tipos (float32, enteros pequeños, 'category')
+        category_max_unique_ratio: Proporción máxima de valores únicos para usar 'category'
+        columns: Columnas a leer (None = todas)
+        engine: Motor para CSV ('c' o 'pyarrow')
         
     Returns:
         Tuple[DataFrame, error]: DataFrame con los datos o None si hay error, mensaje de error o None
     """
+    file_format = get_file_format(uploaded_file)
+    start = time.perf_counter()
     try:
-        df = pd.read_csv(uploaded_file)
+        if file_format != 'CSV':
+            reader, engine_used = _arrow_reader(uploaded_file, file_format, columns, chunksize), 'pyarrow'
+        else:
+            reader, engine_used = _csv_reader(uploaded_file, engine, columns, chunksize)
+        
+        chunks = []
+        original_bytes = 0
+        category_columns = None
+        for chunk in reader:
+            if not chunks:
+                # Validaciones básicas sobre el primer bloque
+                if chunk.empty:
+                    return None, f"El archivo {file_format} está vacío"
+                
+                if len(chunk.columns) == 0:
+                    return None, f"El archivo {file_format} no tiene columnas"
+                
+                # Verificar que haya al menos una columna numérica
+                numeric_cols = chunk.select_dtypes(include=['number']).columns
+                if len(numeric_cols) == 0:
+                    return None, "El archivo debe contener al menos una columna numérica"
+            
+            original_bytes += chunk.memory_usage(deep=True).sum()
+            if optimize:
+                chunk = optimize_dtypes(chunk, category_columns, category_max_unique_ratio)
+                if category_columns is None:
+                    category_columns = chunk.select_dtypes(include=['category']).columns.tolist()
+            chunks.append(chunk)
         
-        # Validaciones básicas
-        if df.empty:
-            return None, "El archivo CSV está vacío"
+        if not chunks:
+            return None, f"El archivo {file_format} está vacío"
         
-        if len(df.columns) == 0:
-            return None, "El archivo CSV no tiene columnas"
+        df = _concat_chunks(chunks)
+        if optimize:
+            # Un bloque entero y otro con nulos se unen como float64: se vuelve a reducir
+            _downcast_floats(df)
         
-        # Verificar que haya al menos una columna numérica
-        numeric_cols = df.select_dtypes(include=['number']).columns
-        if len(numeric_cols) == 0:
-            return None, "El archivo debe contener al menos una columna numérica"
+        load_info = _load_info(df, original_bytes, len(chunks))
+        load_info['engine'] = engine_used
+        load_info['file_mb'] = _source_size_mb(uploaded_file)
+        load_info['read_seconds'] = time.perf_counter() - start
+        load_info['throughput_mb_s'] = load_info['file_mb'] / max(load_info['read_seconds'], 1e-9)
+        logger.info(
+            "%s leído con el motor %s: %.1f MB en %.2f s (%.1f MB/s)",
+            file_format, engine_used, load_info['file_mb'],
+            load_info['read_seconds'], load_info['throughput_mb_s']
+        )
         
+        df.attrs['load_info'] = load_info
         return df, None
     except pd.errors.EmptyDataError:
         return None, "El archivo CSV está vacío"
@@ -38,4 +569,82 @@ def load_data(uploaded_file) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
     except UnicodeDecodeError:
         return None, "Error de codificación. Intenta guardar el archivo como UTF-8."
     except Exception as e:
+        if file_format != 'CSV':
+            return None, f"Error al leer el archivo {file_format}: {str(e)}"
         return None, f"Error inesperado: {str(e)}"
+
+
+def load_data_cached(
+    uploaded_file,
+    fingerprint: Optional[str] = None,
+    **load_kwargs
+) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+    """
+    Cargar datos con load_data reutilizando los ya parseados
+    
+    La clave combina la huella del archivo (ver fingerprint_file) con los
+    parámetros de lectura, de modo que volver a subir el mismo archivo, aunque
+    sea desde otra sesión, no lo vuelve a parsear. Los resultados se guardan
+    en memoria y en disco como Arrow (settings.DATASET_CACHE_DIR), con
+    expulsión LRU. Los archivos del volumen de datos (rutas) solo se guardan
+    en memoria: ya están en disco y copiarlos duplicaría varios GB por carga.
+    La huella se guarda en df.attrs['fingerprint'].
+    
+    Args:
+        uploaded_file: Archivo subido a través de Streamlit o ruta a un archivo
+        fingerprint: Huella ya calculada del archivo (None = se calcula)
+        **load_kwargs: Parámetros de load_data
+        
+    Returns:
+        Tuple[DataFrame, error]: igual que load_data. Los DataFrames devueltos
+        se comparten entre llamadas y no deben modificarse
+    """
+    fingerprint = fingerprint or fingerprint_file(uploaded_file)
+    key = hashlib.blake2b(
+        f"{fingerprint}|{sorted(load_kwargs.items())!r}".encode(), digest_size=16
+    ).hexdigest()
+    
+    df = _dataset_cache.get(key)
+    if df is not None:
+        return df, None
+    
+    df, error = load_data(uploaded_file, **load_kwargs)
+    if error is None:
+        df.attrs['fingerprint'] = fingerprint
+        _dataset_cache.put(key, df, disk=not isinstance(uploaded_file, (str, Path)))
+    return df, error
+
+
+def get_dataset_cache_stats() -> Dict[str, float]:
+    """
+    Obtener aciertos, fallos y ocupación de la caché de datasets
+    
+    Returns:
+        Dict devuelto por ResultCache.stats
+    """
+    return _dataset_cache.stats()
+
+
+def iter_chunks(source, columns: Optional[List[str]] = None, chunksize: int = 100_000) -> Iterator[pd.DataFrame]:
+    """
+    Recorrer un archivo por bloques sin cargarlo entero en memoria
+    
+    Los CSV se leen por bloques con el motor C de pandas; Parquet se lee por
+    lotes de row groups y Arrow/Feather con memory mapping. Cada llamada
+    empieza un recorrido nuevo, así que sirve como fuente de datos de
+    scale_data_streaming.
+    
+    Args:
+        source: Ruta o archivo subido
+        columns: Columnas a leer (None = todas)
+        chunksize: Filas por bloque
+        
+    Returns:
+        Iterador de DataFrames
+    """
+    file_format = get_file_format(source)
+    if not isinstance(source, (str, Path)):
+        source.seek(0)
+    if file_format == 'CSV':
+        return iter(pd.read_csv(source, usecols=columns, chunksize=chunksize))
+    return _arrow_reader(source, file_format, columns, chunksize)
@@ -0,0 +1,164 @@
+"""
+Módulo de registro de datasets del servidor
+
+Los archivos demasiado grandes para subirlos por el navegador se colocan en el
+volumen de datos (settings.DATA_DIR, /app/data en Docker). Cada archivo tiene
+un fichero de metadatos junto a él (<archivo>.meta.json) con su tamaño, número
+de filas y esquema, para listarlos sin volver a leerlos.
+"""
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from config import settings
+from .data_loader import get_file_format, list_data_files, read_schema, pa, pq
+
+
+METADATA_SUFFIX = '.meta.json'
+
+logger = logging.getLogger(__name__)
+
+
+def sidecar_path(path) -> Path:
+    """
+    Obtener la ruta del fichero de metadatos de un dataset
+    
+    Args:
+        path: Ruta del dataset
+    
+    Returns:
+        Ruta <archivo>.meta.json en el mismo directorio
+    """
+    path = Path(path)
+    return path.with_name(path.name + METADATA_SUFFIX)
+
+
+def count_rows(path) -> int:
+    """
+    Contar las filas de un dataset sin cargarlo en memoria
+    
+    Parquet y Arrow/Feather leen el número de filas de sus metadatos; en CSV
+    se cuentan los saltos de línea leyendo por bloques (las líneas con saltos
+    dentro de comillas cuentan como varias filas).
+    
+    Args:
+        path: Ruta del dataset
+    
+    Returns:
+        Número de filas de datos (sin cabecera)
+    """
+    path = Path(path)
+    file_format = get_file_format(path)
+    
+    if file_format == 'Parquet':
+        return pq.ParquetFile(path).metadata.num_rows
+    if file_format != 'CSV':
+        with pa.memory_map(str(path), 'r') as source:
+            try:
+                reader = pa.ipc.open_file(source)
+                return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+            except pa.ArrowInvalid:
+                source.seek(0)
+                return sum(batch.num_rows for batch in pa.ipc.open_stream(source))
+    
+    n_lines = 0
+    last_block = b''
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(8 * 1024 * 1024), b''):
+            n_lines += block.count(b'\n')
+            last_block = block
+    if last_block and not last_block.endswith(b'\n'):
+        n_lines += 1
+    return max(0, n_lines - 1)
+
+
+def build_metadata(path) -> Dict:
+    """
+    Calcular los metadatos de un dataset y guardarlos en su fichero .meta.json
+    
+    Si el directorio no es escribible los metadatos se devuelven sin guardar.
+    
+    Args:
+        path: Ruta del dataset
+    
+    Returns:
+        Dict con name, path, format, size_mb, size_bytes, mtime_ns, n_rows,
+        n_columns, schema y registered_at
+    """
+    path = Path(path)
+    stat = path.stat()
+    schema = read_schema(path)
+    metadata = {
+        'name': path.name,
+        'format': get_file_format(path),
+        'size_bytes': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'n_rows': count_rows(path),
+        'n_columns': len(schema),
+        'schema': schema,
+        'registered_at': datetime.now().isoformat(timespec='seconds')
+    }
+    
+    try:
+        sidecar_path(path).write_text(json.dumps(metadata, indent=2, ensure_ascii=False), encoding='utf-8')
+    except OSError:
+        pass
+    
+    return _with_runtime_fields(metadata, path)
+
+
+def _with_runtime_fields(metadata: Dict, path: Path) -> Dict:
+    """Añadir a los metadatos guardados la ruta y el tamaño en MB"""
+    return {**metadata, 'path': path, 'size_mb': metadata['size_bytes'] / 1024**2}
+
+
+def get_metadata(path, refresh: bool = False) -> Dict:
+    """
+    Obtener los metadatos de un dataset desde su fichero .meta.json
+    
+    Si el fichero no existe, no se puede leer o el dataset ha cambiado desde
+    que se registró (tamaño o fecha de modificación distintos), se recalculan.
+    
+    Args:
+        path: Ruta del dataset
+        refresh: Si True, recalcula siempre los metadatos
+    
+    Returns:
+        Dict de build_metadata
+    """
+    path = Path(path)
+    sidecar = sidecar_path(path)
+    
+    if not refresh and sidecar.exists():
+        try:
+            metadata = json.loads(sidecar.read_text(encoding='utf-8'))
+            stat = path.stat()
+            if metadata.get('size_bytes') == stat.st_size and metadata.get('mtime_ns') == stat.st_mtime_ns:
+                return _with_runtime_fields(metadata, path)
+        except (OSError, ValueError):
+            pass
+    
+    return build_metadata(path)
+
+
+def list_datasets(directory: Optional[Path] = None) -> List[Dict]:
+    """
+    Listar los datasets registrados en el volumen de datos
+    
+    Los archivos nuevos o modificados se registran al listarlos; los
+    archivos que no se pueden leer se omiten.
+    
+    Args:
+        directory: Directorio a explorar (por defecto settings.DATA_DIR)
+    
+    Returns:
+        Lista de metadatos (ver build_metadata), ordenada por nombre
+    """
+    datasets = []
+    for data_file in list_data_files(directory or settings.DATA_DIR):
+        try:
+            datasets.append(get_metadata(data_file['path']))
+        except Exception as e:
+            logger.warning("No se pudo registrar %s: %s", data_file['name'], e)
+    return datasets
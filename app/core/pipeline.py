@@ -0,0 +1,62 @@
+"""
+Módulo para repetir la configuración del pipeline sobre otros datos
+"""
+import pandas as pd
+from typing import Dict
+from config import settings
+from .data_cleaner import clean_data, CleaningPipeline
+from .scaler import scale_data, scale_data_streaming
+from .clustering import perform_clustering
+
+
+def replay_pipeline(data: pd.DataFrame, config: Dict) -> Dict:
+    """
+    Ejecutar limpieza, escalado y clustering con una configuración guardada
+    
+    Se usa en el modo vista previa: las páginas registran los parámetros
+    aplicados a la muestra y aquí se repiten sobre los datos completos.
+    
+    Args:
+        data: DataFrame completo
+        config: Configuración registrada con las claves 'clean' (argumentos de
+            clean_data, opcional), 'cleaning_pipeline' (CleaningPipeline.to_dict
+            de un pipeline ya ajustado, opcional; tiene prioridad sobre 'clean'
+            y se aplica sin reajustar), 'selected_features' (opcional), 'scaling'
+            ({'scaler_type', 'columns', 'streaming'}) y 'clustering' (argumentos de
+            perform_clustering)
+    
+    Returns:
+        Dict con data_clean, data_scaled, scaler y cluster_results
+    """
+    if 'scaling' not in config or 'clustering' not in config:
+        raise ValueError("La configuración debe incluir al menos el escalado y el clustering")
+    
+    if 'cleaning_pipeline' in config:
+        data_clean = CleaningPipeline.from_dict(config['cleaning_pipeline']).transform(data)
+    elif 'clean' in config:
+        data_clean = clean_data(data, **config['clean'])
+    else:
+        data_clean = data
+    
+    scaling = config['scaling']
+    columns = scaling.get('columns') or config.get('selected_features') or None
+    if scaling.get('streaming'):
+        data_scaled, scaler = scale_data_streaming(
+            data_clean, scaling['scaler_type'], columns,
+            chunksize=settings.SCALE_CHUNK_SIZE,
+            sketch_k=settings.QUANTILE_SKETCH_K,
+            dtype=settings.PRECISION
+        )
+    else:
+        data_scaled, scaler = scale_data(data_clean, scaling['scaler_type'], columns, dtype=settings.PRECISION)
+    if scaler is None:
+        raise ValueError(f"Método de escalado desconocido: '{scaling['scaler_type']}'")
+    
+    cluster_results = perform_clustering(data_scaled, **config['clustering'])
+    
+    return {
+        'data_clean': data_clean,
+        'data_scaled': data_scaled,
+        'scaler': scaler,
+        'cluster_results': cluster_results
+    }
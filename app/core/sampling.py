@@ -0,0 +1,138 @@
+"""
+Módulo de muestreo de datos para el modo vista previa
+"""
+import numpy as np
+import pandas as pd
+from typing import Iterable, Optional, Union
+
+
+def stratified_indices(labels: np.ndarray, sample_size: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Obtener índices de una submuestra estratificada por etiqueta
+    
+    Cada estrato aporta filas en proporción a su tamaño (al menos una), de modo
+    que todos los estratos están representados en la muestra.
+    
+    Args:
+        labels: Etiqueta (estrato) de cada fila
+        sample_size: Tamaño aproximado de la muestra
+        rng: Generador de números aleatorios
+    
+    Returns:
+        Array ordenado con los índices seleccionados
+    """
+    n_samples = len(labels)
+    unique_labels, inverse, counts = np.unique(labels, return_inverse=True, return_counts=True)
+    order = np.argsort(inverse, kind='stable')
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    
+    indices = []
+    for label_idx, count in enumerate(counts):
+        n_take = min(count, max(1, int(round(sample_size * count / n_samples))))
+        members = order[starts[label_idx]:starts[label_idx] + count]
+        indices.append(rng.choice(members, size=n_take, replace=False))
+    
+    return np.sort(np.concatenate(indices))
+
+
+def reservoir_sample(
+    chunks: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+    n_rows: int,
+    random_state: int = 42
+) -> pd.DataFrame:
+    """
+    Muestreo aleatorio uniforme de n_rows filas en una sola pasada
+    
+    Reservoir sampling por claves aleatorias: cada fila recibe una clave
+    uniforme y se conservan las n_rows filas con menor clave. Funciona sobre
+    un iterable de bloques (p.ej. un CSV leído por partes) sin tener nunca en
+    memoria más que la reserva y el bloque actual; una vez llena la reserva,
+    solo se copian las filas del bloque con clave menor que la máxima actual.
+    
+    Args:
+        chunks: DataFrame o iterable de bloques con las mismas columnas
+        n_rows: Tamaño de la muestra
+        random_state: Semilla para reproducibilidad
+    
+    Returns:
+        DataFrame con la muestra, en el orden original de las filas
+    """
+    if isinstance(chunks, pd.DataFrame):
+        chunks = [chunks]
+    
+    rng = np.random.default_rng(random_state)
+    reservoir = None
+    keys = np.empty(0)
+    positions = np.empty(0, dtype=np.int64)
+    offset = 0
+    
+    for chunk in chunks:
+        chunk_keys = rng.random(len(chunk))
+        chunk_positions = np.arange(offset, offset + len(chunk))
+        offset += len(chunk)
+        
+        if len(keys) >= n_rows:
+            candidates = chunk_keys < keys.max()
+            chunk, chunk_keys, chunk_positions = chunk[candidates], chunk_keys[candidates], chunk_positions[candidates]
+            if len(chunk) == 0:
+                continue
+        
+        reservoir = chunk if reservoir is None else pd.concat([reservoir, chunk])
+        keys = np.concatenate([keys, chunk_keys])
+        positions = np.concatenate([positions, chunk_positions])
+        
+        if len(keys) > n_rows:
+            keep = np.argpartition(keys, n_rows)[:n_rows]
+            reservoir, keys, positions = reservoir.iloc[keep], keys[keep], positions[keep]
+    
+    if reservoir is None:
+        raise ValueError("No hay filas para muestrear")
+    
+    return reservoir.iloc[np.argsort(positions, kind='stable')]
+
+
+def stratified_sample(df: pd.DataFrame, n_rows: int, column: str, random_state: int = 42) -> pd.DataFrame:
+    """
+    Muestreo estratificado por una columna, proporcional al tamaño de cada estrato
+    
+    Args:
+        df: DataFrame a muestrear
+        n_rows: Tamaño aproximado de la muestra
+        column: Columna que define los estratos (los nulos forman su propio estrato)
+        random_state: Semilla para reproducibilidad
+    
+    Returns:
+        DataFrame con la muestra, en el orden original de las filas
+    """
+    codes, _ = pd.factorize(df[column], use_na_sentinel=False)
+    rng = np.random.default_rng(random_state)
+    return df.iloc[stratified_indices(codes, n_rows, rng)]
+
+
+def sample_data(
+    df: pd.DataFrame,
+    n_rows: int,
+    method: str = 'reservoir',
+    stratify_column: Optional[str] = None,
+    random_state: int = 42
+) -> pd.DataFrame:
+    """
+    Obtener una muestra de los datos para el modo vista previa
+    
+    Args:
+        df: DataFrame completo
+        n_rows: Tamaño de la muestra (si df tiene menos filas se devuelve completo)
+        method: 'reservoir' (aleatorio uniforme) o 'stratified'
+        stratify_column: Columna de estratos (obligatoria con 'stratified')
+        random_state: Semilla para reproducibilidad
+    
+    Returns:
+        DataFrame con la muestra
+    """
+    if len(df) <= n_rows:
+        return df
+    if method == 'stratified':
+        if stratify_column is None:
+            raise ValueError("El muestreo estratificado necesita una columna de estratos")
+        return stratified_sample(df, n_rows, stratify_column, random_state)
+    return reservoir_sample(df, n_rows, random_state)
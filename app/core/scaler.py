@@ -1,23 +1,99 @@
 """
 Módulo para escalado de datos
 """
+import json
+import numpy as np
 import pandas as pd
-from sklearn.preprocessing import StandardScaler, MinMaxScaler, RobustScaler
-from typing import Tuple, Optional, List
+from pathlib import Path
+from sklearn.base import BaseEstimator
+from sklearn.preprocessing import StandardScaler, MinMaxScaler, RobustScaler, QuantileTransformer, PowerTransformer
+from typing import IO, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple, Union
+from config import settings
+from .cache import LRUCache
+from .sketch import QuantileSketch
+
+
+SCALER_FORMAT_VERSION = 2
+
+# Clases que load_scaler puede reconstruir (el formato es JSON, nunca pickle)
+_SCALER_CLASSES = {
+    cls.__name__: cls
+    for cls in (StandardScaler, MinMaxScaler, RobustScaler, QuantileTransformer, PowerTransformer)
+}
+
+# Escaladores que dependen de la distribución completa y pueden ajustarse con un QuantileSketch
+SKETCH_SCALERS = ('robust', 'quantile', 'power')
+SCALER_TYPES = ('standard', 'minmax') + SKETCH_SCALERS
+
+# Comparaciones de escaladores ya calculadas, por (huella del dataset, columnas, bins)
+_comparison_cache = LRUCache(max_entries=settings.SCALER_COMPARISON_CACHE_MAX_ENTRIES)
+
+
+def _make_scaler(scaler_type: str, n_quantiles: int = 1000):
+    """Crear el escalador de scikit-learn de un tipo (None si no existe)"""
+    if scaler_type == 'standard':
+        return StandardScaler()
+    if scaler_type == 'minmax':
+        return MinMaxScaler()
+    if scaler_type == 'robust':
+        return RobustScaler()
+    if scaler_type == 'quantile':
+        return QuantileTransformer(n_quantiles=n_quantiles, output_distribution='normal')
+    if scaler_type == 'power':
+        return PowerTransformer(method='yeo-johnson')
+    return None
+
+
+def fit_scaler_from_sketch(scaler_type: str, sketch: QuantileSketch, columns: List[str], n_quantiles: int = 1001):
+    """
+    Ajustar un escalador basado en cuantiles a partir de un QuantileSketch
+    
+    El escalador se ajusta sobre la rejilla de n_quantiles cuantiles
+    equiespaciados del sketch. Con 1001 puntos, los cuantiles de la rejilla
+    coinciden exactamente con los del sketch: RobustScaler toma de ella la
+    mediana y el rango intercuartílico y QuantileTransformer sus
+    n_quantiles referencias. Para Yeo-Johnson la rejilla es una muestra
+    equiprobable de la distribución con la que se estiman lambda, la media
+    y la desviación.
+    
+    Args:
+        scaler_type: 'robust', 'quantile' o 'power'
+        sketch: Sketch con los datos de las columnas, en el mismo orden
+        columns: Nombres de las columnas
+        n_quantiles: Puntos de la rejilla de cuantiles
+    
+    Returns:
+        Escalador ajustado
+    """
+    if scaler_type not in SKETCH_SCALERS:
+        raise ValueError(f"El escalador '{scaler_type}' no se ajusta con cuantiles")
+    grid = pd.DataFrame(sketch.quantiles(np.linspace(0, 1, n_quantiles)), columns=columns)
+    return _make_scaler(scaler_type, n_quantiles).fit(grid)
 
 
 def scale_data(
     df: pd.DataFrame,
     scaler_type: str = 'standard',
-    columns_to_scale: Optional[List[str]] = None
+    columns_to_scale: Optional[List[str]] = None,
+    dtype=None,
+    sketch_rows: Optional[int] = None,
+    sketch_k: Optional[int] = None
 ) -> Tuple[pd.DataFrame, object]:
     """
     Escalar datos numéricos
     
+    A partir de sketch_rows filas, los escaladores basados en cuantiles
+    ('robust', 'quantile', 'power') se ajustan con un QuantileSketch en vez
+    de ordenar cada columna completa (ver fit_scaler_from_sketch).
+    
     Args:
         df: DataFrame con datos a escalar
-        scaler_type: Tipo de escalador ('standard', 'minmax', 'robust')
+        scaler_type: Tipo de escalador ('standard', 'minmax', 'robust', 'quantile', 'power')
         columns_to_scale: Lista de columnas a escalar. Si None, escala todas las numéricas
+        dtype: Tipo de los datos escalados (p.ej. 'float32', ver settings.PRECISION).
+               None = el que devuelva scikit-learn (float64 salvo entradas float32)
+        sketch_rows: Filas a partir de las que se usa el sketch (por defecto settings.SKETCH_SCALE_ROWS)
+        sketch_k: Tamaño del sketch (por defecto settings.QUANTILE_SKETCH_K)
         
     Returns:
         Tuple[DataFrame escalado, scaler fitted]
@@ -34,21 +110,415 @@ def scale_data(
     if df[columns_to_scale].isnull().any().any():
         raise ValueError("Los datos contienen valores NaN. Por favor, limpia los datos primero.")
     
-    if scaler_type == 'standard':
-        scaler = StandardScaler()
-    elif scaler_type == 'minmax':
-        scaler = MinMaxScaler()
-    elif scaler_type == 'robust':
-        scaler = RobustScaler()
-    else:
+    scaler = _make_scaler(scaler_type, min(1000, len(df)))
+    if scaler is None:
         return df[columns_to_scale], None
     
+    values = df[columns_to_scale]
+    if dtype is not None:
+        values = values.astype(dtype)
+    
     try:
+        if scaler_type in SKETCH_SCALERS and len(df) >= (sketch_rows or settings.SKETCH_SCALE_ROWS):
+            sketch = QuantileSketch(sketch_k or settings.QUANTILE_SKETCH_K, random_state=42)
+            for start in range(0, len(values), settings.SCALE_CHUNK_SIZE):
+                sketch.update(values.iloc[start:start + settings.SCALE_CHUNK_SIZE])
+            scaler = fit_scaler_from_sketch(scaler_type, sketch, columns_to_scale)
+            scaled = scaler.transform(values)
+        else:
+            scaled = scaler.fit_transform(values)
+        if dtype is not None:
+            scaled = scaled.astype(dtype, copy=False)
         df_scaled = pd.DataFrame(
-            scaler.fit_transform(df[columns_to_scale]),
+            scaled,
             columns=columns_to_scale,
             index=df.index
         )
         return df_scaled, scaler
     except Exception as e:
         raise ValueError(f"Error al escalar los datos: {str(e)}")
+
+
+def _chunk_factory(source: Union[pd.DataFrame, Callable[[], Iterable[pd.DataFrame]]], chunksize: int) -> Callable[[], Iterator[pd.DataFrame]]:
+    """Convertir la fuente en una función que empieza un recorrido nuevo por bloques"""
+    if isinstance(source, pd.DataFrame):
+        return lambda: (source.iloc[start:start + chunksize] for start in range(0, len(source), chunksize))
+    return lambda: iter(source())
+
+
+def scale_data_streaming(
+    source: Union[pd.DataFrame, Callable[[], Iterable[pd.DataFrame]]],
+    scaler_type: str = 'standard',
+    columns_to_scale: Optional[List[str]] = None,
+    chunksize: int = 100_000,
+    output_path: Optional[Union[str, Path]] = None,
+    dtype=np.float32,
+    sketch_k: Optional[int] = None,
+    random_state: int = 42
+) -> Tuple[pd.DataFrame, object]:
+    """
+    Escalar datos por bloques con memoria acotada
+    
+    Se hacen dos recorridos: el primero ajusta el escalador con partial_fit
+    bloque a bloque (los basados en cuantiles, 'robust', 'quantile' y 'power',
+    se ajustan con un QuantileSketch que se alimenta con cada bloque) y el
+    segundo transforma cada bloque directamente en una matriz float32
+    reservada de antemano, o en un archivo .npy mapeado en memoria si se
+    indica output_path. Así no se
+    guardan los datos dos veces en memoria y se pueden escalar datasets
+    mayores que la RAM.
+    
+    Args:
+        source: DataFrame o función sin argumentos que devuelve un iterable de
+                bloques nuevo en cada llamada (p.ej. lambda: iter_chunks(ruta))
+        scaler_type: Tipo de escalador ('standard', 'minmax', 'robust', 'quantile', 'power')
+        columns_to_scale: Lista de columnas a escalar. Si None, escala todas las numéricas
+        chunksize: Filas por bloque cuando source es un DataFrame
+        output_path: Archivo .npy donde guardar el resultado (None = en memoria)
+        dtype: Tipo de la matriz de salida
+        sketch_k: Tamaño del sketch de cuantiles (por defecto settings.QUANTILE_SKETCH_K)
+        random_state: Semilla del sketch de cuantiles
+    
+    Returns:
+        Tuple[DataFrame escalado (sobre la matriz de salida, sin copiarla), scaler fitted]
+    """
+    if scaler_type not in SCALER_TYPES:
+        raise ValueError(f"Escalador no soportado en modo por bloques: '{scaler_type}'")
+    
+    chunks = _chunk_factory(source, chunksize)
+    
+    def selected(chunk_iter):
+        nonlocal columns_to_scale
+        for chunk in chunk_iter:
+            if columns_to_scale is None:
+                columns_to_scale = chunk.select_dtypes(include=[np.number]).columns.tolist()
+                if len(columns_to_scale) == 0:
+                    raise ValueError("No hay columnas numéricas para escalar")
+            block = chunk[columns_to_scale]
+            if block.isnull().any().any():
+                raise ValueError("Los datos contienen valores NaN. Por favor, limpia los datos primero.")
+            yield block
+    
+    # Primer recorrido: ajustar el escalador
+    n_rows = 0
+    if scaler_type in SKETCH_SCALERS:
+        sketch = QuantileSketch(sketch_k or settings.QUANTILE_SKETCH_K, random_state=random_state)
+        for block in selected(chunks()):
+            sketch.update(block)
+            n_rows += len(block)
+    else:
+        scaler = _make_scaler(scaler_type)
+        for block in selected(chunks()):
+            scaler.partial_fit(block)
+            n_rows += len(block)
+    
+    if n_rows == 0 or columns_to_scale is None:
+        raise ValueError("No hay datos para escalar")
+    if scaler_type in SKETCH_SCALERS:
+        scaler = fit_scaler_from_sketch(scaler_type, sketch, columns_to_scale)
+    
+    shape = (n_rows, len(columns_to_scale))
+    if output_path is not None:
+        output = np.lib.format.open_memmap(str(output_path), mode='w+', dtype=dtype, shape=shape)
+    else:
+        output = np.empty(shape, dtype=dtype)
+    
+    # Segundo recorrido: transformar cada bloque en su tramo de la salida
+    offset = 0
+    for block in selected(chunks()):
+        end = offset + len(block)
+        if end > n_rows:
+            raise ValueError("La fuente de datos devolvió más filas en el segundo recorrido")
+        output[offset:end] = scaler.transform(block)
+        offset = end
+    if offset != n_rows:
+        raise ValueError("La fuente de datos devolvió menos filas en el segundo recorrido")
+    
+    if isinstance(output, np.memmap):
+        output.flush()
+    
+    index = source.index if isinstance(source, pd.DataFrame) else None
+    return pd.DataFrame(output, columns=columns_to_scale, index=index, copy=False), scaler
+
+
+def _encode_value(value):
+    """Convertir un parámetro o atributo ajustado en un valor JSON"""
+    if isinstance(value, BaseEstimator):
+        return {'estimator': _scaler_state(value)}
+    if isinstance(value, np.ndarray):
+        return {'array': value.tolist(), 'dtype': value.dtype.str}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, tuple):
+        return {'tuple': [_encode_value(item) for item in value]}
+    return value
+
+
+def _decode_value(value):
+    """Inverso de _encode_value"""
+    if isinstance(value, dict):
+        if 'estimator' in value:
+            return _scaler_from_state(value['estimator'])
+        if 'array' in value:
+            return np.array(value['array'], dtype=np.dtype(value['dtype']))
+        if 'tuple' in value:
+            return tuple(_decode_value(item) for item in value['tuple'])
+    return value
+
+
+def _scaler_state(scaler) -> Dict:
+    """Clase, parámetros y atributos ajustados (incluido p.ej. el _scaler interno de PowerTransformer) como dict JSON"""
+    if type(scaler).__name__ not in _SCALER_CLASSES:
+        raise ValueError(f"Escalador no soportado: {type(scaler).__name__}")
+    params = scaler.get_params(deep=False)
+    return {
+        'class': type(scaler).__name__,
+        'params': {name: _encode_value(value) for name, value in params.items()},
+        'attributes': {
+            name: _encode_value(value) for name, value in vars(scaler).items() if name not in params
+        }
+    }
+
+
+def _scaler_from_state(state: Dict):
+    """Reconstruir un escalador de _SCALER_CLASSES a partir de _scaler_state"""
+    cls = _SCALER_CLASSES.get(state.get('class'))
+    if cls is None:
+        raise ValueError(f"Escalador no soportado: {state.get('class')}")
+    scaler = cls(**{name: _decode_value(value) for name, value in state['params'].items()})
+    for name, value in state['attributes'].items():
+        setattr(scaler, name, _decode_value(value))
+    return scaler
+
+
+def save_scaler(scaler, columns: List[str], target: Union[str, Path, IO[bytes]]) -> None:
+    """
+    Guardar un escalador ajustado junto con sus columnas
+    
+    Se guardan como JSON la clase, los parámetros y los arrays ajustados; a
+    diferencia de pickle/joblib, cargar el archivo no puede ejecutar código.
+    
+    Args:
+        scaler: Escalador de scikit-learn ya ajustado (uno de _SCALER_CLASSES)
+        columns: Columnas en el orden en que se ajustó
+        target: Ruta o archivo binario abierto (p.ej. BytesIO) donde guardarlo
+    """
+    text = json.dumps({
+        'version': SCALER_FORMAT_VERSION,
+        'scaler': _scaler_state(scaler),
+        'columns': list(columns)
+    })
+    if isinstance(target, (str, Path)):
+        Path(target).write_text(text, encoding='utf-8')
+    else:
+        target.write(text.encode('utf-8'))
+
+
+def load_scaler(source: Union[str, Path, IO[bytes]]) -> Tuple[object, List[str]]:
+    """
+    Cargar un escalador guardado con save_scaler
+    
+    Args:
+        source: Ruta o archivo binario abierto (p.ej. subido desde el navegador)
+    
+    Returns:
+        Tuple[scaler ajustado, lista de columnas]
+    """
+    try:
+        if isinstance(source, (str, Path)):
+            state = json.loads(Path(source).read_text(encoding='utf-8'))
+        else:
+            state = json.loads(source.read())
+    except ValueError:
+        raise ValueError("El archivo no contiene un escalador guardado con save_scaler")
+    if not isinstance(state, dict) or 'scaler' not in state or 'columns' not in state:
+        raise ValueError("El archivo no contiene un escalador guardado con save_scaler")
+    if state.get('version') != SCALER_FORMAT_VERSION:
+        raise ValueError(f"Versión de escalador no soportada: {state.get('version')}")
+    return _scaler_from_state(state['scaler']), state['columns']
+
+
+def transform_with_scaler(
+    source: Union[pd.DataFrame, Callable[[], Iterable[pd.DataFrame]]],
+    scaler,
+    columns: List[str],
+    chunksize: int = 100_000,
+    dtype=np.float32
+) -> pd.DataFrame:
+    """
+    Aplicar un escalador ya ajustado a datos nuevos, sin reajustarlo
+    
+    Cada bloque se transforma de forma vectorizada con scaler.transform; con
+    un DataFrame el resultado se escribe directamente en una matriz reservada
+    de antemano.
+    
+    Args:
+        source: DataFrame o función sin argumentos que devuelve un iterable de
+                bloques (p.ej. lambda: iter_chunks(ruta))
+        scaler: Escalador ajustado (ver scale_data o load_scaler)
+        columns: Columnas con las que se ajustó el escalador
+        chunksize: Filas por bloque cuando source es un DataFrame
+        dtype: Tipo de la matriz de salida
+    
+    Returns:
+        DataFrame escalado con las columnas del escalador
+    """
+    columns = list(columns)
+    
+    def transformed(chunk: pd.DataFrame) -> np.ndarray:
+        missing = [col for col in columns if col not in chunk.columns]
+        if missing:
+            raise ValueError(f"Faltan columnas del escalador en los datos nuevos: {missing}")
+        block = chunk[columns]
+        if block.isnull().any().any():
+            raise ValueError("Los datos contienen valores NaN. Por favor, limpia los datos primero.")
+        return scaler.transform(block)
+    
+    chunks = _chunk_factory(source, chunksize)
+    
+    if isinstance(source, pd.DataFrame):
+        output = np.empty((len(source), len(columns)), dtype=dtype)
+        offset = 0
+        for chunk in chunks():
+            output[offset:offset + len(chunk)] = transformed(chunk)
+            offset += len(chunk)
+        return pd.DataFrame(output, columns=columns, index=source.index, copy=False)
+    
+    blocks = [transformed(chunk).astype(dtype, copy=False) for chunk in chunks()]
+    if not blocks:
+        raise ValueError("No hay datos para escalar")
+    return pd.DataFrame(np.concatenate(blocks), columns=columns, copy=False)
+
+
+def _column_stats(values: pd.DataFrame, chunksize: int, sketch_k: int) -> Dict:
+    """Media, desviación típica (poblacional) y sketch de cuantiles de cada columna en un solo recorrido"""
+    sketch = QuantileSketch(sketch_k, random_state=42)
+    count = 0
+    mean = np.zeros(values.shape[1])
+    m2 = np.zeros(values.shape[1])
+    
+    for start in range(0, len(values), chunksize):
+        block = values.iloc[start:start + chunksize].to_numpy(dtype=np.float64)
+        sketch.update(block)
+        # Combinación de medias y sumas de cuadrados por bloques (Chan et al.)
+        block_mean = block.mean(axis=0)
+        delta = block_mean - mean
+        total = count + len(block)
+        m2 += ((block - block_mean) ** 2).sum(axis=0) + delta ** 2 * count * len(block) / total
+        mean += delta * len(block) / total
+        count = total
+    
+    return {'count': count, 'mean': mean, 'std': np.sqrt(m2 / count), 'sketch': sketch}
+
+
+def _scale_points(scaler_type: str, points: np.ndarray, stats: Dict, columns: List[str]) -> np.ndarray:
+    """Aplicar un escalador, ajustado con las estadísticas compartidas, a unos puntos (filas x columnas)"""
+    if scaler_type == 'standard':
+        std = np.where(stats['std'] > 0, stats['std'], 1.0)
+        return (points - stats['mean']) / std
+    if scaler_type == 'minmax':
+        data_min, data_max = stats['sketch'].min_, stats['sketch'].max_
+        data_range = np.where(data_max > data_min, data_max - data_min, 1.0)
+        return (points - data_min) / data_range
+    scaler = fit_scaler_from_sketch(scaler_type, stats['sketch'], columns)
+    return scaler.transform(pd.DataFrame(points, columns=columns))
+
+
+def compare_scalers(
+    df: pd.DataFrame,
+    columns: Optional[List[str]] = None,
+    bins: int = 40,
+    fingerprint: Optional[Hashable] = None,
+    chunksize: int = 100_000,
+    sketch_k: Optional[int] = None
+) -> Dict:
+    """
+    Comparar todos los escaladores sobre las mismas columnas sin escalar los datos
+    
+    Un solo recorrido calcula media, desviación y un QuantileSketch por
+    columna; de ahí salen todos los escaladores (ver SCALER_TYPES). Los
+    histogramas usan bins intervalos equiprobables (cuantiles del sketch) y,
+    como todos los escaladores son transformaciones monótonas por columna,
+    cada intervalo conserva sus datos al escalar: basta con transformar los
+    bordes. Con fingerprint el resultado se guarda en una caché LRU por
+    (huella, columnas, bins, sketch_k).
+    
+    Args:
+        df: DataFrame con los datos sin escalar
+        columns: Columnas a comparar. Si None, todas las numéricas
+        bins: Intervalos de los histogramas
+        fingerprint: Huella del dataset para la caché (None = no cachear)
+        chunksize: Filas por bloque del recorrido
+        sketch_k: Tamaño del sketch (por defecto settings.QUANTILE_SKETCH_K)
+    
+    Returns:
+        Dict con columns, n_rows, counts ({columna: filas por intervalo}),
+        edges ({'original' o tipo de escalador: {columna: bordes}}) y summary:
+        DataFrame indexado por (scaler, column) con min, p25, median, p75 y max
+    """
+    if columns is None:
+        columns = df.select_dtypes(include=[np.number]).columns.tolist()
+    columns = list(columns)
+    if len(columns) == 0:
+        raise ValueError("No hay columnas numéricas para escalar")
+    
+    sketch_k = sketch_k or settings.QUANTILE_SKETCH_K
+    key = (fingerprint, tuple(columns), bins, sketch_k)
+    if fingerprint is not None:
+        comparison = _comparison_cache.get(key)
+        if comparison is not None:
+            return comparison
+    
+    values = df[columns]
+    if values.isnull().any().any():
+        raise ValueError("Los datos contienen valores NaN. Por favor, limpia los datos primero.")
+    
+    stats = _column_stats(values, chunksize, sketch_k)
+    n_rows = stats['count']
+    probabilities = np.linspace(0, 1, bins + 1)
+    edges = stats['sketch'].quantiles(probabilities)
+    summary_points = stats['sketch'].quantiles([0, 0.25, 0.5, 0.75, 1])
+    
+    # Bordes distintos de cada columna y filas entre ellos (los valores repetidos caen en el primer intervalo)
+    counts, kept = {}, {}
+    for j, col in enumerate(columns):
+        col_edges = edges[:, j]
+        distinct = np.flatnonzero(np.r_[True, np.diff(col_edges) > 0])
+        if len(distinct) == 1:
+            kept[col] = None
+            counts[col] = np.array([float(n_rows)])
+            continue
+        last = np.searchsorted(col_edges, col_edges[distinct], side='right') - 1
+        cdf = probabilities[last]
+        cdf[0] = 0.0
+        kept[col] = distinct
+        counts[col] = np.diff(cdf) * n_rows
+    
+    # Bordes y puntos del resumen se escalan juntos: cada escalador se ajusta una sola vez
+    points = np.vstack([edges, summary_points])
+    all_edges, summary = {}, []
+    for name in ('original',) + SCALER_TYPES:
+        scaled_points = points if name == 'original' else _scale_points(name, points, stats, columns)
+        scaled_edges, scaled_summary = scaled_points[:len(edges)], scaled_points[len(edges):]
+        all_edges[name] = {}
+        for j, col in enumerate(columns):
+            if kept[col] is None:
+                # Columna constante: un único intervalo de anchura 1 alrededor del valor
+                all_edges[name][col] = scaled_edges[0, j] + np.array([-0.5, 0.5])
+            else:
+                all_edges[name][col] = scaled_edges[kept[col], j]
+            summary.append((name, col, *scaled_summary[:, j]))
+    
+    comparison = {
+        'columns': columns,
+        'n_rows': n_rows,
+        'counts': counts,
+        'edges': all_edges,
+        'summary': pd.DataFrame(
+            summary, columns=['scaler', 'column', 'min', 'p25', 'median', 'p75', 'max']
+        ).set_index(['scaler', 'column'])
+    }
+    
+    if fingerprint is not None:
+        _comparison_cache.put(key, comparison)
+    return comparison
@@ -0,0 +1,164 @@
+"""
+Módulo de sketches de cuantiles para datos en streaming
+
+QuantileSketch es un sketch tipo KLL: cada nivel guarda elementos con peso
+2^nivel y, cuando un nivel se llena, se ordena y se promociona al siguiente
+uno de cada dos elementos (empezando al azar por el primero o el segundo).
+Con k elementos por nivel el error de rango es del orden de 1/k, se calcula
+en una sola pasada con memoria O(k) por columna y dos sketches se pueden
+combinar (merge), p.ej. uno por bloque o por archivo.
+"""
+import numpy as np
+from typing import List, Optional
+
+
+class QuantileSketch:
+    """
+    Sketch de cuantiles mergeable para varias columnas a la vez
+
+    Todas las columnas reciben el mismo número de valores, así que comparten
+    niveles: cada nivel es una matriz (elementos x columnas) que se ordena
+    por columnas al compactarla. Los valores no pueden contener NaN.
+
+    Args:
+        k: Capacidad del nivel superior (mayor k = más precisión y memoria)
+        random_state: Semilla para elegir los elementos promocionados
+    """
+
+    def __init__(self, k: int = 1000, random_state: Optional[int] = None):
+        if k < 2:
+            raise ValueError("k debe ser al menos 2")
+        self.k = k
+        self.count = 0
+        self.n_columns = None
+        self.min_ = None
+        self.max_ = None
+        self._levels: List[np.ndarray] = []
+        self._rng = np.random.default_rng(random_state)
+
+    def _capacity(self, level: int) -> int:
+        """Capacidad de un nivel: k en el superior, 2/3 de la del siguiente en los inferiores"""
+        depth = len(self._levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self) -> None:
+        """Compactar los niveles que superan su capacidad"""
+        level = 0
+        while level < len(self._levels):
+            items = self._levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self._levels):
+                    self._levels.append(np.empty((0, self.n_columns)))
+                items = np.sort(items, axis=0)
+                n_even = len(items) - len(items) % 2
+                promoted = items[self._rng.integers(2):n_even:2]
+                self._levels[level] = items[n_even:]
+                self._levels[level + 1] = np.concatenate([self._levels[level + 1], promoted])
+            level += 1
+
+    def update(self, values) -> 'QuantileSketch':
+        """
+        Añadir un bloque de valores
+
+        Args:
+            values: Array o DataFrame (filas x columnas) o array 1D de una columna
+
+        Returns:
+            El propio sketch
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim == 1:
+            values = values[:, None]
+        if len(values) == 0:
+            return self
+        if self.n_columns is None:
+            self.n_columns = values.shape[1]
+        elif values.shape[1] != self.n_columns:
+            raise ValueError(f"Se esperaban {self.n_columns} columnas, se recibieron {values.shape[1]}")
+        if np.isnan(values).any():
+            raise ValueError("El sketch de cuantiles no admite valores NaN")
+
+        block_min, block_max = values.min(axis=0), values.max(axis=0)
+        self.min_ = block_min if self.min_ is None else np.minimum(self.min_, block_min)
+        self.max_ = block_max if self.max_ is None else np.maximum(self.max_, block_max)
+        self.count += len(values)
+
+        if self._levels:
+            self._levels[0] = np.concatenate([self._levels[0], values])
+        else:
+            self._levels.append(values.copy())
+        self._compress()
+        return self
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        """
+        Combinar otro sketch en este (el resultado resume ambos conjuntos de datos)
+
+        Args:
+            other: Sketch con el mismo número de columnas
+
+        Returns:
+            El propio sketch
+        """
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.n_columns = other.n_columns
+        elif other.n_columns != self.n_columns:
+            raise ValueError(f"Se esperaban {self.n_columns} columnas, se recibieron {other.n_columns}")
+
+        self.min_ = other.min_.copy() if self.min_ is None else np.minimum(self.min_, other.min_)
+        self.max_ = other.max_.copy() if self.max_ is None else np.maximum(self.max_, other.max_)
+        self.count += other.count
+
+        for level, items in enumerate(other._levels):
+            if level < len(self._levels):
+                self._levels[level] = np.concatenate([self._levels[level], items])
+            else:
+                self._levels.append(items.copy())
+        self._compress()
+        return self
+
+    def quantiles(self, q) -> np.ndarray:
+        """
+        Estimar cuantiles de cada columna
+
+        Cada elemento guardado representa 2^nivel valores consecutivos en el
+        orden de la columna; los cuantiles se interpolan linealmente entre los
+        rangos centrales de esos elementos, igual que np.quantile cuando el
+        sketch aún no ha compactado nada. q=0 y q=1 devuelven el mínimo y el
+        máximo exactos.
+
+        Args:
+            q: Cuantil o array de cuantiles en [0, 1]
+
+        Returns:
+            Array (cuantiles x columnas)
+        """
+        if self.count == 0:
+            raise ValueError("El sketch está vacío")
+        q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        if ((q < 0) | (q > 1)).any():
+            raise ValueError("Los cuantiles deben estar en [0, 1]")
+
+        items = np.concatenate(self._levels)
+        weights = np.concatenate([
+            np.full(len(level_items), 2.0 ** level) for level, level_items in enumerate(self._levels)
+        ])
+        order = np.argsort(items, axis=0)
+        items = np.take_along_axis(items, order, axis=0)
+        weights = weights[order]
+        ranks = np.cumsum(weights, axis=0) - (weights + 1) / 2
+
+        target = q * (self.count - 1)
+        result = np.empty((len(q), self.n_columns))
+        for col in range(self.n_columns):
+            positions = np.concatenate([[0], ranks[:, col], [self.count - 1]])
+            values = np.concatenate([[self.min_[col]], items[:, col], [self.max_[col]]])
+            result[:, col] = np.interp(target, positions, values)
+        return result
+
+    @property
+    def n_items(self) -> int:
+        """Elementos guardados por columna (tamaño del sketch)"""
+        return sum(len(items) for items in self._levels)
@@ -5,6 +5,7 @@ Versión Modular Completa
 import streamlit as st
 from config import settings
 from styles import apply_custom_styles
+from core import get_result_cache_stats, replay_pipeline
 from pages import (
     page_01_carga_datos,
     page_02_limpieza,
@@ -29,8 +30,29 @@ apply_custom_styles()
 # Inicializar session state
 if 'data' not in st.session_state:
     st.session_state.data = None
+if 'data_fingerprint' not in st.session_state:
+    st.session_state.data_fingerprint = None
+# Huellas de contenido de data_full, data y data_clean (claves de profile_data)
+if 'data_full_key' not in st.session_state:
+    st.session_state.data_full_key = None
+if 'data_key' not in st.session_state:
+    st.session_state.data_key = None
+if 'data_clean_key' not in st.session_state:
+    st.session_state.data_clean_key = None
+if 'data_full' not in st.session_state:
+    st.session_state.data_full = None
+if 'row_hashes' not in st.session_state:
+    st.session_state.row_hashes = {}  # Hashes por fila por (huella del dataset, subconjunto de columnas)
+if 'preview_mode' not in st.session_state:
+    st.session_state.preview_mode = False
+if 'results_source' not in st.session_state:
+    st.session_state.results_source = None
+if 'pipeline_config' not in st.session_state:
+    st.session_state.pipeline_config = {}
 if 'data_clean' not in st.session_state:
     st.session_state.data_clean = None
+if 'cleaning_pipeline' not in st.session_state:
+    st.session_state.cleaning_pipeline = None
 if 'data_scaled' not in st.session_state:
     st.session_state.data_scaled = None
 if 'scaler' not in st.session_state:
@@ -180,6 +202,54 @@ with st.sidebar:
     else:
         st.info("⏳ Sin clustering")
     
+    # Origen de los resultados: muestra (modo vista previa) o datos completos
+    if st.session_state.preview_mode:
+        st.warning(f"🧪 Resultados de la **MUESTRA** "
+                   f"({len(st.session_state.data):,} de {len(st.session_state.data_full):,} filas)")
+        config = st.session_state.pipeline_config
+        ready = 'scaling' in config and 'clustering' in config
+        if st.button("▶️ Ejecutar con datos completos", disabled=not ready, use_container_width=True,
+                     help="Repite limpieza, escalado y clustering con la configuración usada en la muestra"):
+            with st.spinner("Ejecutando el pipeline sobre los datos completos..."):
+                try:
+                    replay = replay_pipeline(st.session_state.data_full, config)
+                    st.session_state.data = st.session_state.data_full
+                    st.session_state.data_key = st.session_state.data_full_key
+                    st.session_state.row_hashes = {
+                        key: hashes for key, hashes in st.session_state.row_hashes.items()
+                        if key[0] == st.session_state.data_full_key
+                    }
+                    st.session_state.data_clean = replay['data_clean']
+                    st.session_state.data_clean_key = st.session_state.data_full_key + (
+                        'clean', repr(config.get('cleaning_pipeline', config.get('clean')))
+                    )
+                    st.session_state.data_scaled = replay['data_scaled']
+                    st.session_state.scaler = replay['scaler']
+                    st.session_state.scaled_columns = replay['data_scaled'].columns.tolist()
+                    st.session_state.cluster_results = replay['cluster_results']
+                    st.session_state.n_clusters_used = replay['cluster_results']['n_clusters']
+                    st.session_state.method_used = replay['cluster_results']['method']
+                    st.session_state.preview_mode = False
+                    st.session_state.results_source = 'full'
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"❌ Error al ejecutar con datos completos: {str(e)}")
+        if not ready:
+            st.caption("Completa escalado y clustering sobre la muestra para habilitarlo")
+    elif st.session_state.results_source == 'full' and st.session_state.cluster_results is not None:
+        st.success("✅ Resultados con los datos **COMPLETOS**")
+    
+    # Estado de la caché de resultados (compartida entre sesiones)
+    cache_stats = get_result_cache_stats()
+    st.caption(
+        f"💾 Caché: {cache_stats['memory_hits'] + cache_stats['disk_hits']} aciertos · "
+        f"{cache_stats['misses']} fallos ({cache_stats['hit_rate']:.0%})"
+    )
+    st.caption(
+        f"🗄️ {cache_stats['memory_entries']} en memoria · "
+        f"{cache_stats['disk_entries']} en disco ({cache_stats['disk_mb']:.1f} MB)"
+    )
+    
     st.markdown("---")
     
     # Footer del sidebar con stats
@@ -4,7 +4,8 @@ Página 1: Carga de Datos
 import streamlit as st
 import pandas as pd
 from config import settings
-from core import load_data
+from pathlib import Path
+from core import load_data_cached, fingerprint_file, list_datasets, sample_data, profile_data, stored_row_hashes, FILE_FORMATS
 
 
 def render():
@@ -14,29 +15,188 @@ def render():
     col1, col2 = st.columns([2, 1])
     
     with col1:
-        st.markdown("### Sube tu archivo CSV")
-        uploaded_file = st.file_uploader(
-            "Arrastra o selecciona un archivo CSV",
-            type=['csv'],
-            help="El archivo debe estar en formato CSV con separador por comas"
+        source_type = st.radio(
+            "Origen de los datos",
+            ['upload', 'server'],
+            format_func=lambda x: "📤 Subir archivo" if x == 'upload' else "🗄️ Archivo del servidor",
+            horizontal=True
         )
         
-        if uploaded_file is not None:
-            data, error = load_data(uploaded_file)
+        data_source = None
+        columns = None
+        
+        if source_type == 'upload':
+            st.markdown("### Sube tu archivo de datos")
+            data_source = st.file_uploader(
+                "Arrastra o selecciona un archivo CSV, Parquet, Feather o Arrow",
+                type=[ext.lstrip('.') for ext in FILE_FORMATS],
+                help="CSV con separador por comas, o formatos columnares (más rápidos de leer)"
+            )
+            
+            if data_source is not None and data_source.size > settings.MAX_FILE_SIZE_MB * 1024**2:
+                st.warning(
+                    f"⚠️ El archivo supera {settings.MAX_FILE_SIZE_MB} MB. Para archivos grandes, "
+                    f"colócalo en el volumen de datos (`{settings.DATA_DIR}`) y cárgalo como "
+                    f"**Archivo del servidor**: se lee directamente del disco, sin subirlo."
+                )
+        else:
+            st.markdown("### Datasets en el volumen de datos")
+            datasets = list_datasets()
+            
+            if not datasets:
+                st.info(f"📂 No hay archivos de datos en `{settings.DATA_DIR}`")
+            else:
+                st.dataframe(pd.DataFrame({
+                    'Dataset': [d['name'] for d in datasets],
+                    'Formato': [d['format'] for d in datasets],
+                    'Tamaño (MB)': [round(d['size_mb'], 1) for d in datasets],
+                    'Filas': [d['n_rows'] for d in datasets],
+                    'Columnas': [d['n_columns'] for d in datasets]
+                }), use_container_width=True, hide_index=True)
+                
+                selected_file = st.selectbox(
+                    "Dataset",
+                    datasets,
+                    format_func=lambda d: f"{d['name']} ({d['n_rows']:,} filas, {d['size_mb']:.1f} MB)"
+                )
+                
+                # El esquema viene del fichero .meta.json; las columnas no seleccionadas nunca se leen
+                schema = selected_file['schema']
+                columns = st.multiselect(
+                    "Columnas a leer",
+                    list(schema.keys()),
+                    default=list(schema.keys()),
+                    help="Feather/Arrow se mapean en memoria y Parquet lee solo estas columnas"
+                )
+                
+                if st.button("📂 Cargar archivo", type="primary"):
+                    st.session_state.server_file = {'path': str(selected_file['path']), 'columns': columns}
+                
+                server_file = st.session_state.get('server_file')
+                if server_file is not None and server_file['path'] == str(selected_file['path']):
+                    data_source = selected_file['path']
+                    columns = server_file['columns'] or None
+        
+        if data_source is not None:
+            # En cada rerun de la página el mismo archivo no se vuelve a hashear ni a parsear
+            if isinstance(data_source, Path):
+                source_id = fingerprint_file(data_source)
+            else:
+                source_id = getattr(data_source, 'file_id', None) or f"{data_source.name}|{data_source.size}"
+            load_key = (source_id, tuple(columns or []))
+            
+            if st.session_state.get('data_load_key') == load_key and st.session_state.data_full is not None:
+                data, error = st.session_state.data_full, None
+            else:
+                fingerprint = source_id if isinstance(data_source, Path) else fingerprint_file(data_source)
+                data, error = load_data_cached(
+                    data_source,
+                    fingerprint=fingerprint,
+                    chunksize=settings.CSV_CHUNK_SIZE,
+                    optimize=settings.OPTIMIZE_DTYPES,
+                    category_max_unique_ratio=settings.CATEGORY_MAX_UNIQUE_RATIO,
+                    columns=columns,
+                    engine=settings.CSV_ENGINE
+                )
+                if not error:
+                    st.session_state.data_load_key = load_key
+                    st.session_state.data_fingerprint = fingerprint
+                    st.session_state.data_full_key = (fingerprint, tuple(columns or []))
             
             if error:
                 st.error(f"❌ Error al cargar el archivo: {error}")
             else:
-                st.session_state.data = data
+                st.session_state.data_full = data
+                # Los hashes por fila se calculan solo si el perfil no está en caché y se reutilizan en Limpieza
+                profile = profile_data(
+                    data,
+                    fingerprint=st.session_state.data_full_key,
+                    hashes=lambda: stored_row_hashes(st.session_state.row_hashes, st.session_state.data_full_key, data)
+                )
+                
+                # Modo vista previa: las demás páginas trabajan sobre una muestra
+                preview_mode = st.checkbox(
+                    "🧪 Modo vista previa (trabajar sobre una muestra)",
+                    value=len(data) > settings.PREVIEW_SUGGEST_ROWS,
+                    help="Limpieza, EDA, escalado y clustering se ejecutan sobre la muestra; "
+                         "después se pueden repetir sobre los datos completos desde la barra lateral"
+                )
+                sample_size, sampling_method, stratify_column = None, None, None
+                if preview_mode:
+                    col_p1, col_p2 = st.columns(2)
+                    with col_p1:
+                        sample_size = st.number_input(
+                            "Filas de la muestra",
+                            min_value=100,
+                            value=min(settings.PREVIEW_SAMPLE_SIZE, len(data)),
+                            step=1000
+                        )
+                    with col_p2:
+                        sampling_method = st.selectbox(
+                            "Tipo de muestreo",
+                            list(settings.AVAILABLE_SAMPLING_METHODS.keys()),
+                            format_func=lambda x: settings.AVAILABLE_SAMPLING_METHODS[x]
+                        )
+                    if sampling_method == 'stratified':
+                        distinct = profile['columns']['distinct']
+                        strata_columns = distinct[distinct <= settings.PREVIEW_MAX_STRATA].index.tolist()
+                        if strata_columns:
+                            stratify_column = st.selectbox("Columna de estratos", strata_columns)
+                        else:
+                            st.warning(f"⚠️ Ninguna columna tiene {settings.PREVIEW_MAX_STRATA} valores distintos o menos; se usa muestreo aleatorio")
+                            sampling_method = 'reservoir'
+                
+                # Solo se vuelve a muestrear (y se reinicia la configuración registrada) si cambia algo
+                data_signature = (load_key, preview_mode, sample_size, sampling_method, stratify_column)
+                if st.session_state.get('data_signature') != data_signature:
+                    if preview_mode:
+                        st.session_state.data = sample_data(data, sample_size, sampling_method, stratify_column)
+                        st.session_state.data_key = st.session_state.data_full_key + (
+                            'sample', sample_size, sampling_method, stratify_column
+                        )
+                    else:
+                        st.session_state.data = data
+                        st.session_state.data_key = st.session_state.data_full_key
+                    st.session_state.preview_mode = preview_mode
+                    st.session_state.results_source = 'sample' if preview_mode else 'full'
+                    st.session_state.pipeline_config = {}
+                    st.session_state.cleaning_pipeline = None
+                    # Solo se conservan los hashes de los datos completos cargados ahora
+                    st.session_state.row_hashes = {
+                        key: hashes for key, hashes in st.session_state.row_hashes.items()
+                        if key[0] == st.session_state.data_full_key
+                    }
+                    st.session_state.data_signature = data_signature
+                
+                if st.session_state.preview_mode:
+                    st.info(f"🧪 Vista previa activa: las siguientes páginas usan "
+                            f"{len(st.session_state.data):,} de {len(data):,} filas")
+                
                 st.markdown(f'<div class="success-box">{settings.MESSAGES["data_loaded"]}</div>', 
                            unsafe_allow_html=True)
                 
                 # Información básica
                 st.markdown("### 📋 Información del Dataset")
+                load_info = data.attrs.get('load_info', {})
                 col_a, col_b, col_c = st.columns(3)
                 col_a.metric("Filas", f"{data.shape[0]:,}")
                 col_b.metric("Columnas", data.shape[1])
-                col_c.metric("Tamaño", f"{data.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
+                col_c.metric(
+                    "Tamaño en memoria",
+                    f"{load_info.get('memory_mb', profile['memory_mb']):.2f} MB",
+                    delta=f"-{load_info['savings_pct']:.1f}%" if load_info.get('savings_pct', 0) > 0 else None,
+                    delta_color="inverse"
+                )
+                if load_info.get('savings_pct', 0) > 0:
+                    st.caption(
+                        f"💾 Tipos optimizados: {load_info['original_mb']:.2f} MB → "
+                        f"{load_info['memory_mb']:.2f} MB ({load_info['n_chunks']} bloques leídos)"
+                    )
+                if 'read_seconds' in load_info:
+                    st.caption(
+                        f"⏱️ Leído en {load_info['read_seconds']:.2f} s con el motor {load_info['engine']} "
+                        f"({load_info['throughput_mb_s']:.1f} MB/s)"
+                    )
                 
                 # Vista previa
                 st.markdown("### 👁️ Vista Previa de Datos")
@@ -44,16 +204,17 @@ def render():
                 
                 # Tipos de datos
                 st.markdown("### 🔢 Tipos de Datos")
+                column_profile = profile['columns']
                 dtype_df = pd.DataFrame({
                     'Columna': data.columns,
-                    'Tipo': data.dtypes.astype(str).values,
-                    'Valores Únicos': [data[col].nunique() for col in data.columns],
-                    'Valores Nulos': [data[col].isnull().sum() for col in data.columns]
+                    'Tipo': column_profile['dtype'].values,
+                    'Valores Únicos': column_profile['distinct'].values,
+                    'Valores Nulos': column_profile['nulls'].values
                 })
                 st.dataframe(dtype_df, use_container_width=True)
     
     with col2:
-        if uploaded_file is not None and st.session_state.data is not None:
+        if data_source is not None and st.session_state.data is not None:
             st.markdown("### ℹ️ Información")
             st.info("""
             **Datos cargados correctamente**
@@ -65,7 +226,7 @@ def render():
         else:
             st.markdown("### 📌 Instrucciones")
             st.info("""
-            1. Sube un archivo CSV
+            1. Sube un archivo (CSV, Parquet, Feather o Arrow) o elige uno del servidor
             2. Verifica que los datos se cargaron correctamente
             3. Continúa con la limpieza
             
@@ -73,4 +234,5 @@ def render():
             - Separador: coma (,)
             - Codificación: UTF-8
             - Primera fila: nombres de columnas
+            - Archivos grandes: Parquet o Feather
             """)
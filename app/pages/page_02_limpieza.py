@@ -5,7 +5,12 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from config import settings
-from core import analyze_data_quality, clean_data
+from core import profile_data, stored_row_hashes, CleaningPipeline
+
+
+def _get_row_hashes(data: pd.DataFrame, subset=None):
+    """Hashes por fila de los datos actuales, calculados una sola vez por subconjunto de columnas"""
+    return stored_row_hashes(st.session_state.row_hashes, st.session_state.data_key, data, subset)
 
 
 def render():
@@ -19,7 +24,7 @@ def render():
         
         # Análisis de calidad
         st.markdown("### 🔍 Análisis de Calidad de Datos")
-        quality_report = analyze_data_quality(data)
+        quality_report = profile_data(data, st.session_state.data_key, lambda: _get_row_hashes(data))
         
         col1, col2, col3 = st.columns(3)
         col1.metric("Valores Nulos", quality_report['nulls'].sum())
@@ -44,6 +49,12 @@ def render():
         
         with col1:
             remove_duplicates = st.checkbox("Eliminar filas duplicadas", value=True)
+            duplicate_subset = st.multiselect(
+                "Columnas que identifican un duplicado",
+                data.columns.tolist(),
+                disabled=not remove_duplicates,
+                help="Vacío = la fila completa. Dos filas con los mismos valores en estas columnas se consideran duplicadas."
+            )
             
             fill_nulls_method = st.selectbox(
                 "Método para valores nulos",
@@ -58,28 +69,51 @@ def render():
         
         with col2:
             remove_outliers = st.checkbox("Eliminar outliers", value=True)
+            outlier_methods = list(settings.AVAILABLE_OUTLIER_METHODS.keys())
+            outlier_method = st.selectbox(
+                "Criterio de outliers",
+                outlier_methods,
+                format_func=lambda x: settings.AVAILABLE_OUTLIER_METHODS[x],
+                index=outlier_methods.index(settings.DEFAULT_OUTLIER_METHOD),
+                disabled=not remove_outliers,
+                help="Z-score, IQR y MAD evalúan todas las columnas a la vez, así que el resultado no depende del orden de las columnas. El modo 'original' filtra columna a columna."
+            )
+            threshold_min, threshold_max, threshold_default = settings.OUTLIER_THRESHOLD_RANGES[outlier_method]
+            threshold_label = {
+                'iqr': "Multiplicador del IQR",
+                'mad': "Umbral de outliers (Z-score modificado)"
+            }.get(outlier_method, "Umbral de outliers (Z-score)")
             outlier_threshold = st.slider(
-                "Umbral de outliers (Z-score)",
-                min_value=2.0,
-                max_value=4.0,
-                value=settings.DEFAULT_OUTLIER_THRESHOLD,
+                threshold_label,
+                min_value=threshold_min,
+                max_value=threshold_max,
+                value=threshold_default,
                 step=0.5,
-                help="Valores con Z-score mayor a este umbral se consideran outliers"
+                disabled=not remove_outliers,
+                key=f"outlier_threshold_{outlier_method}",
+                help="Valores que superan este umbral se consideran outliers"
             )
         
         # Botón de limpieza
         if st.button("🧹 Limpiar Datos", type="primary", use_container_width=True):
             with st.spinner("Limpiando datos..."):
                 try:
-                    data_clean = clean_data(
-                        data,
+                    cleaning_pipeline = CleaningPipeline(
                         remove_duplicates=remove_duplicates,
                         fill_nulls_method=fill_nulls_method,
                         remove_outliers=remove_outliers,
-                        outlier_threshold=outlier_threshold
+                        outlier_threshold=outlier_threshold,
+                        outlier_method=outlier_method,
+                        duplicate_subset=duplicate_subset
                     )
+                    hashes = _get_row_hashes(data, duplicate_subset) if remove_duplicates else None
+                    data_clean = cleaning_pipeline.fit_transform(data, hashes)
                     
                     st.session_state.data_clean = data_clean
+                    st.session_state.data_clean_key = st.session_state.data_key + ('clean', cleaning_pipeline.to_json())
+                    st.session_state.cleaning_pipeline = cleaning_pipeline
+                    st.session_state.pipeline_config.pop('cleaning_pipeline', None)
+                    st.session_state.pipeline_config['clean'] = cleaning_pipeline.get_params()
                     
                     st.success(settings.MESSAGES['data_cleaned'])
                     
@@ -109,3 +143,35 @@ def render():
                 except Exception as e:
                     st.error(f"❌ Error inesperado: {str(e)}")
                     st.info("💡 Intenta con diferentes opciones de limpieza.")
+        
+        # Pipeline de limpieza reutilizable
+        st.markdown("### 💾 Pipeline de Limpieza")
+        
+        if st.session_state.cleaning_pipeline is not None:
+            st.download_button(
+                "📥 Descargar pipeline de limpieza (JSON)",
+                st.session_state.cleaning_pipeline.to_json(),
+                file_name="cleaning_pipeline.json",
+                mime="application/json",
+                help="Guarda medias/medianas y límites de outliers calculados para limpiar nuevos lotes exactamente igual"
+            )
+        
+        with st.expander("📂 Aplicar un pipeline guardado"):
+            st.caption("Limpia los datos actuales con los valores y límites de un pipeline ajustado anteriormente, sin recalcularlos.")
+            pipeline_file = st.file_uploader("Pipeline de limpieza (JSON)", type=['json'], key="cleaning_pipeline_file")
+            
+            if pipeline_file is not None and st.button("Aplicar pipeline", use_container_width=True):
+                try:
+                    cleaning_pipeline = CleaningPipeline.from_json(pipeline_file.getvalue().decode('utf-8'))
+                    hashes = _get_row_hashes(data, cleaning_pipeline.duplicate_subset) if cleaning_pipeline.remove_duplicates else None
+                    data_clean = cleaning_pipeline.transform(data, hashes)
+                    
+                    st.session_state.data_clean = data_clean
+                    st.session_state.data_clean_key = st.session_state.data_key + ('clean', cleaning_pipeline.to_json())
+                    st.session_state.cleaning_pipeline = cleaning_pipeline
+                    st.session_state.pipeline_config.pop('clean', None)
+                    st.session_state.pipeline_config['cleaning_pipeline'] = cleaning_pipeline.to_dict()
+                    
+                    st.success(f"✅ Pipeline aplicado: {len(data_clean):,} de {len(data):,} filas conservadas")
+                except (ValueError, KeyError, TypeError) as e:
+                    st.error(f"❌ No se pudo aplicar el pipeline: {str(e)}")
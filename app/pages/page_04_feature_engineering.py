@@ -7,6 +7,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from config import settings
+from core import profile_data
 
 
 def render():
@@ -14,13 +15,18 @@ def render():
     st.markdown('<h2 class="section-header">🔧 Feature Engineering</h2>', unsafe_allow_html=True)
     
     # Verificar que hay datos limpios
-    data = st.session_state.data_clean if st.session_state.data_clean is not None else st.session_state.data
+    if st.session_state.data_clean is not None:
+        data, data_key = st.session_state.data_clean, st.session_state.data_clean_key
+    else:
+        data, data_key = st.session_state.data, st.session_state.data_key
     
     if data is None:
         st.warning(settings.MESSAGES['no_data'])
         return
     
-    numeric_cols = data.select_dtypes(include=[np.number]).columns.tolist()
+    profile = profile_data(data, data_key)
+    column_profile = profile['columns']
+    numeric_cols = profile['numeric_cols']
     
     if len(numeric_cols) == 0:
         st.error(settings.MESSAGES['no_numeric'])
@@ -53,16 +59,16 @@ def render():
         with col1:
             # Información de variables
             var_info = []
-            for col in numeric_cols:
+            for col, stats in column_profile.loc[numeric_cols].iterrows():
                 var_info.append({
                     'Variable': col,
-                    'Tipo': str(data[col].dtype),
-                    'Únicos': data[col].nunique(),
-                    'Nulos': data[col].isnull().sum(),
-                    'Media': f"{data[col].mean():.2f}",
-                    'Std': f"{data[col].std():.2f}",
-                    'Min': f"{data[col].min():.2f}",
-                    'Max': f"{data[col].max():.2f}"
+                    'Tipo': stats['dtype'],
+                    'Únicos': stats['distinct'],
+                    'Nulos': stats['nulls'],
+                    'Media': f"{stats['mean']:.2f}",
+                    'Std': f"{stats['std']:.2f}",
+                    'Min': f"{stats['min']:.2f}",
+                    'Max': f"{stats['max']:.2f}"
                 })
             
             var_df = pd.DataFrame(var_info)
@@ -212,18 +218,18 @@ def render():
         
         # Calcular estadísticas de varianza
         variance_data = []
-        for col in numeric_cols:
-            mean_val = data[col].mean()
-            std_val = data[col].std()
+        for col, stats in column_profile.loc[numeric_cols].iterrows():
+            mean_val = stats['mean']
+            std_val = stats['std']
             cv = (std_val / abs(mean_val) * 100) if mean_val != 0 else 0
             
             variance_data.append({
                 'Variable': col,
                 'Media': mean_val,
                 'Std': std_val,
-                'Varianza': data[col].var(),
+                'Varianza': std_val ** 2,
                 'CV (%)': cv,
-                'Rango': data[col].max() - data[col].min()
+                'Rango': stats['max'] - stats['min']
             })
         
         variance_df = pd.DataFrame(variance_data)
@@ -1,12 +1,22 @@
 """
 Página 5: Escalado de Datos
 """
+import io
 import streamlit as st
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from config import settings
-from core import scale_data
+from core import scale_data, scale_data_streaming, save_scaler, compare_scalers
+
+
+def _plot_binned(ax, counts: np.ndarray, edges: np.ndarray, color: str) -> None:
+    """Dibujar un histograma ya agrupado (intervalos de distinta anchura como densidad)"""
+    widths = np.diff(edges)
+    # Un escalador que satura (p.ej. QuantileTransformer en las colas) puede dejar intervalos de anchura 0
+    density = np.divide(counts / counts.sum(), widths, out=np.zeros_like(widths, dtype=float), where=widths > 0)
+    ax.stairs(density, edges, fill=True, alpha=0.7, color=color)
+    ax.stairs(density, edges, color='black', linewidth=0.8)
 
 
 def render():
@@ -14,7 +24,10 @@ def render():
     st.markdown('<h2 class="section-header">📏 Escalado de Datos</h2>', unsafe_allow_html=True)
     
     # Verificar que hay datos limpios
-    data = st.session_state.data_clean if st.session_state.data_clean is not None else st.session_state.data
+    if st.session_state.data_clean is not None:
+        data, data_key = st.session_state.data_clean, st.session_state.data_clean_key
+    else:
+        data, data_key = st.session_state.data, st.session_state.data_key
     
     if data is None:
         st.warning(settings.MESSAGES['no_data'])
@@ -52,6 +65,8 @@ def render():
             **StandardScaler:** Media=0, Std=1 (recomendado para distribuciones normales)
             **MinMaxScaler:** Escala a rango [0,1] (recomendado si hay outliers controlados)
             **RobustScaler:** Usa mediana y cuartiles (robusto a outliers)
+            **QuantileTransformer:** Lleva cada variable a una distribución normal por cuantiles
+            **PowerTransformer:** Yeo-Johnson, reduce la asimetría (colas largas)
             """
         )
         
@@ -82,11 +97,32 @@ def render():
             - ✅ Recomendado si hay valores atípicos
             - ⚠️ Puede no estar en rango [0,1]
             """)
+        elif scaler_type == 'quantile':
+            st.markdown("""
+            - ✅ Convierte cualquier distribución en normal
+            - ✅ Ideal para variables con colas muy largas (importes)
+            - ✅ Los outliers quedan acotados
+            - ⚠️ No lineal: altera las distancias entre puntos
+            """)
+        elif scaler_type == 'power':
+            st.markdown("""
+            - ✅ Transformación Yeo-Johnson + estandarización
+            - ✅ Reduce la asimetría, admite valores negativos
+            - ✅ Conserva el orden de los valores
+            - ⚠️ Menos eficaz con distribuciones multimodales
+            """)
     
     with col2:
         st.markdown("#### 📊 Información")
         st.metric("Variables a Escalar", len(columns_to_scale))
         st.metric("Filas", len(data))
+        streaming = st.checkbox(
+            "Escalar por bloques (float32)",
+            value=len(data) >= settings.STREAMING_SCALE_ROWS,
+            help="Ajusta el escalador bloque a bloque y escribe el resultado en float32, "
+                 "sin duplicar los datos en memoria. Robust, Quantile y Power usan cuantiles "
+                 f"aproximados (sketch de {settings.QUANTILE_SKETCH_K:,} elementos por variable)."
+        )
         
         if st.button("🔄 Cambiar Variables", use_container_width=True):
             st.info("Ve a la sección **Feature Engineering** para cambiar la selección de variables")
@@ -109,13 +145,61 @@ def render():
         stats_original = data[columns_to_scale].describe().loc[['mean', 'std', 'min', 'max']]
         st.dataframe(stats_original, use_container_width=True)
     
+    # Comparación de todos los escaladores (estadísticas compartidas e histogramas agrupados, en caché)
+    st.markdown("### 🔍 Comparación de Escaladores")
+    
+    try:
+        comparison = compare_scalers(data, columns_to_scale, bins=settings.SCALER_COMPARISON_BINS,
+                                     fingerprint=data_key, chunksize=settings.SCALE_CHUNK_SIZE)
+    except ValueError as e:
+        comparison = None
+        st.info(f"ℹ️ Comparación no disponible: {str(e)}")
+    
+    if comparison is not None:
+        preview_var = st.selectbox(
+            "Variable a comparar",
+            columns_to_scale,
+            key="scaler_comparison_var"
+        )
+        views = ['original'] + list(settings.AVAILABLE_SCALERS.keys())
+        
+        fig, axes = plt.subplots(1, len(views), figsize=(3.2 * len(views), 3))
+        for ax, view in zip(axes, views):
+            _plot_binned(ax, comparison['counts'][preview_var], comparison['edges'][view][preview_var],
+                         'blue' if view == 'original' else 'green')
+            ax.set_title('Original' if view == 'original' else settings.AVAILABLE_SCALERS[view].split(' ')[0], fontsize=10)
+            ax.tick_params(labelsize=8)
+            ax.grid(alpha=0.3)
+        axes[0].set_ylabel('Densidad')
+        plt.tight_layout()
+        st.pyplot(fig)
+        plt.close()
+        
+        summary = comparison['summary'].xs(preview_var, level='column').rename(
+            index=lambda view: 'Original' if view == 'original' else settings.AVAILABLE_SCALERS[view]
+        )
+        st.dataframe(
+            summary.rename(columns={'min': 'Mín', 'p25': 'P25', 'median': 'Mediana', 'p75': 'P75', 'max': 'Máx'}).round(3),
+            use_container_width=True
+        )
+        st.caption(f"Cuantiles aproximados con un sketch de {settings.QUANTILE_SKETCH_K:,} elementos; "
+                   f"histogramas de {settings.SCALER_COMPARISON_BINS} intervalos equiprobables.")
+    
     # Botón de escalado
     st.markdown("### 🚀 Ejecutar Escalado")
     
     if st.button("📏 Escalar Datos", type="primary", use_container_width=True):
         with st.spinner(f"Aplicando {settings.AVAILABLE_SCALERS[scaler_type]}..."):
             try:
-                scaled_df, scaler = scale_data(data, scaler_type, columns_to_scale)
+                if streaming:
+                    scaled_df, scaler = scale_data_streaming(
+                        data, scaler_type, columns_to_scale,
+                        chunksize=settings.SCALE_CHUNK_SIZE,
+                        sketch_k=settings.QUANTILE_SKETCH_K,
+                        dtype=settings.PRECISION
+                    )
+                else:
+                    scaled_df, scaler = scale_data(data, scaler_type, columns_to_scale, dtype=settings.PRECISION)
                 
                 if scaler is None:
                     st.error("❌ Error al escalar los datos. Verifica el método seleccionado.")
@@ -125,6 +209,12 @@ def render():
                     st.session_state.scaler = scaler
                     st.session_state.scaler_type = scaler_type
                     st.session_state.scaled_columns = columns_to_scale
+                    st.session_state.pipeline_config['selected_features'] = list(st.session_state.selected_features)
+                    st.session_state.pipeline_config['scaling'] = {
+                        'scaler_type': scaler_type,
+                        'columns': columns_to_scale,
+                        'streaming': streaming
+                    }
                     
                     st.success(settings.MESSAGES['data_scaled'])
                     st.rerun()
@@ -176,22 +266,25 @@ def render():
         
         if compare_var:
             fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+            binned = compare_scalers(data, scaled_columns, bins=settings.SCALER_COMPARISON_BINS,
+                                     fingerprint=data_key, chunksize=settings.SCALE_CHUNK_SIZE)
             
             # Gráfico original
-            axes[0].hist(data[compare_var], bins=30, edgecolor='black', alpha=0.7, color='blue')
+            _plot_binned(axes[0], binned['counts'][compare_var], binned['edges']['original'][compare_var], 'blue')
             axes[0].set_title(f'Original: {compare_var}')
             axes[0].set_xlabel('Valor')
-            axes[0].set_ylabel('Frecuencia')
+            axes[0].set_ylabel('Densidad')
             axes[0].grid(alpha=0.3)
             axes[0].axvline(data[compare_var].mean(), color='red', 
                            linestyle='--', label=f'Media: {data[compare_var].mean():.2f}')
             axes[0].legend()
             
-            # Gráfico escalado
-            axes[1].hist(scaled_df[compare_var], bins=30, edgecolor='black', alpha=0.7, color='green')
+            # Gráfico escalado: histograma de los datos realmente escalados
+            scaled_counts, scaled_edges = np.histogram(scaled_df[compare_var], bins=settings.SCALER_COMPARISON_BINS)
+            _plot_binned(axes[1], scaled_counts, scaled_edges, 'green')
             axes[1].set_title(f'Escalado: {compare_var}')
             axes[1].set_xlabel('Valor')
-            axes[1].set_ylabel('Frecuencia')
+            axes[1].set_ylabel('Densidad')
             axes[1].grid(alpha=0.3)
             axes[1].axvline(scaled_df[compare_var].mean(), color='red',
                            linestyle='--', label=f'Media: {scaled_df[compare_var].mean():.2f}')
@@ -219,6 +312,18 @@ def render():
         comparison_df = pd.DataFrame(comparison_data)
         st.dataframe(comparison_df, use_container_width=True)
         
+        # Escalador reutilizable para datos nuevos
+        if st.session_state.scaler is not None:
+            scaler_file = io.BytesIO()
+            save_scaler(st.session_state.scaler, scaled_columns, scaler_file)
+            st.download_button(
+                "📥 Descargar escalador (.json)",
+                scaler_file.getvalue(),
+                file_name=f"scaler_{st.session_state.get('scaler_type', 'standard')}.json",
+                mime="application/json",
+                help="Guarda el escalador ajustado y sus columnas para escalar nuevos lotes sin reajustarlo (ver Resultados)"
+            )
+        
         st.markdown("""
         <div class="success-box">
         ✅ <b>Datos escalados correctamente</b><br>
@@ -7,7 +7,15 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from config import settings
-from core import determine_optimal_k, perform_clustering, select_best_method
+from core import (
+    determine_optimal_k,
+    perform_clustering,
+    select_best_method,
+    compare_sweep_modes,
+    estimate_eps,
+    compare_methods,
+    DENSITY_METHODS
+)
 
 
 def render():
@@ -61,12 +69,41 @@ def render():
                 step=1
             )
         
+        col3, col4 = st.columns(2)
+        
+        with col3:
+            sweep_method = st.selectbox(
+                "Algoritmo para el barrido",
+                ['kmeans', 'minibatch_kmeans'],
+                format_func=lambda x: settings.AVAILABLE_CLUSTERING_METHODS[x],
+                index=0,
+                help=f"Con más de {settings.MINIBATCH_AUTO_THRESHOLD:,} filas K-Means pasa automáticamente a MiniBatch K-Means"
+            )
+        
+        with col4:
+            sweep_mode = st.selectbox(
+                "Modo de barrido",
+                list(settings.AVAILABLE_SWEEP_MODES.keys()),
+                format_func=lambda x: settings.AVAILABLE_SWEEP_MODES[x],
+                index=0,
+                help="El modo incremental arranca cada k+1 desde la solución de k: menos reinicios e iteraciones"
+            )
+        
+        compare_modes = sweep_mode != 'cold' and st.checkbox(
+            "Comparar con el barrido en frío (calidad vs. velocidad)",
+            value=False
+        )
+        
         if st.button("🔍 Calcular K Óptimo", type="primary", use_container_width=True):
             with st.spinner("Calculando métricas para diferentes valores de K..."):
                 try:
                     optimal_k, metrics_df, inertia_reduction = determine_optimal_k(
                         data_scaled, 
-                        (k_min, k_max + 1)
+                        (k_min, k_max + 1),
+                        n_jobs=settings.N_JOBS,
+                        blas_threads=settings.BLAS_THREADS_PER_WORKER,
+                        method=sweep_method,
+                        sweep_mode=sweep_mode
                     )
                     
                     # Guardar resultados
@@ -85,8 +122,12 @@ def render():
                 # Mostrar métricas
                 st.markdown("### 📊 Métricas por Valor de K")
                 
-                display_metrics = metrics_df[['k', 'Silhouette', 'Davies-Bouldin', 
-                                              'Calinski-Harabasz', 'Score_Compuesto']].copy()
+                display_columns = ['k', 'Silhouette', 'Davies-Bouldin', 'Calinski-Harabasz', 'Score_Compuesto']
+                silhouette_estimated = metrics_df['Silhouette_Estimado'].any()
+                if silhouette_estimated:
+                    display_columns[2:2] = ['Silhouette_IC_Inf', 'Silhouette_IC_Sup']
+                
+                display_metrics = metrics_df[display_columns].copy()
                 display_metrics = display_metrics.round(4)
                 
                 # Destacar el K óptimo
@@ -100,6 +141,13 @@ def render():
                     use_container_width=True
                 )
                 
+                if silhouette_estimated:
+                    st.caption(
+                        f"≈ Silhouette **estimado** sobre {settings.SILHOUETTE_N_REPEATS} submuestras estratificadas "
+                        f"de {settings.SILHOUETTE_SAMPLE_SIZE:,} filas (IC {settings.SILHOUETTE_CONFIDENCE:.0%}), "
+                        f"porque el dataset supera {settings.SILHOUETTE_SAMPLE_THRESHOLD:,} filas."
+                    )
+                
                 # Visualizaciones
                 st.markdown("### 📈 Visualización de Métricas")
                 
@@ -148,6 +196,22 @@ def render():
                 st.pyplot(fig)
                 plt.close()
                 
+                # Comparación barrido incremental vs. en frío
+                if compare_modes:
+                    st.markdown("### ⚡ Barrido Incremental vs. En Frío")
+                    
+                    with st.spinner("Ejecutando ambos barridos para comparar..."):
+                        sweep_comparison = compare_sweep_modes(
+                            data_scaled, (k_min, k_max + 1), sweep_mode=sweep_mode, method=sweep_method
+                        )
+                    
+                    col_a, col_b, col_c = st.columns(3)
+                    col_a.metric("Tiempo en frío", f"{sweep_comparison['Tiempo_Frio_s'].sum():.2f} s")
+                    col_b.metric("Tiempo incremental", f"{sweep_comparison['Tiempo_Incremental_s'].sum():.2f} s")
+                    col_c.metric("Dif. media de inercia", f"{sweep_comparison['Inercia_Dif_Pct'].mean():+.2f}%")
+                    
+                    st.dataframe(sweep_comparison.round(4), use_container_width=True)
+                
                 # Reducción de inercia
                 if len(inertia_reduction) > 0:
                     st.markdown("### 📉 Reducción Porcentual de Inercia")
@@ -188,27 +252,85 @@ def render():
             # Método de clustering
             clustering_method = st.selectbox(
                 "Método de clustering",
-                ['kmeans', 'hierarchical', 'hierarchical_complete', 'hierarchical_average'],
-                format_func=lambda x: {
-                    'kmeans': 'K-Means',
-                    'hierarchical': 'Hierarchical (Ward)',
-                    'hierarchical_complete': 'Hierarchical (Complete)',
-                    'hierarchical_average': 'Hierarchical (Average)'
-                }[x],
+                list(settings.AVAILABLE_CLUSTERING_METHODS.keys()),
+                format_func=lambda x: settings.AVAILABLE_CLUSTERING_METHODS[x],
                 index=0
             )
         
+        # Parámetros de los métodos de densidad (el número de clusters lo decide el algoritmo)
+        density_params = {}
+        if clustering_method in DENSITY_METHODS:
+            st.caption("ℹ️ Los métodos de densidad ignoran el número de clusters y marcan el ruido como **-1**")
+            
+            col_d1, col_d2 = st.columns(2)
+            
+            with col_d1:
+                density_params['min_samples'] = st.number_input(
+                    "Vecinos mínimos (min_samples)",
+                    min_value=2,
+                    max_value=200,
+                    value=settings.DBSCAN_MIN_SAMPLES,
+                    step=1
+                )
+            
+            with col_d2:
+                if clustering_method == 'dbscan':
+                    auto_eps = st.checkbox("Estimar eps automáticamente (curva de k-distancias)", value=True)
+                    if not auto_eps:
+                        density_params['eps'] = st.number_input(
+                            "eps (radio de vecindad)",
+                            min_value=0.001,
+                            value=0.5,
+                            step=0.05,
+                            format="%.3f"
+                        )
+                else:
+                    density_params['min_cluster_size'] = st.number_input(
+                        "Tamaño mínimo de cluster",
+                        min_value=2,
+                        max_value=10_000,
+                        value=settings.HDBSCAN_MIN_CLUSTER_SIZE,
+                        step=1
+                    )
+            
+            if clustering_method == 'dbscan' and density_params.get('eps') is None:
+                with st.expander("📉 Ver curva de k-distancias"):
+                    eps_estimate, k_distances = estimate_eps(data_scaled, density_params['min_samples'])
+                    fig, ax = plt.subplots(figsize=(10, 4))
+                    ax.plot(k_distances, linewidth=2)
+                    ax.axhline(eps_estimate, color='red', linestyle='--', label=f'eps estimado={eps_estimate:.3f}')
+                    ax.set_xlabel('Puntos de la muestra (ordenados)')
+                    ax.set_ylabel(f"Distancia al vecino {density_params['min_samples']}")
+                    ax.grid(alpha=0.3)
+                    ax.legend()
+                    st.pyplot(fig)
+                    plt.close()
+        
         if st.button("🎯 Ejecutar Clustering", type="primary", use_container_width=True):
             with st.spinner(f"Ejecutando clustering con {n_clusters} clusters..."):
                 try:
-                    result = perform_clustering(data_scaled, n_clusters, clustering_method)
+                    result = perform_clustering(data_scaled, n_clusters, clustering_method, **density_params)
                     
                     # Guardar resultados
                     st.session_state.cluster_results = result
-                    st.session_state.n_clusters_used = n_clusters
-                    st.session_state.method_used = clustering_method
+                    st.session_state.n_clusters_used = result['n_clusters']
+                    st.session_state.method_used = result['method']
+                    st.session_state.pipeline_config['clustering'] = {
+                        'n_clusters': n_clusters,
+                        'method': clustering_method,
+                        **density_params
+                    }
                     
                     st.success(settings.MESSAGES['clustering_success'])
+                    if result['from_sweep']:
+                        st.caption("⚡ Se partió del modelo ya ajustado en **Determinar K Óptimo** (sin reajustar desde cero)")
+                    if result['method'] in DENSITY_METHODS:
+                        eps_text = f" con eps={result['eps']:.3f}" if result['eps'] is not None else ""
+                        st.info(f"ℹ️ Se encontraron **{result['n_clusters']}** clusters{eps_text}; "
+                                f"{result['noise_count']:,} puntos ({result['noise_pct']*100:.1f}%) marcados como ruido")
+                    elif result['method'] != clustering_method:
+                        st.info(f"ℹ️ Dataset con más de {settings.MINIBATCH_AUTO_THRESHOLD:,} filas: "
+                                f"se usó **{settings.AVAILABLE_CLUSTERING_METHODS[result['method']]}**")
                 except ValueError as e:
                     st.error(f"❌ Error: {str(e)}")
                     st.info("💡 Sugerencia: Verifica que tengas suficientes datos y que el número de clusters sea apropiado.")
@@ -220,7 +342,12 @@ def render():
                 st.markdown("### 📊 Métricas del Clustering")
                 
                 col_a, col_b, col_c = st.columns(3)
-                col_a.metric("Silhouette Score", f"{result['silhouette']:.4f}")
+                if result['silhouette_estimated']:
+                    ci_low, ci_high = result['silhouette_ci']
+                    col_a.metric("Silhouette Score (estimado)", f"≈{result['silhouette']:.4f}",
+                                help=f"IC {settings.SILHOUETTE_CONFIDENCE:.0%}: [{ci_low:.4f}, {ci_high:.4f}]")
+                else:
+                    col_a.metric("Silhouette Score", f"{result['silhouette']:.4f}")
                 col_b.metric("Davies-Bouldin", f"{result['davies_bouldin']:.4f}")
                 col_c.metric("Calinski-Harabasz", f"{result['calinski_harabasz']:.2f}")
                 
@@ -234,7 +361,7 @@ def render():
                 with col1:
                     # Tabla de distribución
                     dist_df = pd.DataFrame({
-                        'Cluster': distribution.index,
+                        'Cluster': ['Ruido' if i == -1 else i for i in distribution.index],
                         'Cantidad': distribution.values,
                         'Porcentaje': [f"{v*100:.1f}%" for v in distribution.values]
                     })
@@ -250,7 +377,8 @@ def render():
                     # Gráfico de distribución
                     fig, ax = plt.subplots(figsize=(8, 6))
                     colors = plt.cm.Set3(np.linspace(0, 1, len(distribution)))
-                    ax.pie(distribution.values, labels=[f'Cluster {i}' for i in distribution.index],
+                    ax.pie(distribution.values,
+                          labels=['Ruido' if i == -1 else f'Cluster {i}' for i in distribution.index],
                           autopct='%1.1f%%', colors=colors, startangle=90)
                     ax.set_title('Distribución de Clusters')
                     st.pyplot(fig)
@@ -265,7 +393,8 @@ def render():
             result = st.session_state.cluster_results
             
             col1, col2, col3 = st.columns(3)
-            col1.metric("Silhouette", f"{result['silhouette']:.4f}")
+            silhouette_prefix = "≈" if result.get('silhouette_estimated') else ""
+            col1.metric("Silhouette", f"{silhouette_prefix}{result['silhouette']:.4f}")
             col2.metric("Davies-Bouldin", f"{result['davies_bouldin']:.4f}")
             col3.metric("Clusters", st.session_state.n_clusters_used)
             
@@ -295,14 +424,9 @@ def render():
         
         methods_to_compare = st.multiselect(
             "Métodos a comparar",
-            ['kmeans', 'hierarchical', 'hierarchical_complete', 'hierarchical_average'],
+            list(settings.AVAILABLE_CLUSTERING_METHODS.keys()),
             default=['kmeans', 'hierarchical'],
-            format_func=lambda x: {
-                'kmeans': 'K-Means',
-                'hierarchical': 'Hierarchical (Ward)',
-                'hierarchical_complete': 'Hierarchical (Complete)',
-                'hierarchical_average': 'Hierarchical (Average)'
-            }[x]
+            format_func=lambda x: settings.AVAILABLE_CLUSTERING_METHODS[x]
         )
         
         if st.button("🔬 Comparar Métodos", type="primary", use_container_width=True):
@@ -311,13 +435,22 @@ def render():
             else:
                 with st.spinner("Ejecutando y comparando métodos..."):
                     try:
-                        results_dict = {}
-                        
                         progress_bar = st.progress(0)
-                        for idx, method in enumerate(methods_to_compare):
-                            result = perform_clustering(data_scaled, compare_k, method)
-                            results_dict[method] = result
-                            progress_bar.progress((idx + 1) / len(methods_to_compare))
+                        
+                        def update_progress(method, done, total):
+                            progress_bar.progress(
+                                done / total,
+                                text=f"{settings.AVAILABLE_CLUSTERING_METHODS[method]} completado ({done}/{total})"
+                            )
+                        
+                        results_dict = compare_methods(
+                            data_scaled,
+                            compare_k,
+                            methods_to_compare,
+                            n_jobs=settings.N_JOBS,
+                            blas_threads=settings.BLAS_THREADS_PER_WORKER,
+                            progress_callback=update_progress
+                        )
                         
                         progress_bar.empty()
                         
@@ -331,7 +464,7 @@ def render():
                         
                         display_comparison = comparison_df[[
                             'Método', 'Silhouette', 'Davies-Bouldin', 
-                            'Calinski-Harabasz', 'Max_Cluster_Pct', 'Score_Final'
+                            'Calinski-Harabasz', 'Max_Cluster_Pct', 'Ruido_Pct', 'Score_Final'
                         ]].copy()
                         
                         # Formatear valores
@@ -339,6 +472,7 @@ def render():
                         display_comparison['Davies-Bouldin'] = display_comparison['Davies-Bouldin'].round(4)
                         display_comparison['Calinski-Harabasz'] = display_comparison['Calinski-Harabasz'].round(2)
                         display_comparison['Max_Cluster_Pct'] = display_comparison['Max_Cluster_Pct'].apply(lambda x: f"{x*100:.1f}%")
+                        display_comparison['Ruido_Pct'] = display_comparison['Ruido_Pct'].apply(lambda x: f"{x*100:.1f}%")
                         display_comparison['Score_Final'] = display_comparison['Score_Final'].round(2)
                         
                         # Destacar mejor método
@@ -352,6 +486,9 @@ def render():
                             use_container_width=True
                         )
                         
+                        if any(r['silhouette_estimated'] for r in results_dict.values()):
+                            st.caption("≈ Silhouette estimado por muestreo estratificado (dataset grande)")
+                        
                         # Gráfico de radar
                         st.markdown("### 📈 Comparación Visual")
                         
@@ -383,8 +520,12 @@ def render():
                         # Guardar mejor resultado
                         if st.button("✅ Usar Mejor Método", use_container_width=True):
                             st.session_state.cluster_results = results_dict[best_method]
-                            st.session_state.n_clusters_used = compare_k
+                            st.session_state.n_clusters_used = results_dict[best_method]['n_clusters']
                             st.session_state.method_used = best_method
+                            st.session_state.pipeline_config['clustering'] = {
+                                'n_clusters': compare_k,
+                                'method': best_method
+                            }
                             st.success(f"✅ Resultado de {best_method.upper()} guardado. Ve a **Resultados** para visualizar.")
                         
                     except ValueError as e:
@@ -9,6 +9,7 @@ import seaborn as sns
 from datetime import datetime
 from sklearn.decomposition import PCA
 from config import settings
+from core import load_data, load_scaler, transform_with_scaler, assign_clusters, FILE_FORMATS
 
 
 def render():
@@ -28,6 +29,10 @@ def render():
     data_with_clusters = data_original.copy()
     data_with_clusters['Cluster'] = result['labels']
     
+    # Los métodos de densidad marcan el ruido con -1: se dibuja aparte y no cuenta como cluster
+    noise_mask = result['labels'] == -1
+    cluster_ids = [c for c in np.unique(result['labels']) if c != -1]
+    
     # ===================
     # SECCIÓN 1: RESUMEN
     # ===================
@@ -36,9 +41,22 @@ def render():
     col1, col2, col3, col4 = st.columns(4)
     col1.metric("🎯 Clusters", result['n_clusters'])
     col2.metric("📊 Observaciones", len(data_with_clusters))
-    col3.metric("✅ Silhouette", f"{result['silhouette']:.3f}")
+    silhouette_estimated = result.get('silhouette_estimated', False)
+    if silhouette_estimated:
+        ci_low, ci_high = result['silhouette_ci']
+        col3.metric("✅ Silhouette (estimado)", f"≈{result['silhouette']:.3f}",
+                   help=f"IC {settings.SILHOUETTE_CONFIDENCE:.0%}: [{ci_low:.3f}, {ci_high:.3f}]")
+    else:
+        col3.metric("✅ Silhouette", f"{result['silhouette']:.3f}")
     col4.metric("🔧 Método", st.session_state.get('method_used', 'kmeans').upper())
     
+    if silhouette_estimated:
+        st.caption("≈ El Silhouette es una estimación sobre submuestras estratificadas (dataset grande)")
+    
+    if noise_mask.any():
+        st.caption(f"🔘 {noise_mask.sum():,} puntos ({noise_mask.mean()*100:.1f}%) clasificados como ruido; "
+                   f"las métricas se calculan sin ellos")
+    
     # Interpretación del Silhouette
     if result['silhouette'] > 0.7:
         st.success("✅ **Excelente separación** de clusters")
@@ -67,7 +85,7 @@ def render():
         # Aplicar PCA automáticamente
         with st.spinner("Calculando proyección PCA..."):
             pca = PCA(n_components=2)
-            data_pca = pca.fit_transform(data_scaled)
+            data_pca = pca.fit_transform(data_scaled.to_numpy(dtype=settings.PRECISION))
             
             # Varianza explicada
             explained_var = pca.explained_variance_ratio_
@@ -78,16 +96,27 @@ def render():
         fig, ax = plt.subplots(figsize=(14, 10))
         
         # Paleta de colores vibrantes
-        colors = plt.cm.tab10(np.linspace(0, 1, result['n_clusters']))
+        colors = plt.cm.tab10(np.linspace(0, 1, max(len(cluster_ids), 1)))
+        
+        if noise_mask.any():
+            ax.scatter(
+                data_pca[noise_mask, 0],
+                data_pca[noise_mask, 1],
+                c='lightgray',
+                label=f'Ruido (n={noise_mask.sum()})',
+                alpha=0.5,
+                s=40,
+                marker='x'
+            )
         
-        for cluster_id in range(result['n_clusters']):
+        for color_idx, cluster_id in enumerate(cluster_ids):
             cluster_mask = result['labels'] == cluster_id
             cluster_size = np.sum(cluster_mask)
             
             ax.scatter(
                 data_pca[cluster_mask, 0],
                 data_pca[cluster_mask, 1],
-                c=[colors[cluster_id]],
+                c=[colors[color_idx]],
                 label=f'Cluster {cluster_id} (n={cluster_size})',
                 alpha=0.7,
                 s=150,
@@ -98,7 +127,7 @@ def render():
             # Calcular y mostrar centroide
             centroid_x = data_pca[cluster_mask, 0].mean()
             centroid_y = data_pca[cluster_mask, 1].mean()
-            ax.scatter(centroid_x, centroid_y, c=[colors[cluster_id]], 
+            ax.scatter(centroid_x, centroid_y, c=[colors[color_idx]], 
                       marker='*', s=800, edgecolors='black', linewidth=2,
                       zorder=10)
         
@@ -111,7 +140,7 @@ def render():
         ax.set_facecolor('#F8F9FA')
         
         # Añadir elipses de confianza para cada cluster
-        for cluster_id in range(result['n_clusters']):
+        for color_idx, cluster_id in enumerate(cluster_ids):
             cluster_mask = result['labels'] == cluster_id
             cluster_points = data_pca[cluster_mask]
             
@@ -129,8 +158,8 @@ def render():
                 ellipse = Ellipse(mean, width=2*np.sqrt(eigenvalues[0])*2, 
                                 height=2*np.sqrt(eigenvalues[1])*2,
                                 angle=angle, alpha=0.2, 
-                                facecolor=colors[cluster_id], 
-                                edgecolor=colors[cluster_id], linewidth=2)
+                                facecolor=colors[color_idx], 
+                                edgecolor=colors[color_idx], linewidth=2)
                 ax.add_patch(ellipse)
         
         plt.tight_layout()
@@ -150,7 +179,9 @@ def render():
         # Gráfico de barras de distribución
         fig, ax = plt.subplots(figsize=(8, 6))
         cluster_counts = data_with_clusters['Cluster'].value_counts().sort_index()
-        colors_bar = plt.cm.tab10(np.linspace(0, 1, result['n_clusters']))
+        cluster_colors = plt.cm.tab10(np.linspace(0, 1, max(len(cluster_ids), 1)))
+        colors_bar = ['lightgray' if idx == -1 else cluster_colors[cluster_ids.index(idx)]
+                      for idx in cluster_counts.index]
         
         bars = ax.bar(cluster_counts.index, cluster_counts.values, 
                      color=colors_bar, alpha=0.8, edgecolor='black', linewidth=2)
@@ -179,10 +210,10 @@ def render():
         summary_data = []
         numeric_original = data_original.select_dtypes(include=[np.number]).columns.tolist()
         
-        for cluster_id in range(result['n_clusters']):
+        for cluster_id in cluster_ids + ([-1] if noise_mask.any() else []):
             cluster_data = data_with_clusters[data_with_clusters['Cluster'] == cluster_id]
             summary_data.append({
-                'Cluster': f'Cluster {cluster_id}',
+                'Cluster': 'Ruido' if cluster_id == -1 else f'Cluster {cluster_id}',
                 'Tamaño': len(cluster_data),
                 'Porcentaje': f"{len(cluster_data) / len(data_with_clusters) * 100:.1f}%"
             })
@@ -194,9 +225,10 @@ def render():
         st.markdown("#### 📏 Métricas de Calidad")
         
         metrics_compact = pd.DataFrame({
-            'Métrica': ['Silhouette', 'Davies-Bouldin', 'Calinski-Harabasz'],
+            'Métrica': ['Silhouette (estimado)' if silhouette_estimated else 'Silhouette',
+                        'Davies-Bouldin', 'Calinski-Harabasz'],
             'Valor': [
-                f"{result['silhouette']:.3f}",
+                f"≈{result['silhouette']:.3f}" if silhouette_estimated else f"{result['silhouette']:.3f}",
                 f"{result['davies_bouldin']:.3f}",
                 f"{result['calinski_harabasz']:.1f}"
             ],
@@ -239,7 +271,7 @@ def render():
         
         # Crear perfiles
         profiles = []
-        for cluster_id in range(result['n_clusters']):
+        for cluster_id in cluster_ids:
             cluster_subset = data_with_clusters[data_with_clusters['Cluster'] == cluster_id]
             row = {'Cluster': cluster_id, 'Tamaño': len(cluster_subset)}
             
@@ -263,7 +295,8 @@ def render():
         st.markdown("#### 📏 Métricas")
         
         metrics_export = pd.DataFrame({
-            'Métrica': ['Clusters', 'Método', 'Silhouette', 'Davies-Bouldin', 'Calinski-Harabasz', 'Observaciones'],
+            'Métrica': ['Clusters', 'Método', 'Silhouette (estimado)' if silhouette_estimated else 'Silhouette',
+                        'Davies-Bouldin', 'Calinski-Harabasz', 'Observaciones'],
             'Valor': [
                 str(result['n_clusters']),
                 str(st.session_state.get('method_used', 'kmeans').upper()),
@@ -284,5 +317,71 @@ def render():
             use_container_width=True
         )
     
+    st.markdown("---")
+    
+    # ===================
+    # SECCIÓN 5: ASIGNAR NUEVOS DATOS
+    # ===================
+    st.markdown("### 🔮 Asignar Clusters a Nuevos Datos")
+    st.caption("Limpia, escala y asigna un lote nuevo con el pipeline, el escalador y el modelo ya ajustados, sin reajustar nada.")
+    
+    col_new, col_scaler = st.columns(2)
+    with col_new:
+        new_file = st.file_uploader(
+            "Nuevo lote de datos",
+            type=[ext.lstrip('.') for ext in FILE_FORMATS],
+            key="score_data_file"
+        )
+    with col_scaler:
+        scaler_file = st.file_uploader(
+            "Escalador guardado (opcional)",
+            type=['json'],
+            key="score_scaler_file",
+            help="Si no se indica, se usa el escalador de esta sesión"
+        )
+    
+    if new_file is not None and st.button("🎯 Asignar clusters", use_container_width=True):
+        with st.spinner("Asignando clusters..."):
+            try:
+                if scaler_file is not None:
+                    scaler, scaler_columns = load_scaler(scaler_file)
+                else:
+                    scaler, scaler_columns = st.session_state.scaler, data_scaled.columns.tolist()
+                if scaler is None:
+                    raise ValueError("No hay escalador ajustado en esta sesión")
+                if list(scaler_columns) != data_scaled.columns.tolist():
+                    raise ValueError("Las columnas del escalador no coinciden con las del clustering")
+                
+                new_data, error = load_data(new_file, chunksize=settings.CSV_CHUNK_SIZE, optimize=settings.OPTIMIZE_DTYPES)
+                if error:
+                    raise ValueError(error)
+                if st.session_state.cleaning_pipeline is not None:
+                    new_data = st.session_state.cleaning_pipeline.transform(new_data)
+                
+                new_scaled = transform_with_scaler(
+                    new_data, scaler, scaler_columns,
+                    chunksize=settings.SCALE_CHUNK_SIZE,
+                    dtype=settings.PRECISION
+                )
+                new_labels = assign_clusters(new_scaled, result, train_data=data_scaled, chunksize=settings.SCALE_CHUNK_SIZE)
+                
+                scored = new_data.copy()
+                scored['Cluster'] = new_labels
+                
+                st.success(f"✅ {len(scored):,} filas asignadas")
+                st.dataframe(
+                    scored['Cluster'].value_counts().sort_index().rename('Filas').to_frame(),
+                    use_container_width=True
+                )
+                st.download_button(
+                    label="⬇️ Descargar CSV con clusters",
+                    data=scored.to_csv(index=False).encode('utf-8'),
+                    file_name=f"clusters_nuevos_{timestamp}.csv",
+                    mime="text/csv",
+                    use_container_width=True
+                )
+            except Exception as e:
+                st.error(f"❌ No se pudieron asignar los clusters: {str(e)}")
+    
     st.markdown("---")
     st.success("✅ Análisis de clustering completado. Puedes exportar los resultados usando los botones de arriba.")
@@ -0,0 +1,64 @@
+"""
+Comparar float64 y float32 en escalado, K-Means y PCA
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_precision.py [n_filas] [n_columnas]
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.decomposition import PCA
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from core.scaler import scale_data
+from core.clustering import perform_clustering
+
+
+def run(data: pd.DataFrame, dtype: str, n_clusters: int = 5) -> dict:
+    """Escalar, agrupar y proyectar con PCA midiendo tiempo y memoria"""
+    start = time.perf_counter()
+    scaled, _ = scale_data(data, 'standard', dtype=dtype)
+    scale_time = time.perf_counter() - start
+    
+    # Sin la caché de resultados: se mide el ajuste real y no se escribe en app/data/cache
+    start = time.perf_counter()
+    result = perform_clustering.__wrapped__(scaled, n_clusters, method='kmeans')
+    cluster_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    PCA(n_components=2).fit_transform(scaled.to_numpy(dtype=dtype))
+    pca_time = time.perf_counter() - start
+    
+    return {
+        'dtype': dtype,
+        'memory_mb': scaled.memory_usage(index=False).sum() / 1024**2,
+        'scale_s': scale_time,
+        'kmeans_s': cluster_time,
+        'pca_s': pca_time,
+        'silhouette': result['silhouette'],
+        'calinski_harabasz': result['calinski_harabasz']
+    }
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    n_cols = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    
+    rng = np.random.default_rng(42)
+    centers = rng.normal(0, 5, size=(5, n_cols))
+    data = pd.DataFrame(
+        centers[rng.integers(0, 5, n_rows)] + rng.normal(size=(n_rows, n_cols)),
+        columns=[f"x{i}" for i in range(n_cols)]
+    )
+    
+    results = pd.DataFrame([run(data, dtype) for dtype in ('float64', 'float32')]).set_index('dtype')
+    print(f"{n_rows:,} filas x {n_cols} columnas")
+    print(results.to_string(float_format=lambda x: f"{x:.4f}"))
+
+
+if __name__ == '__main__':
+    main()
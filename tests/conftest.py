@@ -0,0 +1,18 @@
+"""Configuración común de pytest"""
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from core import clustering, data_loader
+
+
+@pytest.fixture(autouse=True, scope="session")
+def result_cache_dir(tmp_path_factory):
+    """Redirigir el nivel en disco de las cachés de resultados y datasets a un directorio temporal"""
+    clustering._result_cache.cache_dir = tmp_path_factory.mktemp("result_cache")
+    data_loader._dataset_cache.cache_dir = tmp_path_factory.mktemp("dataset_cache")
+    yield clustering._result_cache.cache_dir
+    clustering._result_cache.clear()
+    data_loader._dataset_cache.clear()
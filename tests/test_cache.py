@@ -0,0 +1,180 @@
+"""Tests para cache.py"""
+import pytest
+import pandas as pd
+import numpy as np
+import io
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from core.cache import (
+    fingerprint_data,
+    fingerprint_file,
+    LRUCache,
+    ResultCache,
+    DataFrameCache,
+    cached_result
+)
+
+
+class TestCache:
+    @pytest.fixture
+    def sample_data(self):
+        np.random.seed(42)
+        return pd.DataFrame({
+            'A': np.random.randn(20),
+            'B': np.random.randn(20)
+        })
+    
+    # Tests de fingerprint_data
+    def test_fingerprint_deterministic(self, sample_data):
+        assert fingerprint_data(sample_data) == fingerprint_data(sample_data.copy())
+    
+    def test_fingerprint_changes_with_content(self, sample_data):
+        modified = sample_data.copy()
+        modified.loc[0, 'A'] += 1
+        assert fingerprint_data(sample_data) != fingerprint_data(modified)
+    
+    def test_fingerprint_array_layouts(self, sample_data):
+        array = sample_data.to_numpy()
+        assert fingerprint_data(np.ascontiguousarray(array)) != fingerprint_data(array[::2])
+        assert len(fingerprint_data(array)) == 32
+    
+    def test_fingerprint_non_numeric(self):
+        df = pd.DataFrame({'A': [1, 2], 'B': ['x', 'y']})
+        other = pd.DataFrame({'A': [1, 2], 'B': ['x', 'z']})
+        assert fingerprint_data(df) != fingerprint_data(other)
+    
+    # Tests de LRUCache
+    def test_lru_cache_eviction(self):
+        cache = LRUCache(max_entries=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        assert 'a' in cache
+        assert 'b' not in cache
+        assert len(cache) == 2
+    
+    def test_lru_cache_counters(self):
+        cache = LRUCache()
+        cache.put('a', 1)
+        assert cache.get('a') == 1
+        assert cache.get('missing') is None
+        assert cache.hits == 1
+        assert cache.misses == 1
+    
+    def test_lru_cache_concurrent_access(self):
+        cache = LRUCache(max_entries=4)
+        
+        def worker(offset):
+            for i in range(2000):
+                cache.put((offset + i) % 16, i)
+                cache.get(i % 16)
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(worker, range(8)))
+        assert len(cache) == 4
+    
+    # Tests de ResultCache
+    def test_result_cache_disk_tier_survives_new_instance(self, tmp_path):
+        cache = ResultCache(tmp_path, max_entries=4)
+        cache.put('abc', {'valor': np.arange(5)})
+        
+        fresh = ResultCache(tmp_path, max_entries=4)
+        assert 'abc' in fresh
+        assert np.array_equal(fresh.get('abc')['valor'], np.arange(5))
+        assert fresh.get('abc') is not None
+        assert fresh.disk_hits == 1
+        assert fresh.memory_hits == 1
+    
+    def test_result_cache_size_eviction(self, tmp_path):
+        cache = ResultCache(tmp_path, max_entries=1, max_disk_mb=0.1)
+        for key in ['a', 'b', 'c']:
+            cache.put(key, np.zeros(5_000))
+        stats = cache.stats()
+        assert stats['disk_mb'] <= 0.1
+        assert 'c' in cache
+        assert ResultCache(tmp_path).get('a') is None
+    
+    def test_result_cache_concurrent_writes_same_key(self, tmp_path):
+        barrier = threading.Barrier(4)
+        temp_paths = []
+        
+        class SlowCache(ResultCache):
+            def _write(self, value, path):
+                temp_paths.append(path)
+                barrier.wait(timeout=5)  # las cuatro escrituras están en curso a la vez
+                super()._write(value, path)
+        
+        cache = SlowCache(tmp_path)
+        values = [np.full(1000, i) for i in range(4)]
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda value: cache.put('same', value), values))
+        
+        assert len(set(temp_paths)) == 4
+        stored = ResultCache(tmp_path).get('same')
+        assert any(np.array_equal(stored, value) for value in values)
+        assert not list(tmp_path.glob("*.tmp"))
+    
+    def test_result_cache_memory_only(self):
+        cache = ResultCache(None)
+        cache.put('a', 1)
+        assert cache.get('a') == 1
+        assert cache.get('b') is None
+        assert cache.stats()['hit_rate'] == 0.5
+    
+    def test_cached_result_key_ignores_arguments(self, sample_data):
+        calls = []
+        
+        @cached_result(ResultCache(None), ignore=('n_jobs',))
+        def compute(data, k=3, n_jobs=1):
+            calls.append(k)
+            return data.sum().sum() * k
+        
+        assert compute(sample_data, 3, n_jobs=1) == compute(sample_data, k=3, n_jobs=4)
+        compute(sample_data, 4)
+        compute(sample_data.copy(), 4)
+        assert calls == [3, 4]
+        assert compute.cache_key(sample_data) == compute.cache_key(sample_data, 3, 2)
+    
+    def test_cached_result_key_includes_version(self, sample_data):
+        current = {'version': 1}
+        
+        @cached_result(ResultCache(None), version=lambda: current['version'])
+        def compute(data, k=3):
+            return data.sum().sum() * k
+        
+        key = compute.cache_key(sample_data)
+        assert compute.cache_key(sample_data) == key
+        current['version'] = 2
+        assert compute.cache_key(sample_data) != key
+    
+    # Tests de fingerprint_file y DataFrameCache
+    def test_fingerprint_file_upload_content(self):
+        assert fingerprint_file(io.BytesIO(b"a,b\n1,2")) == fingerprint_file(io.BytesIO(b"a,b\n1,2"))
+        assert fingerprint_file(io.BytesIO(b"a,b\n1,2")) != fingerprint_file(io.BytesIO(b"a,b\n1,3"))
+    
+    def test_fingerprint_file_path_changes_on_write(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_text("a\n1")
+        before = fingerprint_file(path)
+        path.write_text("a\n12")
+        assert fingerprint_file(path) != before
+    
+    def test_dataframe_cache_roundtrip_keeps_dtypes(self, tmp_path):
+        df = pd.DataFrame({
+            'x': np.arange(5, dtype=np.float32),
+            'n': np.arange(5, dtype=np.int8),
+            'g': pd.Categorical(['a', 'b', 'a', 'b', 'a'])
+        })
+        df.attrs['load_info'] = {'n_chunks': 1}
+        DataFrameCache(tmp_path).put('k', df)
+        
+        restored = DataFrameCache(tmp_path).get('k')
+        pd.testing.assert_frame_equal(restored, df)
+        assert restored.attrs['load_info'] == {'n_chunks': 1}
+        assert list(tmp_path.glob('*.arrow'))
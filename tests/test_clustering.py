@@ -1,4 +1,5 @@
 """Tests ampliados para clustering.py"""
+import warnings
 import pytest
 import pandas as pd
 import numpy as np
@@ -7,7 +8,23 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
 
-from core.clustering import determine_optimal_k, perform_clustering, select_best_method
+from core.clustering import (
+    determine_optimal_k,
+    perform_clustering,
+    select_best_method,
+    sampled_silhouette,
+    compute_silhouette,
+    resolve_clustering_method,
+    get_linkage_tree,
+    cut_linkage_tree,
+    clear_clustering_caches,
+    compare_sweep_modes,
+    estimate_eps,
+    compare_methods,
+    get_result_cache_stats,
+    assign_clusters,
+    cluster_centroids
+)
 
 
 class TestClustering:
@@ -162,3 +179,307 @@ class TestClustering:
         best_method, comparison = select_best_method(results)
         # Verificar que está ordenado por Score_Final
         assert comparison['Score_Final'].is_monotonic_increasing
+    
+    def test_determine_optimal_k_parallel_matches_serial(self, complex_data):
+        """El barrido en paralelo debe dar exactamente el mismo resultado que en serie"""
+        clear_clustering_caches()
+        k_serial, metrics_serial, red_serial = determine_optimal_k(complex_data, (2, 6), n_jobs=1)
+        clear_clustering_caches()
+        k_parallel, metrics_parallel, red_parallel = determine_optimal_k(
+            complex_data, (2, 6), n_jobs=2, blas_threads=1
+        )
+        assert k_serial == k_parallel
+        pd.testing.assert_frame_equal(metrics_serial, metrics_parallel)
+        assert red_serial == red_parallel
+    
+    # Tests de Silhouette muestreado
+    def test_sampled_silhouette_close_to_exact(self, complex_data):
+        from sklearn.metrics import silhouette_score
+        labels = perform_clustering(complex_data, 3, 'kmeans')['labels']
+        exact = silhouette_score(complex_data, labels)
+        estimate = sampled_silhouette(complex_data, labels, sample_size=45, n_repeats=5)
+        assert estimate['ci_low'] <= estimate['mean'] <= estimate['ci_high']
+        assert abs(estimate['mean'] - exact) < 0.1
+        assert estimate['n_repeats'] == 5
+    
+    def test_compute_silhouette_switches_to_sampling(self, complex_data):
+        labels = perform_clustering(complex_data, 3, 'kmeans')['labels']
+        _, info_exact = compute_silhouette(complex_data, labels, sample_threshold=len(labels))
+        _, info_sampled = compute_silhouette(complex_data, labels, sample_threshold=10)
+        assert info_exact is None
+        assert info_sampled is not None
+    
+    def test_perform_clustering_reports_exact_silhouette(self, sample_data):
+        result = perform_clustering(sample_data, 2, 'kmeans')
+        assert result['silhouette_estimated'] is False
+        assert result['silhouette_ci'] is None
+    
+    # Tests de MiniBatchKMeans
+    def test_perform_clustering_minibatch_kmeans(self, complex_data):
+        result = perform_clustering(complex_data, 3, 'minibatch_kmeans', batch_size=32, n_init=2)
+        assert result['method'] == 'minibatch_kmeans'
+        assert result['model'].batch_size == 32
+        assert len(result['labels']) == len(complex_data)
+        assert len(set(result['labels'])) == 3
+    
+    def test_determine_optimal_k_minibatch(self, complex_data):
+        optimal_k, metrics_df, reductions = determine_optimal_k(complex_data, (2, 6), method='minibatch_kmeans')
+        assert 2 <= optimal_k <= 5
+        assert len(metrics_df) == 4
+    
+    def test_resolve_clustering_method_auto_switch(self, monkeypatch):
+        from config import settings
+        monkeypatch.setattr(settings, 'MINIBATCH_AUTO_THRESHOLD', 100)
+        assert resolve_clustering_method('kmeans', 101) == 'minibatch_kmeans'
+        assert resolve_clustering_method('kmeans', 100) == 'kmeans'
+        assert resolve_clustering_method('hierarchical', 101) == 'hierarchical'
+        assert resolve_clustering_method('invalid_method', 10) == 'kmeans'
+    
+    def test_select_best_method_with_minibatch(self, complex_data):
+        results = {
+            method: perform_clustering(complex_data, 3, method)
+            for method in ['kmeans', 'minibatch_kmeans']
+        }
+        best_method, comparison = select_best_method(results)
+        assert best_method in results
+        assert len(comparison) == 2
+    
+    # Tests del árbol jerárquico en caché
+    @pytest.mark.parametrize('method,linkage', [
+        ('hierarchical', 'ward'),
+        ('hierarchical_complete', 'complete'),
+        ('hierarchical_average', 'average')
+    ])
+    def test_hierarchical_matches_agglomerative(self, complex_data, method, linkage):
+        from sklearn.cluster import AgglomerativeClustering
+        from sklearn.metrics import adjusted_rand_score
+        for k in [2, 3, 5]:
+            expected = AgglomerativeClustering(n_clusters=k, linkage=linkage).fit_predict(complex_data)
+            result = perform_clustering(complex_data, k, method)
+            assert adjusted_rand_score(expected, result['labels']) == 1.0
+            assert result['model'] is None
+    
+    def test_linkage_tree_is_cached(self, complex_data):
+        first = get_linkage_tree(complex_data, 'ward')
+        second = get_linkage_tree(complex_data.copy(), 'ward')
+        assert first is second
+    
+    def test_cut_linkage_tree_exact_clusters(self, complex_data):
+        linkage_matrix = get_linkage_tree(complex_data, 'average')
+        for k in [1, 4, len(complex_data)]:
+            assert len(np.unique(cut_linkage_tree(linkage_matrix, k))) == k
+        with pytest.raises(ValueError):
+            cut_linkage_tree(linkage_matrix, 0)
+    
+    # Tests del almacén de modelos del barrido
+    def test_perform_clustering_reuses_sweep_model(self, complex_data):
+        clear_clustering_caches()
+        _, metrics_df, _ = determine_optimal_k(complex_data, (2, 6))
+        result = perform_clustering(complex_data, 3, 'kmeans')
+        assert result['from_sweep'] is True
+        sweep_silhouette = metrics_df.loc[metrics_df['k'] == 3, 'Silhouette'].values[0]
+        assert abs(result['silhouette'] - sweep_silhouette) < 0.05
+        assert len(set(result['labels'])) == 3
+    
+    def test_determine_optimal_k_cache_hit_refills_sweep_store(self, complex_data):
+        from core import clustering
+        clear_clustering_caches()
+        determine_optimal_k(complex_data, (2, 6))
+        # Simula un reinicio: el barrido sigue en la caché de resultados pero el almacén está vacío
+        clustering._sweep_store.clear()
+        determine_optimal_k(complex_data, (2, 6))
+        result = perform_clustering(complex_data, 3, 'kmeans')
+        assert result['from_sweep'] is True
+    
+    def test_perform_clustering_without_sweep(self, complex_data):
+        clear_clustering_caches()
+        result = perform_clustering(complex_data, 3, 'kmeans')
+        assert result['from_sweep'] is False
+    
+    def test_determine_optimal_k_repeated_uses_store(self, complex_data):
+        clear_clustering_caches()
+        first = determine_optimal_k(complex_data, (2, 5))
+        second = determine_optimal_k(complex_data, (2, 7))
+        pd.testing.assert_frame_equal(
+            first[1][['k', 'Silhouette', 'Inercia']],
+            second[1][['k', 'Silhouette', 'Inercia']].iloc[:3]
+        )
+    
+    # Tests del barrido incremental
+    @pytest.mark.parametrize('sweep_mode', ['incremental_split', 'incremental_kmeanspp'])
+    def test_determine_optimal_k_incremental(self, complex_data, sweep_mode):
+        clear_clustering_caches()
+        optimal_k, metrics_df, reductions = determine_optimal_k(complex_data, (2, 7), sweep_mode=sweep_mode)
+        assert 2 <= optimal_k <= 6
+        assert len(metrics_df) == 5
+        assert 'Iteraciones' in metrics_df.columns
+        assert len(reductions) == 4
+    
+    def test_determine_optimal_k_invalid_sweep_mode(self, complex_data):
+        with pytest.raises(ValueError):
+            determine_optimal_k(complex_data, (2, 5), sweep_mode='invalid')
+    
+    def test_compare_sweep_modes(self, complex_data):
+        comparison = compare_sweep_modes(complex_data, (2, 7), sweep_mode='incremental_split')
+        assert list(comparison['k']) == [2, 3, 4, 5, 6]
+        for column in ['Inercia_Frio', 'Inercia_Incremental', 'Tiempo_Frio_s', 'Tiempo_Incremental_s']:
+            assert column in comparison.columns
+        # Con 3 clusters bien separados, ambos modos encuentran la misma solución en k=3
+        row_k3 = comparison[comparison['k'] == 3].iloc[0]
+        assert abs(row_k3['Inercia_Dif_Pct']) < 1
+    
+    # Tests de DBSCAN / HDBSCAN
+    @pytest.fixture
+    def noisy_data(self):
+        """3 clusters densos más puntos dispersos"""
+        np.random.seed(42)
+        blobs = np.concatenate([
+            np.random.randn(60, 2) * 0.3,
+            np.random.randn(60, 2) * 0.3 + 5,
+            np.random.randn(60, 2) * 0.3 + [0, 5]
+        ])
+        noise = np.random.uniform(-3, 8, size=(8, 2))
+        return pd.DataFrame(np.vstack([blobs, noise]), columns=['X', 'Y'])
+    
+    def test_estimate_eps(self, noisy_data):
+        eps, k_distances = estimate_eps(noisy_data, min_samples=5)
+        assert eps > 0
+        assert np.all(np.diff(k_distances) >= 0)
+        assert k_distances[0] <= eps <= k_distances[-1]
+    
+    def test_estimate_eps_cached_by_data_and_min_samples(self, noisy_data):
+        first = estimate_eps(noisy_data, min_samples=5)
+        assert estimate_eps(noisy_data, min_samples=5)[1] is first[1]
+        assert estimate_eps(noisy_data, min_samples=6)[1] is not first[1]
+    
+    def test_perform_clustering_dbscan_auto_eps(self, noisy_data):
+        result = perform_clustering(noisy_data, 2, 'dbscan')
+        assert result['method'] == 'dbscan'
+        assert result['eps'] > 0
+        assert result['n_clusters'] == 3
+        assert result['noise_count'] == np.sum(result['labels'] == -1)
+        assert 0 <= result['noise_pct'] < 0.2
+        assert -1 <= result['silhouette'] <= 1
+    
+    def test_perform_clustering_hdbscan(self, noisy_data):
+        result = perform_clustering(noisy_data, 2, 'hdbscan', min_cluster_size=10)
+        assert result['n_clusters'] >= 2
+        assert len(result['labels']) == len(noisy_data)
+    
+    def test_perform_clustering_dbscan_single_cluster_metrics_nan(self, noisy_data):
+        result = perform_clustering(noisy_data, 2, 'dbscan', eps=100.0)
+        assert result['n_clusters'] == 1
+        assert np.isnan(result['silhouette'])
+    
+    def test_select_best_method_with_noise(self, noisy_data):
+        results = {
+            'kmeans': perform_clustering(noisy_data, 3, 'kmeans'),
+            'dbscan': perform_clustering(noisy_data, 3, 'dbscan'),
+            'dbscan_one_cluster': perform_clustering(noisy_data, 3, 'dbscan', eps=100.0)
+        }
+        best_method, comparison = select_best_method(results)
+        assert 'Ruido_Pct' in comparison.columns
+        assert best_method != 'dbscan_one_cluster'
+        assert comparison.iloc[-1]['Método'] == 'dbscan_one_cluster'
+    
+    # Tests de comparación de métodos en paralelo
+    def test_compare_methods_parallel_matches_serial(self, complex_data):
+        methods = ['kmeans', 'hierarchical', 'hierarchical_average', 'dbscan']
+        clear_clustering_caches()
+        serial = compare_methods(complex_data, 3, methods, n_jobs=1)
+        clear_clustering_caches()
+        parallel = compare_methods(complex_data, 3, methods, n_jobs=2, blas_threads=1)
+        assert list(parallel.keys()) == methods
+        for method in methods:
+            assert np.array_equal(serial[method]['labels'], parallel[method]['labels'])
+            assert serial[method]['davies_bouldin'] == pytest.approx(parallel[method]['davies_bouldin'])
+    
+    def test_compare_methods_parallel_models_keep_feature_names(self, complex_data):
+        methods = ['kmeans', 'dbscan']
+        clear_clustering_caches()
+        parallel = compare_methods(complex_data, 3, methods, n_jobs=2, blas_threads=1)
+        for method in methods:
+            model = parallel[method]['model']
+            assert list(model.feature_names_in_) == list(complex_data.columns)
+            assert model.get_params().get('n_jobs') in (None, 1)
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            assign_clusters(complex_data, parallel['kmeans'], chunksize=25)
+    
+    def test_compare_methods_reports_progress(self, complex_data):
+        calls = []
+        clear_clustering_caches()
+        compare_methods(
+            complex_data, 3, ['kmeans', 'hierarchical'], n_jobs=2, blas_threads=1,
+            progress_callback=lambda method, done, total: calls.append((method, done, total))
+        )
+        assert [done for _, done, _ in calls] == [1, 2]
+        assert all(total == 2 for _, _, total in calls)
+    
+    def test_compare_methods_fills_local_linkage_cache(self, complex_data):
+        clear_clustering_caches()
+        compare_methods(complex_data, 3, ['kmeans', 'hierarchical'], n_jobs=2, blas_threads=1)
+        result = perform_clustering(complex_data, 4, 'hierarchical')
+        assert result['linkage_matrix'] is get_linkage_tree(complex_data, 'ward')
+    
+    # Tests de la caché de resultados
+    def test_perform_clustering_served_from_result_cache(self, complex_data):
+        clear_clustering_caches()
+        first = perform_clustering(complex_data, 3, 'kmeans')
+        second = perform_clustering(complex_data.copy(), 3, 'kmeans')
+        stats = get_result_cache_stats()
+        assert second is first
+        assert stats['memory_hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['disk_entries'] == 1
+    
+    def test_determine_optimal_k_cache_ignores_n_jobs(self, complex_data):
+        clear_clustering_caches()
+        first = determine_optimal_k(complex_data, (2, 5), n_jobs=1)
+        second = determine_optimal_k(complex_data, (2, 5), n_jobs=2)
+        assert second is first
+        third = determine_optimal_k(complex_data, (2, 6), n_jobs=1)
+        assert third is not first
+    
+    def test_result_cache_key_includes_version_and_settings(self, complex_data, monkeypatch):
+        from config import settings
+        key = perform_clustering.cache_key(complex_data, 3, 'kmeans')
+        monkeypatch.setattr(settings, 'RESULT_CACHE_VERSION', settings.RESULT_CACHE_VERSION + 1)
+        bumped = perform_clustering.cache_key(complex_data, 3, 'kmeans')
+        assert bumped != key
+        monkeypatch.setattr(settings, 'MINIBATCH_N_INIT', settings.MINIBATCH_N_INIT + 1)
+        assert perform_clustering.cache_key(complex_data, 3, 'kmeans') != bumped
+    
+    # Tests de precisión float32
+    @pytest.mark.parametrize('method', ['kmeans', 'hierarchical'])
+    def test_perform_clustering_float32_matches_float64(self, complex_data, method):
+        expected = perform_clustering(complex_data, 3, method)
+        result = perform_clustering(complex_data.astype(np.float32), 3, method)
+        assert result['method'] == method
+        assert result['silhouette'] == pytest.approx(expected['silhouette'], rel=1e-4)
+        assert result['calinski_harabasz'] == pytest.approx(expected['calinski_harabasz'], rel=1e-6)
+        assert isinstance(result['calinski_harabasz'], float)
+    
+    # Tests de asignación de datos nuevos
+    @pytest.mark.parametrize('method', ['kmeans', 'minibatch_kmeans', 'hierarchical', 'dbscan', 'hdbscan'])
+    def test_assign_clusters_reproduces_training_labels(self, complex_data, method):
+        result = perform_clustering(complex_data, 3, method)
+        labels = assign_clusters(complex_data, result, train_data=complex_data, chunksize=25)
+        clustered = result['labels'] != -1
+        assert np.array_equal(labels[clustered], result['labels'][clustered])
+    
+    def test_assign_clusters_new_points(self, complex_data):
+        result = perform_clustering(complex_data, 3, 'hierarchical')
+        ids, centroids = cluster_centroids(complex_data, result['labels'])
+        labels = assign_clusters(centroids + 0.1, result, train_data=complex_data)
+        assert np.array_equal(labels, ids)
+    
+    def test_assign_clusters_dbscan_far_points_are_noise(self, complex_data):
+        result = perform_clustering(complex_data, 3, 'dbscan')
+        labels = assign_clusters(np.array([[100.0, 100.0]]), result)
+        assert labels[0] == -1
+    
+    def test_assign_clusters_requires_train_data(self, complex_data):
+        result = perform_clustering(complex_data, 3, 'hierarchical')
+        with pytest.raises(ValueError):
+            assign_clusters(complex_data, result)
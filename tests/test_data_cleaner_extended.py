@@ -7,7 +7,18 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
 
-from core.data_cleaner import analyze_data_quality, clean_data
+from core.data_cleaner import (
+    analyze_data_quality,
+    clean_data,
+    outlier_bounds,
+    outlier_mask,
+    row_hashes,
+    stored_row_hashes,
+    duplicate_mask,
+    deduplicate_chunks,
+    profile_data,
+    CleaningPipeline
+)
 
 
 class TestDataCleanerExtended:
@@ -106,3 +117,247 @@ class TestDataCleanerExtended:
         empty_df = pd.DataFrame()
         cleaned = clean_data(empty_df, remove_duplicates=True, fill_nulls_method='mean', remove_outliers=True)
         assert len(cleaned) == 0
+
+    @pytest.fixture
+    def data_with_outliers(self):
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({
+            'x': rng.normal(size=500),
+            'y': rng.normal(size=500),
+            'cat': ['a', 'b'] * 250
+        })
+        df.loc[10, 'x'] = 50.0
+        df.loc[20, 'y'] = -40.0
+        return df
+    
+    # Tests de outliers vectorizados
+    @pytest.mark.parametrize('method', ['zscore', 'iqr', 'mad'])
+    def test_outlier_mask_flags_extreme_rows(self, data_with_outliers, method):
+        threshold = 1.5 if method == 'iqr' else 3.5
+        mask = outlier_mask(data_with_outliers, method=method, threshold=threshold)
+        assert mask.dtype == bool
+        assert mask[10] and mask[20]
+        assert mask.sum() < 20
+    
+    def test_outlier_mask_independent_of_column_order(self, data_with_outliers):
+        mask = outlier_mask(data_with_outliers, method='zscore', threshold=2.5)
+        reordered = outlier_mask(data_with_outliers[['y', 'x', 'cat']], method='zscore', threshold=2.5)
+        assert np.array_equal(mask, reordered)
+    
+    def test_outlier_mask_matches_scipy_zscore(self, data_with_outliers):
+        from scipy.stats import zscore
+        numeric = data_with_outliers[['x', 'y']]
+        expected = (np.abs(zscore(numeric)) > 3.0).any(axis=1).to_numpy()
+        assert np.array_equal(outlier_mask(data_with_outliers, method='zscore', threshold=3.0), expected)
+    
+    def test_outlier_bounds_constant_and_nan_columns(self):
+        df = pd.DataFrame({'const': [1.0] * 5, 'nan': [np.nan] * 5, 'x': [1.0, 2.0, np.nan, 4.0, 100.0]})
+        lower, upper = outlier_bounds(df, method='mad')
+        assert np.isinf(lower[:2]).all() and np.isinf(upper[:2]).all()
+        mask = outlier_mask(df, method='mad')
+        assert not mask[2]
+        assert mask[4]
+    
+    def test_outlier_bounds_invalid_method(self, data_with_outliers):
+        with pytest.raises(ValueError):
+            outlier_bounds(data_with_outliers, method='unknown')
+    
+    @pytest.mark.parametrize('method', ['zscore', 'iqr', 'mad'])
+    def test_clean_data_vectorized_outlier_methods(self, data_with_outliers, method):
+        cleaned = clean_data(data_with_outliers, remove_duplicates=False, fill_nulls_method='none', remove_outliers=True, outlier_threshold=3.0, outlier_method=method)
+        assert 10 not in cleaned.index and 20 not in cleaned.index
+        assert list(cleaned.columns) == list(data_with_outliers.columns)
+    
+    def test_clean_data_sequential_is_default(self, data_with_outliers):
+        default = clean_data(data_with_outliers, remove_duplicates=False, fill_nulls_method='none', outlier_threshold=2.5)
+        sequential = clean_data(data_with_outliers, remove_duplicates=False, fill_nulls_method='none', outlier_threshold=2.5, outlier_method='zscore_sequential')
+        pd.testing.assert_frame_equal(default, sequential)
+    
+    def test_clean_data_empty_dataframe_vectorized(self):
+        cleaned = clean_data(pd.DataFrame(), remove_outliers=True, outlier_method='iqr')
+        assert len(cleaned) == 0
+    
+    # Tests de imputación vectorizada
+    @pytest.mark.parametrize('method', ['mean', 'median', 'zero', 'ffill', 'bfill'])
+    def test_clean_data_fills_nulls_with_copy_on_write(self, data_with_many_nulls, method):
+        with pd.option_context('mode.copy_on_write', True):
+            cleaned = clean_data(data_with_many_nulls, remove_duplicates=False, fill_nulls_method=method, remove_outliers=False)
+        assert cleaned[['num1', 'num2']].isna().sum().sum() == 0
+        assert data_with_many_nulls['num1'].isna().sum() == 3
+    
+    def test_clean_data_fill_preserves_dtypes(self, data_with_many_nulls):
+        data = data_with_many_nulls.astype({'num1': 'float32'})
+        cleaned = clean_data(data, remove_duplicates=False, fill_nulls_method='median', remove_outliers=False)
+        assert cleaned['num1'].dtype == np.float32
+        assert cleaned['num1'].tolist() == [1, 3, 3, 3, 5, 3]
+    
+    def test_clean_data_ffill_leading_nulls(self, data_with_many_nulls):
+        cleaned = clean_data(data_with_many_nulls, remove_duplicates=False, fill_nulls_method='ffill', remove_outliers=False)
+        assert cleaned['num2'].tolist() == [2, 2, 2, 4, 4, 6]
+
+    
+    # Tests de duplicados por hash
+    def test_duplicate_mask_matches_duplicated(self, sample_data):
+        hashes = row_hashes(sample_data)
+        assert hashes.dtype == np.uint64
+        assert np.array_equal(duplicate_mask(hashes), sample_data.duplicated().to_numpy())
+    
+    def test_row_hashes_subset(self, sample_data):
+        data = sample_data.assign(C=['x', 'y', 'z', 'z', 'w'])
+        assert duplicate_mask(row_hashes(data)).sum() == 0
+        assert duplicate_mask(row_hashes(data, ['B'])).sum() == 1
+    
+    def test_analyze_data_quality_reuses_hashes(self, sample_data):
+        hashes = row_hashes(sample_data)
+        assert analyze_data_quality(sample_data, hashes)['duplicates'] == 1
+        assert analyze_data_quality(sample_data)['duplicates'] == 1
+    
+    def test_clean_data_with_precomputed_hashes(self, sample_data):
+        hashes = row_hashes(sample_data, ['A'])
+        cleaned = clean_data(sample_data, remove_outliers=False, duplicate_subset=['A'], hashes=hashes)
+        expected = clean_data(sample_data, remove_outliers=False, duplicate_subset=['A'])
+        pd.testing.assert_frame_equal(cleaned, expected)
+        assert len(cleaned) == 4
+    
+    def test_clean_data_hashes_length_mismatch(self, sample_data):
+        with pytest.raises(ValueError):
+            clean_data(sample_data, hashes=row_hashes(sample_data.head(2)))
+    
+    def test_deduplicate_chunks_across_boundaries(self):
+        data = pd.DataFrame({'k': [1, 2, 1, 3, 2, 4, 1], 'v': [0, 0, 0, 0, 1, 0, 0]})
+        chunks = [data.iloc[i:i + 3] for i in range(0, len(data), 3)]
+        streamed = pd.concat(deduplicate_chunks(chunks))
+        pd.testing.assert_frame_equal(streamed, data.drop_duplicates())
+        
+        by_key = pd.concat(deduplicate_chunks(chunks, subset=['k']))
+        pd.testing.assert_frame_equal(by_key, data.drop_duplicates(subset=['k']))
+    
+    # Tests de profile_data
+    def test_profile_data_matches_column_stats(self, sample_data):
+        profile = profile_data(sample_data)
+        columns = profile['columns']
+        
+        assert list(columns.index) == list(sample_data.columns)
+        assert columns.loc['A', 'nulls'] == 1
+        assert columns.loc['C', 'distinct'] == sample_data['C'].nunique()
+        assert columns.loc['B', 'max'] == 1000
+        assert columns.loc['A', 'mean'] == pytest.approx(sample_data['A'].mean())
+        assert columns.loc['B', 'std'] == pytest.approx(sample_data['B'].std())
+        assert np.isnan(columns.loc['C', 'mean'])
+        assert profile['memory_mb'] == pytest.approx(columns['memory_mb'].sum())
+    
+    def test_profile_data_includes_quality_report(self, sample_data):
+        profile = profile_data(sample_data)
+        report = analyze_data_quality(sample_data)
+        for key in ('shape', 'duplicates', 'numeric_cols', 'categorical_cols'):
+            assert profile[key] == report[key]
+        pd.testing.assert_series_equal(profile['nulls'], report['nulls'])
+        pd.testing.assert_series_equal(profile['null_pct'], report['null_pct'], check_names=False)
+    
+    def test_profile_data_cached_by_fingerprint(self, sample_data):
+        first = profile_data(sample_data, fingerprint=('test-profile', 1))
+        assert profile_data(sample_data, fingerprint=('test-profile', 1)) is first
+        assert profile_data(sample_data.head(2), fingerprint=('test-profile', 2))['shape'] == (2, 3)
+        assert profile_data(sample_data) is not first
+    
+    def test_profile_data_hashes_only_on_cache_miss(self, sample_data):
+        store, calls = {}, []
+        
+        def hashes():
+            calls.append(1)
+            return stored_row_hashes(store, ('test-profile', 3), sample_data)
+        
+        first = profile_data(sample_data, ('test-profile', 3), hashes)
+        assert profile_data(sample_data, ('test-profile', 3), hashes) is first
+        assert len(calls) == 1
+        assert stored_row_hashes(store, ('test-profile', 3), sample_data) is store[(('test-profile', 3), ())]
+        assert first['duplicates'] == analyze_data_quality(sample_data)['duplicates']
+    
+    def test_profile_data_empty_dataframe(self):
+        profile = profile_data(pd.DataFrame())
+        assert profile['shape'] == (0, 0)
+        assert profile['duplicates'] == 0
+        assert len(profile['columns']) == 0
+
+class TestCleaningPipeline:
+    @pytest.fixture
+    def train_data(self):
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({
+            'x': rng.normal(size=400),
+            'y': rng.normal(10, 2, size=400),
+            'cat': rng.choice(['a', 'b'], size=400)
+        })
+        df.loc[::15, 'x'] = np.nan
+        df.loc[5, 'y'] = 200.0
+        return pd.concat([df, df.head(10)], ignore_index=True)
+    
+    @pytest.mark.parametrize('fill_nulls_method', ['mean', 'median', 'zero', 'ffill', 'drop', 'none'])
+    @pytest.mark.parametrize('outlier_method', ['zscore_sequential', 'zscore', 'iqr', 'mad'])
+    def test_fit_transform_matches_clean_data(self, train_data, fill_nulls_method, outlier_method):
+        params = {'fill_nulls_method': fill_nulls_method, 'outlier_method': outlier_method, 'outlier_threshold': 3.0}
+        expected = clean_data(train_data, **params)
+        result = CleaningPipeline(**params).fit_transform(train_data)
+        pd.testing.assert_frame_equal(result, expected)
+    
+    def test_sequential_zscore_drops_rows_exactly_at_threshold(self):
+        # Media 0 y desviación 1 exactas: ±2 tienen |z| == 2, justo en el umbral
+        df = pd.DataFrame({'x': [-2.0, 2.0] + [0.0] * 6, 'y': np.arange(8.0)})
+        params = {'remove_duplicates': False, 'fill_nulls_method': 'none',
+                  'outlier_method': 'zscore_sequential', 'outlier_threshold': 2.0}
+        expected = clean_data(df, **params)
+        pipeline = CleaningPipeline(**params)
+        result = pipeline.fit_transform(df)
+        
+        assert expected['x'].tolist() == [0.0] * 6
+        pd.testing.assert_frame_equal(result, expected)
+        pd.testing.assert_frame_equal(pipeline.transform(df), expected)
+    
+    def test_transform_uses_fitted_values(self, train_data):
+        pipeline = CleaningPipeline(fill_nulls_method='median', outlier_method='zscore').fit(train_data)
+        new_batch = pd.DataFrame({'x': [np.nan, 0.0, 1000.0], 'y': [10.0, np.nan, 10.0], 'cat': ['a', 'b', 'a']})
+        cleaned = pipeline.transform(new_batch)
+        
+        assert cleaned.loc[0, 'x'] == pytest.approx(pipeline.fill_values_['x'])
+        assert cleaned.loc[1, 'y'] == pytest.approx(pipeline.fill_values_['y'])
+        assert 2 not in cleaned.index
+    
+    def test_json_round_trip(self, train_data):
+        pipeline = CleaningPipeline(fill_nulls_method='mean', outlier_method='iqr', outlier_threshold=1.5).fit(train_data)
+        restored = CleaningPipeline.from_json(pipeline.to_json())
+        
+        assert restored.get_params() == pipeline.get_params()
+        pd.testing.assert_frame_equal(restored.transform(train_data), pipeline.transform(train_data))
+    
+    def test_serialized_form_is_compact(self, train_data):
+        state = CleaningPipeline(outlier_method='mad').fit(train_data).to_dict()
+        assert state['columns'] == ['x', 'y']
+        assert len(state['lower']) == len(state['upper']) == 2
+        assert state['fill_values'] is not None
+    
+    def test_transform_chunks_matches_transform(self, train_data):
+        pipeline = CleaningPipeline(fill_nulls_method='ffill', outlier_method='zscore').fit(train_data)
+        chunks = (train_data.iloc[i:i + 64] for i in range(0, len(train_data), 64))
+        streamed = pd.concat(pipeline.transform_chunks(chunks))
+        pd.testing.assert_frame_equal(streamed, pipeline.transform(train_data))
+    
+    def test_transform_chunks_removes_duplicates_across_chunks(self, train_data):
+        pipeline = CleaningPipeline(remove_outliers=False).fit(train_data)
+        chunks = [train_data.head(50), train_data.head(50)]
+        streamed = pd.concat(pipeline.transform_chunks(chunks))
+        assert len(streamed) == 50
+    
+    def test_transform_requires_fit(self, train_data):
+        with pytest.raises(ValueError):
+            CleaningPipeline().transform(train_data)
+    
+    def test_transform_missing_columns(self, train_data):
+        pipeline = CleaningPipeline().fit(train_data)
+        with pytest.raises(ValueError, match="Faltan columnas"):
+            pipeline.transform(train_data.drop(columns=['y']))
+    
+    def test_duplicate_subset_round_trip(self, train_data):
+        pipeline = CleaningPipeline(remove_outliers=False, duplicate_subset=['cat']).fit(train_data)
+        restored = CleaningPipeline.from_json(pipeline.to_json())
+        assert restored.duplicate_subset == ['cat']
+        assert len(restored.transform(train_data)) == 2
@@ -1,13 +1,23 @@
 """Tests ampliados para data_loader.py"""
 import pytest
 import pandas as pd
+import numpy as np
 import io
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
 
-from core.data_loader import load_data
+from core.data_loader import (
+    load_data,
+    load_data_cached,
+    get_dataset_cache_stats,
+    optimize_dtypes,
+    read_schema,
+    list_data_files,
+    iter_chunks
+)
+from core import data_loader
 
 
 class TestDataLoaderExtended:
@@ -104,3 +114,311 @@ class TestDataLoaderExtended:
         assert error is None
         assert df is not None
         assert len(df) == 1000
+    
+    # Tests de lectura por bloques con tipos optimizados
+    def test_load_chunked_matches_single_pass(self):
+        rows = ["id,group,value"]
+        rows.extend([f"{i},{'abc'[i % 3]},{i * 0.5}" for i in range(1000)])
+        csv_content = "\n".join(rows)
+        
+        df_full, _ = load_data(io.BytesIO(csv_content.encode()))
+        df_chunked, error = load_data(io.BytesIO(csv_content.encode()), chunksize=128, optimize=True)
+        
+        assert error is None
+        assert len(df_chunked) == 1000
+        assert df_chunked['id'].dtype == np.int16
+        assert df_chunked['value'].dtype == np.float32
+        assert isinstance(df_chunked['group'].dtype, pd.CategoricalDtype)
+        assert list(df_chunked['group'].astype(str)) == list(df_full['group'])
+        assert np.allclose(df_chunked['value'], df_full['value'])
+        assert df_chunked.attrs['load_info']['n_chunks'] == 8
+        assert df_chunked.attrs['load_info']['memory_mb'] < df_chunked.attrs['load_info']['original_mb']
+    
+    def test_load_chunked_unions_categories(self):
+        csv_content = "g,v\n" + "a,1\n" * 5 + "b,2\n" * 5 + "c,3\n" * 5
+        df, error = load_data(io.BytesIO(csv_content.encode()), chunksize=5, optimize=True)
+        assert error is None
+        assert list(df['g'].cat.categories) == ['a', 'b', 'c']
+        assert df['g'].isna().sum() == 0
+    
+    def test_load_chunked_late_nulls_stay_float32(self):
+        csv_content = "a,b\n" + "1,x\n" * 4 + ",y\n"
+        df, error = load_data(io.BytesIO(csv_content.encode()), chunksize=2, optimize=True)
+        assert error is None
+        assert df['a'].dtype == np.float32
+        assert df['a'].isna().sum() == 1
+    
+    def test_load_chunked_late_nulls_keep_large_ints_exact(self):
+        big = 2 ** 24 + 1
+        csv_content = "a,b\n" + "".join(f"{big + i},x\n" for i in range(4)) + ",y\n"
+        df, error = load_data(io.BytesIO(csv_content.encode()), chunksize=2, optimize=True)
+        assert error is None
+        assert df['a'].dtype == np.float64
+        assert df['a'].iloc[:4].tolist() == [big + i for i in range(4)]
+    
+    def test_optimize_dtypes_keeps_large_int_with_nulls_exact(self):
+        df = pd.DataFrame({'id': [2.0 ** 24 + 1, np.nan], 'x': [0.5, np.nan]})
+        optimized = optimize_dtypes(df)
+        assert optimized['id'].dtype == np.float64
+        assert optimized['id'].iloc[0] == 2 ** 24 + 1
+        assert optimized['x'].dtype == np.float32
+    
+    def test_load_chunked_validates_first_chunk(self):
+        csv_content = "a,b\nx,y\nz,w\n1,2"
+        df, error = load_data(io.BytesIO(csv_content.encode()), chunksize=2, optimize=True)
+        assert df is None
+        assert 'numérica' in error
+    
+    def test_optimize_dtypes_keeps_high_cardinality_text(self):
+        df = pd.DataFrame({'id': [f'id{i}' for i in range(10)], 'x': range(10)})
+        optimized = optimize_dtypes(df)
+        assert optimized['id'].dtype == object
+        assert optimized['x'].dtype == np.int8
+        assert df['x'].dtype == np.int64
+    
+    # Tests de formatos columnares
+    @pytest.fixture
+    def columnar_df(self):
+        return pd.DataFrame({
+            'a': np.arange(100, dtype=float),
+            'b': np.arange(100),
+            'c': ['x', 'y'] * 50
+        })
+    
+    @pytest.mark.parametrize("extension", ["parquet", "feather"])
+    def test_load_columnar_path_with_projection(self, columnar_df, tmp_path, extension):
+        path = tmp_path / f"data.{extension}"
+        getattr(columnar_df, f"to_{extension}")(path)
+        
+        df, error = load_data(path, columns=['a', 'c'])
+        
+        assert error is None
+        assert list(df.columns) == ['a', 'c']
+        pd.testing.assert_frame_equal(df, columnar_df[['a', 'c']])
+    
+    @pytest.mark.parametrize("ipc_format", ["file", "stream"])
+    @pytest.mark.parametrize("chunksize", [None, 30])
+    def test_load_arrow_ipc_projection_keeps_requested_order(self, columnar_df, tmp_path, ipc_format, chunksize):
+        import pyarrow as pa
+        path = tmp_path / "data.arrow"
+        table = pa.Table.from_pandas(columnar_df, preserve_index=False)
+        new_writer = pa.ipc.new_file if ipc_format == "file" else pa.ipc.new_stream
+        with new_writer(str(path), table.schema) as writer:
+            for batch in table.to_batches(max_chunksize=40):
+                writer.write_batch(batch)
+        
+        df, error = load_data(path, columns=['c', 'a'], chunksize=chunksize)
+        
+        assert error is None
+        pd.testing.assert_frame_equal(df, columnar_df[['c', 'a']])
+    
+    def test_load_columnar_upload(self, columnar_df):
+        buffer = io.BytesIO()
+        columnar_df.to_feather(buffer)
+        buffer.seek(0)
+        buffer.name = "data.arrow"
+        
+        df, error = load_data(buffer)
+        
+        assert error is None
+        assert df.shape == (100, 3)
+    
+    def test_load_columnar_error(self):
+        file = io.BytesIO(b"no es parquet")
+        file.name = "data.parquet"
+        
+        df, error = load_data(file)
+        
+        assert df is None
+        assert 'Parquet' in error
+    
+    @pytest.mark.parametrize("extension", ["csv", "parquet", "feather"])
+    def test_iter_chunks(self, columnar_df, tmp_path, extension):
+        path = tmp_path / f"data.{extension}"
+        if extension == "csv":
+            columnar_df.to_csv(path, index=False)
+        else:
+            getattr(columnar_df, f"to_{extension}")(path)
+        
+        chunks = list(iter_chunks(path, columns=['a', 'b'], chunksize=30))
+        
+        assert [len(chunk) for chunk in chunks] == [30, 30, 30, 10]
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), columnar_df[['a', 'b']])
+    
+    def test_read_schema_feather_reads_footer_only(self, columnar_df, tmp_path, monkeypatch):
+        columnar_df.to_feather(tmp_path / "data.feather")
+        monkeypatch.setattr(data_loader, "_read_arrow_table", lambda *args, **kwargs: pytest.fail("lectura completa"))
+        schema = read_schema(tmp_path / "data.feather")
+        assert schema == {'a': 'float64', 'b': 'int64', 'c': 'object'}
+    
+    def test_read_schema_without_data(self, columnar_df, tmp_path):
+        columnar_df.to_parquet(tmp_path / "data.parquet")
+        schema = read_schema(tmp_path / "data.parquet")
+        assert schema == {'a': 'float64', 'b': 'int64', 'c': 'object'}
+    
+    def test_list_data_files(self, columnar_df, tmp_path):
+        columnar_df.to_parquet(tmp_path / "b.parquet")
+        columnar_df.to_csv(tmp_path / "a.csv", index=False)
+        (tmp_path / "notas.txt").write_text("x")
+        files = list_data_files(tmp_path)
+        assert [f['name'] for f in files] == ['a.csv', 'b.parquet']
+        assert files[1]['format'] == 'Parquet'
+    
+    # Tests del motor pyarrow para CSV
+    def test_load_csv_pyarrow_engine_matches_c(self):
+        rows = ["id,group,value"]
+        rows.extend([f"{i},{'abc'[i % 3]},{i * 0.5}" for i in range(500)])
+        csv_content = "\n".join(rows)
+        
+        df_c, _ = load_data(io.BytesIO(csv_content.encode()), engine='c')
+        df_arrow, error = load_data(io.BytesIO(csv_content.encode()), engine='pyarrow')
+        
+        assert error is None
+        assert df_arrow.attrs['load_info']['engine'] == 'pyarrow'
+        assert df_arrow.attrs['load_info']['throughput_mb_s'] > 0
+        pd.testing.assert_frame_equal(df_arrow, df_c)
+    
+    def test_load_csv_pyarrow_chunked(self):
+        rows = ["a,b"] + [f"{i},{i % 7}" for i in range(1000)]
+        df, error = load_data(
+            io.BytesIO("\n".join(rows).encode()), chunksize=100, optimize=True, engine='pyarrow'
+        )
+        assert error is None
+        assert len(df) == 1000
+        assert df['b'].dtype == np.int8
+    
+    @pytest.mark.parametrize("chunksize", [None, 70])
+    def test_load_csv_pyarrow_keeps_c_engine_dtypes(self, chunksize):
+        rows = ["fecha,texto,valor"] + [
+            f"2021-01-{i % 28 + 1:02d},{'' if i % 5 == 0 else 'abc'[i % 3]},{i}" for i in range(300)
+        ]
+        content = "\n".join(rows).encode()
+        
+        df_c, _ = load_data(io.BytesIO(content), chunksize=chunksize, engine='c')
+        df_arrow, error = load_data(io.BytesIO(content), chunksize=chunksize, engine='pyarrow')
+        
+        assert error is None
+        assert df_arrow.attrs['load_info']['engine'] == 'pyarrow'
+        assert df_arrow['fecha'].dtype == object
+        assert df_arrow['texto'].isna().sum() == 60
+        pd.testing.assert_frame_equal(df_arrow, df_c)
+    
+    def test_load_csv_pyarrow_streams_chunks(self, monkeypatch):
+        import pyarrow.csv as pa_csv
+        monkeypatch.setattr(pa_csv, "read_csv", lambda *args, **kwargs: pytest.fail("lectura completa"))
+        rows = ["a,b"] + [f"{i},{i % 7}" for i in range(1000)]
+        df, error = load_data(io.BytesIO("\n".join(rows).encode()), chunksize=300, engine='pyarrow')
+        assert error is None
+        assert df.attrs['load_info']['n_chunks'] == 4
+        assert df['a'].tolist() == list(range(1000))
+    
+    def test_load_csv_pyarrow_falls_back_mid_stream(self):
+        rows = ["a,b"] + [f"{i},{i}" for i in range(300_000)] + ["1.5,x"] + [f"{i},{i}" for i in range(10)]
+        content = "\n".join(rows).encode()
+        
+        df_c, _ = load_data(io.BytesIO(content), chunksize=50_000, engine='c')
+        df_arrow, error = load_data(io.BytesIO(content), chunksize=50_000, engine='pyarrow')
+        
+        assert error is None
+        assert len(df_arrow) == len(df_c)
+        np.testing.assert_array_equal(df_arrow['a'].astype(float), df_c['a'].astype(float))
+    
+    def test_load_csv_pyarrow_fallback_counts_records_not_lines(self):
+        # Los campos con saltos de línea hacen que haya más líneas que registros
+        rows = ["a,b"] + [f'{i},"linea\n{i}"' for i in range(300_000)] + ['1.5,"x"'] + [f"{i},y" for i in range(10)]
+        content = "\n".join(rows).encode()
+        
+        df_c, _ = load_data(io.BytesIO(content), chunksize=50_000, engine='c')
+        df_arrow, error = load_data(io.BytesIO(content), chunksize=50_000, engine='pyarrow')
+        
+        assert error is None
+        assert df_arrow.attrs['load_info']['engine'] == 'pyarrow'
+        pd.testing.assert_frame_equal(df_arrow.astype({'a': float}), df_c.astype({'a': float}))
+    
+    @pytest.mark.parametrize("content, message", [
+        (b"", "vacío"),
+        (b"a,b\n1,2\n3,4,5\n", "parsear"),
+        (b"a\n\xff\xfe\n", "codificación")
+    ])
+    def test_load_csv_pyarrow_falls_back_with_same_errors(self, content, message):
+        df, error = load_data(io.BytesIO(content), engine='pyarrow')
+        assert df is None
+        assert message in error
+    
+    # Tests de la caché de datasets
+    def test_load_data_cached_skips_parsing(self, monkeypatch):
+        csv_content = b"a,b\n1,x\n2,y\n3,x"
+        df_first, error = load_data_cached(io.BytesIO(csv_content), optimize=True)
+        assert error is None
+        
+        def fail(*args, **kwargs):
+            raise AssertionError("no debería volver a parsear")
+        monkeypatch.setattr(data_loader, "load_data", fail)
+        
+        df_second, error = load_data_cached(io.BytesIO(csv_content), optimize=True)
+        assert error is None
+        assert df_second is df_first
+        assert df_second.attrs['fingerprint'] == df_first.attrs['fingerprint']
+    
+    def test_load_data_cached_disk_hit_after_memory_eviction(self):
+        first, _ = load_data_cached(io.BytesIO(b"v\n1\n2"), optimize=True)
+        for i in range(3):
+            load_data_cached(io.BytesIO(f"v\n{i + 10}".encode()))
+        disk_hits = get_dataset_cache_stats()['disk_hits']
+        
+        again, error = load_data_cached(io.BytesIO(b"v\n1\n2"), optimize=True)
+        
+        assert error is None
+        assert get_dataset_cache_stats()['disk_hits'] == disk_hits + 1
+        pd.testing.assert_frame_equal(again, first)
+    
+    def test_load_data_cached_paths_stay_in_memory(self, columnar_df, tmp_path):
+        path = tmp_path / "data.feather"
+        columnar_df.to_feather(path)
+        disk_entries = get_dataset_cache_stats()['disk_entries']
+        
+        first, error = load_data_cached(path)
+        again, _ = load_data_cached(path)
+        
+        assert error is None
+        assert again is first
+        assert get_dataset_cache_stats()['disk_entries'] == disk_entries
+    
+    @pytest.mark.parametrize("optimize", [True, False])
+    def test_load_data_cached_mixed_types_stay_in_memory(self, optimize):
+        # La columna 'a' pasa de entero a texto tras el primer bloque: Arrow no puede guardarla
+        content = ("a,b\n" + "1,2\n" * 3 + "x,3\n").encode()
+        disk_entries = get_dataset_cache_stats()['disk_entries']
+        
+        first, error = load_data_cached(io.BytesIO(content), chunksize=3, optimize=optimize, engine='c')
+        again, _ = load_data_cached(io.BytesIO(content), chunksize=3, optimize=optimize, engine='c')
+        
+        assert error is None
+        assert again is first
+        assert first['a'].tolist() == [1, 1, 1, 'x']
+        assert get_dataset_cache_stats()['disk_entries'] == disk_entries
+        assert not list(data_loader._dataset_cache.cache_dir.glob("*.tmp"))
+    
+    def test_load_data_cached_keys_on_parameters(self):
+        content = b"a,b\n1,2\n3,4"
+        full, _ = load_data_cached(io.BytesIO(content))
+        projected, _ = load_data_cached(io.BytesIO(content), columns=['a'])
+        assert list(full.columns) == ['a', 'b']
+        assert list(projected.columns) == ['a']
+    
+    def test_load_data_cached_does_not_cache_errors(self):
+        df, error = load_data_cached(io.BytesIO(b"a\nx\ny"))
+        assert df is None
+        assert error is not None
+    
+    @pytest.mark.parametrize("extension", ["parquet", "feather"])
+    def test_load_columnar_streaming_chunks(self, columnar_df, tmp_path, extension):
+        path = tmp_path / f"data.{extension}"
+        getattr(columnar_df, f"to_{extension}")(path)
+        
+        df, error = load_data(path, chunksize=30, optimize=True)
+        
+        assert error is None
+        assert df.attrs['load_info']['n_chunks'] == 4
+        assert len(df) == 100
+        assert list(df['c'].cat.categories) == ['x', 'y']
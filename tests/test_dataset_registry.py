@@ -0,0 +1,74 @@
+"""Tests para dataset_registry.py"""
+import pytest
+import pandas as pd
+import numpy as np
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from core.dataset_registry import sidecar_path, count_rows, get_metadata, list_datasets
+
+
+class TestDatasetRegistry:
+    @pytest.fixture
+    def sample_df(self):
+        return pd.DataFrame({
+            'a': np.arange(50, dtype=float),
+            'b': np.arange(50),
+            'c': ['x', 'y'] * 25
+        })
+    
+    @pytest.fixture
+    def data_dir(self, tmp_path, sample_df):
+        sample_df.to_csv(tmp_path / "datos.csv", index=False)
+        sample_df.to_parquet(tmp_path / "datos.parquet")
+        sample_df.to_feather(tmp_path / "datos.feather")
+        return tmp_path
+    
+    # Tests de count_rows
+    @pytest.mark.parametrize("name", ["datos.csv", "datos.parquet", "datos.feather"])
+    def test_count_rows(self, data_dir, name):
+        assert count_rows(data_dir / name) == 50
+    
+    def test_count_rows_csv_without_trailing_newline(self, tmp_path):
+        path = tmp_path / "x.csv"
+        path.write_bytes(b"a\n1\n2")
+        assert count_rows(path) == 2
+    
+    # Tests de metadatos
+    def test_get_metadata_writes_sidecar(self, data_dir):
+        metadata = get_metadata(data_dir / "datos.parquet")
+        
+        assert metadata['n_rows'] == 50
+        assert metadata['n_columns'] == 3
+        assert metadata['schema']['a'] == 'float64'
+        assert sidecar_path(data_dir / "datos.parquet").exists()
+    
+    def test_get_metadata_reads_sidecar(self, data_dir):
+        path = data_dir / "datos.csv"
+        get_metadata(path)
+        sidecar = sidecar_path(path)
+        stored = json.loads(sidecar.read_text(encoding='utf-8'))
+        stored['n_rows'] = 999
+        sidecar.write_text(json.dumps(stored), encoding='utf-8')
+        
+        assert get_metadata(path)['n_rows'] == 999
+        assert get_metadata(path, refresh=True)['n_rows'] == 50
+    
+    def test_get_metadata_refreshes_when_file_changes(self, data_dir, sample_df):
+        path = data_dir / "datos.csv"
+        get_metadata(path)
+        sample_df.head(10).to_csv(path, index=False)
+        os.utime(path, ns=(0, 10**9))
+        
+        assert get_metadata(path)['n_rows'] == 10
+    
+    def test_list_datasets(self, data_dir):
+        (data_dir / "roto.parquet").write_bytes(b"no es parquet")
+        datasets = list_datasets(data_dir)
+        
+        assert [d['name'] for d in datasets] == ['datos.csv', 'datos.feather', 'datos.parquet']
+        assert all(d['size_mb'] > 0 for d in datasets)
@@ -7,9 +7,13 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
 
+from config import settings
 from core.data_cleaner import clean_data
 from core.scaler import scale_data
 from core.clustering import perform_clustering
+from core.pipeline import replay_pipeline
+from core.data_cleaner import CleaningPipeline
+from core.sampling import sample_data
 
 
 class TestIntegration:
@@ -56,3 +60,43 @@ class TestIntegration:
         
         scaled_df, _ = scale_data(cleaned, 'standard', cleaned.columns.tolist())
         assert len(scaled_df.columns) == initial_cols
+    
+    def test_replay_pipeline_matches_manual_run(self, raw_data):
+        config = {
+            'clean': {'remove_duplicates': True, 'fill_nulls_method': 'median', 'remove_outliers': False, 'outlier_threshold': 3.0},
+            'selected_features': ['feature1', 'feature2'],
+            'scaling': {'scaler_type': 'standard', 'columns': ['feature1', 'feature2']},
+            'clustering': {'n_clusters': 2, 'method': 'kmeans'}
+        }
+        replay = replay_pipeline(raw_data, config)
+        
+        cleaned = clean_data(raw_data, **config['clean'])
+        scaled_df, _ = scale_data(cleaned, 'standard', ['feature1', 'feature2'], dtype=settings.PRECISION)
+        pd.testing.assert_frame_equal(replay['data_scaled'], scaled_df)
+        assert np.array_equal(replay['cluster_results']['labels'], perform_clustering(scaled_df, 2, 'kmeans')['labels'])
+    
+    def test_replay_pipeline_on_full_data_after_preview(self):
+        rng = np.random.default_rng(0)
+        full = pd.DataFrame({'a': rng.normal(size=2000), 'b': rng.normal(size=2000)})
+        sample = sample_data(full, 200)
+        config = {
+            'scaling': {'scaler_type': 'minmax', 'columns': ['a', 'b']},
+            'clustering': {'n_clusters': 3, 'method': 'kmeans'}
+        }
+        assert len(replay_pipeline(sample, config)['cluster_results']['labels']) == 200
+        assert len(replay_pipeline(full, config)['cluster_results']['labels']) == 2000
+    
+    def test_replay_pipeline_requires_scaling_and_clustering(self, raw_data):
+        with pytest.raises(ValueError):
+            replay_pipeline(raw_data, {'clean': {}})
+    
+    def test_replay_pipeline_with_fitted_cleaning_pipeline(self, raw_data):
+        cleaning = CleaningPipeline(fill_nulls_method='median', remove_outliers=False).fit(raw_data)
+        config = {
+            'cleaning_pipeline': cleaning.to_dict(),
+            'clean': {'fill_nulls_method': 'zero'},
+            'scaling': {'scaler_type': 'standard', 'columns': ['feature1', 'feature2']},
+            'clustering': {'n_clusters': 2, 'method': 'kmeans'}
+        }
+        replay = replay_pipeline(raw_data, config)
+        pd.testing.assert_frame_equal(replay['data_clean'], cleaning.transform(raw_data))
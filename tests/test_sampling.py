@@ -0,0 +1,63 @@
+"""Tests para sampling.py"""
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from core.sampling import stratified_indices, reservoir_sample, stratified_sample, sample_data
+
+
+class TestSampling:
+    @pytest.fixture
+    def large_data(self):
+        rng = np.random.default_rng(42)
+        return pd.DataFrame({
+            'x': rng.normal(size=10_000),
+            'group': rng.choice(['a', 'b', 'c'], size=10_000, p=[0.7, 0.25, 0.05])
+        })
+    
+    # Tests de reservoir_sample
+    def test_reservoir_sample_size_and_order(self, large_data):
+        sample = reservoir_sample(large_data, 500)
+        assert len(sample) == 500
+        assert sample.index.is_monotonic_increasing
+        assert sample.index.is_unique
+    
+    def test_reservoir_sample_chunks_match_single_pass_distribution(self, large_data):
+        chunks = (large_data.iloc[i:i + 1000] for i in range(0, len(large_data), 1000))
+        sample = reservoir_sample(chunks, 2000)
+        assert len(sample) == 2000
+        assert abs(sample['x'].mean() - large_data['x'].mean()) < 0.1
+        assert set(sample.index) <= set(large_data.index)
+    
+    def test_reservoir_sample_smaller_than_requested(self, large_data):
+        sample = reservoir_sample(large_data.head(50), 100)
+        pd.testing.assert_frame_equal(sample, large_data.head(50))
+    
+    def test_reservoir_sample_reproducible(self, large_data):
+        first = reservoir_sample(large_data, 300, random_state=1)
+        second = reservoir_sample(large_data, 300, random_state=1)
+        assert first.index.equals(second.index)
+    
+    # Tests de muestreo estratificado
+    def test_stratified_sample_keeps_proportions(self, large_data):
+        sample = stratified_sample(large_data, 1000, 'group')
+        full_pct = large_data['group'].value_counts(normalize=True)
+        sample_pct = sample['group'].value_counts(normalize=True)
+        assert (sample_pct - full_pct).abs().max() < 0.01
+    
+    def test_stratified_indices_every_stratum(self):
+        labels = np.array([0] * 990 + [1] * 10)
+        idx = stratified_indices(labels, 20, np.random.default_rng(0))
+        assert 1 in labels[idx]
+    
+    # Tests de sample_data
+    def test_sample_data_returns_full_when_small(self, large_data):
+        assert sample_data(large_data, 20_000) is large_data
+    
+    def test_sample_data_stratified_requires_column(self, large_data):
+        with pytest.raises(ValueError):
+            sample_data(large_data, 100, 'stratified')
@@ -1,4 +1,5 @@
 """Tests ampliados para scaler.py"""
+import io
 import pytest
 import pandas as pd
 import numpy as np
@@ -7,7 +8,9 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
 
-from core.scaler import scale_data
+from core.scaler import scale_data, scale_data_streaming, save_scaler, load_scaler, transform_with_scaler, fit_scaler_from_sketch, compare_scalers, SCALER_TYPES
+from core.sketch import QuantileSketch
+from core import scaler as scaler_module
 
 
 class TestScalerExtended:
@@ -107,3 +110,181 @@ class TestScalerExtended:
         assert scaler is not None
         # La columna B debería escalar normalmente
         assert scaled_df['B'].std() > 0
+    
+    # Tests de escalado por bloques
+    @pytest.fixture
+    def large_data(self):
+        rng = np.random.default_rng(0)
+        return pd.DataFrame({
+            'X': rng.normal(5, 3, size=2500),
+            'Y': rng.exponential(2, size=2500),
+            'C': 'cat'
+        })
+    
+    @pytest.mark.parametrize('scaler_type', ['standard', 'minmax'])
+    def test_scale_streaming_matches_in_memory(self, large_data, scaler_type):
+        expected, _ = scale_data(large_data, scaler_type, ['X', 'Y'])
+        scaled_df, scaler = scale_data_streaming(large_data, scaler_type, ['X', 'Y'], chunksize=300)
+        
+        assert scaler is not None
+        assert (scaled_df.dtypes == np.float32).all()
+        assert scaled_df.index.equals(large_data.index)
+        np.testing.assert_allclose(scaled_df.to_numpy(), expected.to_numpy(), atol=1e-5)
+    
+    @pytest.mark.parametrize('scaler_type', ['robust', 'quantile', 'power'])
+    def test_scale_streaming_sketch_approximates_exact(self, large_data, scaler_type):
+        expected, _ = scale_data(large_data, scaler_type, ['X', 'Y'])
+        scaled_df, _ = scale_data_streaming(large_data, scaler_type, ['X', 'Y'], chunksize=300, sketch_k=200)
+        assert np.abs(scaled_df.to_numpy() - expected.to_numpy()).mean() < 0.1
+    
+    def test_scale_streaming_chunk_source_to_memmap(self, large_data, tmp_path):
+        chunks = lambda: (large_data.iloc[i:i + 700] for i in range(0, len(large_data), 700))
+        output_path = tmp_path / "scaled.npy"
+        scaled_df, _ = scale_data_streaming(chunks, 'standard', output_path=output_path)
+        
+        assert list(scaled_df.columns) == ['X', 'Y']
+        stored = np.load(output_path, mmap_mode='r')
+        assert stored.shape == (2500, 2)
+        np.testing.assert_array_equal(stored, scaled_df.to_numpy())
+    
+    def test_scale_streaming_rejects_nan(self, large_data):
+        data = large_data.copy()
+        data.loc[2000, 'X'] = np.nan
+        with pytest.raises(ValueError):
+            scale_data_streaming(data, 'standard', ['X', 'Y'], chunksize=500)
+    
+    def test_scale_streaming_invalid_scaler(self, large_data):
+        with pytest.raises(ValueError):
+            scale_data_streaming(large_data, 'invalid', ['X', 'Y'])
+    
+    # Tests de precisión
+    @pytest.mark.parametrize('scaler_type', ['standard', 'minmax', 'robust'])
+    def test_scale_float32_precision(self, large_data, scaler_type):
+        expected, _ = scale_data(large_data, scaler_type, ['X', 'Y'])
+        scaled_df, _ = scale_data(large_data, scaler_type, ['X', 'Y'], dtype='float32')
+        assert (expected.dtypes == np.float64).all()
+        assert (scaled_df.dtypes == np.float32).all()
+        np.testing.assert_allclose(scaled_df.to_numpy(), expected.to_numpy(), atol=1e-5)
+    
+    # Tests de reutilización del escalador
+    def test_save_and_load_scaler(self, large_data, tmp_path):
+        _, scaler = scale_data(large_data, 'robust', ['X', 'Y'])
+        path = tmp_path / "scaler.json"
+        save_scaler(scaler, ['X', 'Y'], path)
+        loaded, columns = load_scaler(path)
+        assert columns == ['X', 'Y']
+        np.testing.assert_array_equal(loaded.center_, scaler.center_)
+    
+    @pytest.mark.parametrize('scaler_type', SCALER_TYPES)
+    def test_save_and_load_scaler_transforms_identically(self, large_data, scaler_type):
+        _, scaler = scale_data(large_data, scaler_type, ['X', 'Y'])
+        buffer = io.BytesIO()
+        save_scaler(scaler, ['X', 'Y'], buffer)
+        buffer.seek(0)
+        loaded, _ = load_scaler(buffer)
+        assert type(loaded) is type(scaler)
+        np.testing.assert_array_equal(loaded.transform(large_data[['X', 'Y']]), scaler.transform(large_data[['X', 'Y']]))
+    
+    def test_load_scaler_rejects_other_objects(self, tmp_path):
+        import joblib
+        path = tmp_path / "other.joblib"
+        joblib.dump({'version': 1, 'scaler': [1, 2, 3], 'columns': ['X']}, path)
+        with pytest.raises(ValueError):
+            load_scaler(path)
+        path.write_text('{"version": 2, "scaler": {"class": "Popen", "params": {}, "attributes": {}}, "columns": []}')
+        with pytest.raises(ValueError):
+            load_scaler(path)
+    
+    def test_transform_with_scaler_matches_fit(self, large_data):
+        expected, scaler = scale_data(large_data, 'standard', ['X', 'Y'], dtype='float32')
+        scaled_df = transform_with_scaler(large_data, scaler, ['X', 'Y'], chunksize=300)
+        assert (scaled_df.dtypes == np.float32).all()
+        assert scaled_df.index.equals(large_data.index)
+        np.testing.assert_allclose(scaled_df.to_numpy(), expected.to_numpy(), atol=1e-6)
+    
+    def test_transform_with_scaler_chunk_source(self, large_data):
+        _, scaler = scale_data(large_data, 'minmax', ['X', 'Y'])
+        chunks = lambda: (large_data.iloc[i:i + 700] for i in range(0, len(large_data), 700))
+        from_chunks = transform_with_scaler(chunks, scaler, ['X', 'Y'])
+        from_frame = transform_with_scaler(large_data, scaler, ['X', 'Y'])
+        np.testing.assert_array_equal(from_chunks.to_numpy(), from_frame.to_numpy())
+    
+    def test_transform_with_scaler_missing_columns(self, large_data):
+        _, scaler = scale_data(large_data, 'standard', ['X', 'Y'])
+        with pytest.raises(ValueError, match="Faltan columnas"):
+            transform_with_scaler(large_data[['X']], scaler, ['X', 'Y'])
+    
+    # Tests de escaladores basados en cuantiles
+    @pytest.mark.parametrize('scaler_type', ['quantile', 'power'])
+    def test_scale_quantile_and_power(self, large_data, scaler_type):
+        scaled_df, scaler = scale_data(large_data, scaler_type, ['X', 'Y'])
+        assert scaler is not None
+        assert abs(scaled_df['Y'].skew()) < abs(large_data['Y'].skew()) / 4
+    
+    def test_robust_from_sketch_matches_exact(self, large_data):
+        sketch = QuantileSketch(k=1000).update(large_data[['X', 'Y']].iloc[:800])
+        scaler = fit_scaler_from_sketch('robust', sketch, ['X', 'Y'])
+        _, exact = scale_data(large_data.iloc[:800], 'robust', ['X', 'Y'])
+        np.testing.assert_allclose(scaler.center_, exact.center_)
+        np.testing.assert_allclose(scaler.scale_, exact.scale_)
+    
+    @pytest.mark.parametrize('scaler_type', ['robust', 'quantile', 'power'])
+    def test_scale_data_uses_sketch_above_threshold(self, large_data, scaler_type):
+        expected, _ = scale_data(large_data, scaler_type, ['X', 'Y'])
+        scaled_df, _ = scale_data(large_data, scaler_type, ['X', 'Y'], sketch_rows=1000, sketch_k=200)
+        assert np.abs(scaled_df.to_numpy() - expected.to_numpy()).mean() < 0.1
+    
+    # Tests de la comparación de escaladores
+    def test_compare_scalers_summary_matches_scaled_data(self, large_data):
+        comparison = compare_scalers(large_data, ['X', 'Y'], bins=20)
+        assert set(comparison['edges']) == {'original', 'standard', 'minmax', 'robust', 'quantile', 'power'}
+        
+        # Standard y MinMax usan estadísticas exactas; Robust, los cuantiles del sketch
+        for scaler_type, atol in (('standard', 1e-9), ('minmax', 1e-9), ('robust', 0.02)):
+            scaled_df, _ = scale_data(large_data, scaler_type, ['X', 'Y'])
+            summary = comparison['summary'].loc[scaler_type]
+            np.testing.assert_allclose(summary['min'], scaled_df.min(), atol=atol)
+            np.testing.assert_allclose(summary['max'], scaled_df.max(), atol=atol)
+            np.testing.assert_allclose(summary['median'], scaled_df.median(), atol=0.05)
+    
+    def test_compare_scalers_binned_histograms(self, large_data):
+        comparison = compare_scalers(large_data, ['X', 'Y'], bins=20)
+        scaled_df, _ = scale_data(large_data, 'standard', ['X', 'Y'])
+        for col in ['X', 'Y']:
+            counts = comparison['counts'][col]
+            edges = comparison['edges']['standard'][col]
+            assert counts.sum() == pytest.approx(len(large_data))
+            assert len(edges) == len(counts) + 1
+            assert np.all(np.diff(edges) > 0)
+            exact, _ = np.histogram(scaled_df[col], edges)
+            assert np.abs(exact - counts).max() <= 0.02 * len(large_data)
+    
+    def test_compare_scalers_constant_column(self, large_data):
+        data = large_data.assign(K=7.0)
+        comparison = compare_scalers(data, ['X', 'K'])
+        assert comparison['counts']['K'].tolist() == [len(data)]
+        assert len(comparison['edges']['minmax']['K']) == 2
+    
+    def test_compare_scalers_cache(self, large_data):
+        first = compare_scalers(large_data, ['X', 'Y'], fingerprint='dataset-a')
+        assert compare_scalers(large_data, ['X', 'Y'], fingerprint='dataset-a') is first
+        assert compare_scalers(large_data, ['Y', 'X'], fingerprint='dataset-a') is not first
+        assert compare_scalers(large_data, ['X', 'Y'], fingerprint='dataset-a', sketch_k=50) is not first
+        assert compare_scalers(large_data, ['X', 'Y']) is not first
+    
+    def test_compare_scalers_fits_sketch_scalers_once(self, large_data, monkeypatch):
+        fitted = []
+        
+        def fit_once(scaler_type, sketch, columns):
+            fitted.append(scaler_type)
+            return fit_scaler_from_sketch(scaler_type, sketch, columns)
+        
+        monkeypatch.setattr(scaler_module, "fit_scaler_from_sketch", fit_once)
+        compare_scalers(large_data, ['X', 'Y'])
+        assert len(fitted) == len(set(fitted)) > 0
+    
+    def test_compare_scalers_rejects_nan(self, large_data):
+        data = large_data.copy()
+        data.loc[5, 'X'] = np.nan
+        with pytest.raises(ValueError):
+            compare_scalers(data, ['X', 'Y'])
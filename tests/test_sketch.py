@@ -0,0 +1,68 @@
+"""Tests para sketch.py"""
+import pytest
+import numpy as np
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from core.sketch import QuantileSketch
+
+
+class TestQuantileSketch:
+    @pytest.fixture
+    def data(self):
+        rng = np.random.default_rng(0)
+        return np.column_stack([rng.lognormal(0, 2, 200_000), rng.normal(size=200_000)])
+    
+    @staticmethod
+    def rank_error(data, estimates, q):
+        errors = []
+        for col in range(data.shape[1]):
+            ranks = np.searchsorted(np.sort(data[:, col]), estimates[:, col]) / len(data)
+            errors.append(np.abs(ranks - q).max())
+        return max(errors)
+    
+    def test_exact_without_compaction(self):
+        values = np.random.default_rng(1).normal(size=(300, 3))
+        sketch = QuantileSketch(k=1000).update(values)
+        q = np.linspace(0, 1, 21)
+        np.testing.assert_allclose(sketch.quantiles(q), np.quantile(values, q, axis=0))
+    
+    def test_streaming_rank_error(self, data):
+        sketch = QuantileSketch(k=200, random_state=0)
+        for start in range(0, len(data), 10_000):
+            sketch.update(data[start:start + 10_000])
+        q = np.linspace(0, 1, 101)
+        estimates = sketch.quantiles(q)
+        
+        assert sketch.count == len(data)
+        assert sketch.n_items < 1000
+        assert self.rank_error(data, estimates, q) < 0.02
+        np.testing.assert_array_equal(estimates[0], data.min(axis=0))
+        np.testing.assert_array_equal(estimates[-1], data.max(axis=0))
+    
+    def test_merge_matches_single_sketch_accuracy(self, data):
+        parts = [QuantileSketch(k=200, random_state=i).update(part) for i, part in enumerate(np.array_split(data, 4))]
+        merged = parts[0]
+        for part in parts[1:]:
+            merged.merge(part)
+        q = np.linspace(0.01, 0.99, 99)
+        
+        assert merged.count == len(data)
+        assert self.rank_error(data, merged.quantiles(q), q) < 0.02
+    
+    def test_one_dimensional_input(self):
+        sketch = QuantileSketch().update(np.arange(101))
+        assert sketch.quantiles(0.5)[0, 0] == 50
+    
+    def test_rejects_nan_and_column_mismatch(self):
+        sketch = QuantileSketch().update(np.ones((5, 2)))
+        with pytest.raises(ValueError):
+            sketch.update(np.ones((5, 3)))
+        with pytest.raises(ValueError):
+            sketch.update(np.array([[1.0, np.nan]]))
+    
+    def test_empty_sketch_has_no_quantiles(self):
+        with pytest.raises(ValueError):
+            QuantileSketch().quantiles(0.5)